@@ -0,0 +1,118 @@
+"""
+In-Process Cache Module.
+
+This module provides a bounded LRU cache with per-entry time-to-live,
+used to keep hot results in memory without unbounded growth.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class TTLCache:
+    """
+    Bounded least-recently-used cache with per-entry expiry.
+
+    Attributes:
+        max_entries: Maximum number of entries kept before evicting the LRU one.
+        ttl_seconds: Default lifetime of an entry in seconds.
+        hits: Number of lookups that returned a live entry.
+        misses: Number of lookups that found nothing or an expired entry.
+        evictions: Number of entries dropped to respect ``max_entries``.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries (must be >= 1).
+            ttl_seconds: Default time-to-live of an entry in seconds.
+        """
+        if max_entries < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Look up a live entry and mark it as recently used.
+
+        Args:
+            key: Cache key.
+            default: Value returned when the key is missing or expired.
+
+        Returns:
+            Any: The cached value, or ``default``.
+        """
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key.
+            value: Value to store.
+            ttl_seconds: Lifetime override for this entry.
+        """
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        """
+        Remove an entry.
+
+        Args:
+            key: Cache key.
+
+        Returns:
+            bool: True if an entry was removed.
+        """
+        return self._data.pop(key, None) is not None
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """
+        Return hit/miss counters and current size.
+
+        Returns:
+            dict: Size, capacity, hits, misses, evictions and hit ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,83 @@
+"""
+Concurrency Control Module.
+
+This module provides a bounded concurrency limiter used to cap the number
+of in-flight calls to slow upstream services (e.g. the LLM provider) while
+keeping track of how long callers wait for a free slot.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+
+class ConcurrencyLimiter:
+    """
+    Bound the number of concurrent operations and record queue-wait statistics.
+
+    Attributes:
+        limit: Maximum number of operations allowed to run at the same time.
+        in_flight: Number of operations currently holding a slot.
+        waiting: Number of callers currently queued for a slot.
+    """
+
+    def __init__(self, limit: int):
+        """
+        Initialize the limiter.
+
+        Args:
+            limit: Maximum number of concurrent operations (must be >= 1).
+        """
+        if limit < 1:
+            raise ValueError("Concurrency limit must be at least 1")
+        self.limit = limit
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+        self._acquired_total = 0
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Wait for a free slot and hold it for the duration of the block.
+
+        Yields:
+            float: Seconds spent waiting in the queue for the slot.
+        """
+        started = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.waiting -= 1
+
+        waited = time.perf_counter() - started
+        self._acquired_total += 1
+        self._wait_seconds_total += waited
+        self._wait_seconds_max = max(self._wait_seconds_max, waited)
+        self.in_flight += 1
+        try:
+            yield waited
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> dict:
+        """
+        Return a snapshot of the limiter state.
+
+        Returns:
+            dict: Limit, in-flight and waiting counts, and queue-wait timings.
+        """
+        acquired = self._acquired_total
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "acquired_total": acquired,
+            "wait_seconds_total": round(self._wait_seconds_total, 6),
+            "wait_seconds_avg": round(self._wait_seconds_total / acquired, 6) if acquired else 0.0,
+            "wait_seconds_max": round(self._wait_seconds_max, 6),
+        }
@@ -0,0 +1,79 @@
+"""
+Conditional Request Module.
+
+This module derives strong ETags from encoded response bodies and answers
+``If-None-Match`` revalidations with ``304 Not Modified``, so clients that
+already hold the current version of a record or page skip the download.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Response
+
+# Stored records are personal data: let clients cache them but revalidate
+# every time, and keep them out of shared caches.
+CACHE_CONTROL = "private, no-cache"
+
+
+def body_etag(body: bytes, *extra: str) -> str:
+    """
+    Derive a strong ETag from a response body.
+
+    Args:
+        body: Encoded response body.
+        extra: Other parts of the response the ETag must change with, such
+            as headers carrying a pagination cursor.
+
+    Returns:
+        str: Quoted entity tag.
+    """
+    digest = hashlib.blake2b(body, digest_size=16)
+    for part in extra:
+        digest.update(b"\0" + part.encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an ``If-None-Match`` header against the current ETag.
+
+    Uses the weak comparison the header calls for, so ``W/`` prefixes added
+    by intermediaries still match.
+
+    Args:
+        if_none_match: Header value, possibly None.
+        etag: Current quoted entity tag.
+
+    Returns:
+        bool: Whether the client's copy is current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def conditional_json(
+    body: bytes, if_none_match: Optional[str], headers: Optional[dict] = None
+) -> Response:
+    """
+    Build a JSON response, or ``304 Not Modified`` if the client's copy is current.
+
+    Args:
+        body: Encoded JSON body.
+        if_none_match: The request's ``If-None-Match`` header.
+        headers: Other response headers; sent with either status and covered
+            by the ETag.
+
+    Returns:
+        Response: The 200 or 304 response, carrying ``ETag`` and ``Cache-Control``.
+    """
+    headers = headers or {}
+    etag = body_etag(body, *(f"{name}: {value}" for name, value in sorted(headers.items())))
+    headers = {**headers, "ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
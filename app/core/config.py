@@ -5,6 +5,8 @@ class Settings(BaseSettings):
     # App settings
     app_name: str = "Medical Records AI API"
     version: str = "0.1.0"
+    log_level: str = "INFO"
+    log_format: str = "json"  # json | text
 
     # MongoDB settings
     mongodb_url: str
@@ -13,19 +15,144 @@ class Settings(BaseSettings):
     # Groq AI settings
     groq_api_key: str
     groq_model: str = "llama-3.1-8b-instant"
+    groq_max_concurrency: int = 32
+    groq_stream_buffer_events: int = 1024
+
+    # Groq resilience settings
+    groq_timeout_seconds: float = 20.0
+    groq_max_retries: int = 2
+    groq_retry_base_seconds: float = 0.25
+    groq_retry_max_seconds: float = 2.0
+    groq_retry_budget_ratio: float = 0.1
+    circuit_failure_threshold: int = 5
+    circuit_reset_seconds: float = 30.0
+
+    # Model routing settings
+    model_routing_policy: str = "fixed"  # fixed | size
+    groq_large_model: str = "llama-3.3-70b-versatile"
+    model_routing_threshold_tokens: int = 600
+    hedging_enabled: bool = True
+    hedge_percentile: float = 0.95
+    hedge_min_delay_seconds: float = 0.5
+    hedge_default_delay_seconds: float = 5.0
+    hedge_max_ratio: float = 0.1
+
+    # Prompt budget settings
+    prompt_max_input_tokens: int = 1500
+    prompt_additional_info_keys: list[str] = [
+        "allergies",
+        "medications",
+        "vital_signs",
+        "lab_results",
+        "family_history",
+        "pregnancy",
+        "smoking",
+    ]
+    analysis_min_tokens: int = 384
+    analysis_max_tokens: int = 1024
+
+    # Analysis cache settings
+    analysis_cache_enabled: bool = True
+    analysis_cache_max_entries: int = 10000
+    analysis_cache_ttl_seconds: int = 3600
+    analysis_cache_mongo_enabled: bool = False
+
+    # Semantic cache settings (requires NumPy)
+    semantic_cache_enabled: bool = False
+    semantic_cache_threshold: float = 0.9
+    semantic_cache_max_entries: int = 1000000
+    semantic_cache_ttl_seconds: int = 86400
+    semantic_cache_dimensions: int = 256
+    semantic_cache_signature_bits: int = 12
+    semantic_cache_probe_radius: int = 1
+    semantic_cache_age_band_years: int = 10
+    semantic_cache_path: str = ""
+
+    # Batch analysis settings
+    batch_max_items: int = 500
+    batch_concurrency: int = 16
+    batch_insert_chunk_size: int = 100
+
+    # Async record job settings
+    record_job_workers: int = 4
+    record_job_max_queue: int = 10000
+    record_job_claim_timeout_seconds: int = 300
+    record_job_max_wait_seconds: int = 30
+    record_job_backfill_interval_seconds: int = 30
+    record_job_max_attempts: int = 5
+
+    # Import settings
+    import_chunk_size: int = 1000
+    import_max_line_length: int = 65536
+    import_max_record_lines: int = 100
+    import_max_reported_errors: int = 100
+
+    # Record feed settings
+    record_feed_backend: str = "auto"
+    record_feed_queue_size: int = 100
+    record_feed_max_subscribers: int = 1000
+    record_feed_heartbeat_seconds: float = 15.0
+    record_feed_replay_page_size: int = 100
+    record_feed_retry_base_seconds: float = 0.5
+    record_feed_retry_max_seconds: float = 30.0
+
+    # Record analytics settings
+    analytics_enabled: bool = True
+    analytics_age_band_years: int = 10
+    analytics_default_days: int = 30
+    analytics_max_days: int = 366
+    analytics_top_terms: int = 10
+    analytics_rebuild_batch_size: int = 1000
+
+    # Record listing settings
+    records_page_size: int = 50
+    records_max_page_size: int = 500
+
+    # Export settings
+    export_batch_size: int = 1000
+    export_chunk_bytes: int = 65536
 
     # Resend Email settings
     resend_api_key: str
     from_email: str = "onboarding@resend.dev"
     from_name: str = "Medical Records API"
 
+    # Email outbox settings
+    email_outbox_workers: int = 2
+    email_outbox_batch_size: int = 50
+    email_outbox_max_attempts: int = 5
+    email_outbox_retry_base_seconds: float = 1.0
+    email_outbox_retry_max_seconds: float = 60.0
+    email_outbox_max_queue: int = 10000
+    email_outbox_durable: bool = True
+    email_outbox_claim_timeout_seconds: int = 300
+    email_outbox_recover_interval_seconds: int = 30
+
     # JWT settings
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
+    auth_cache_max_entries: int = 10000
+    auth_cache_ttl_seconds: int = 60
 
     # OTP settings
     otp_expire_minutes: int = 10
+    otp_backend: str = "memory"  # memory | mongo | redis
+    otp_max_entries: int = 100000
+    otp_sweep_interval_seconds: int = 60
+
+    # Admission control settings
+    rate_limit_enabled: bool = True
+    rate_limit_backend: str = "memory"  # memory | redis
+    rate_limit_ip_per_second: float = 2.0
+    rate_limit_ip_burst: int = 20
+    rate_limit_user_per_second: float = 10.0
+    rate_limit_user_burst: int = 50
+    rate_limit_max_keys: int = 100000
+    admission_max_in_flight: int = 512
+
+    # Redis settings
+    redis_url: str = "redis://localhost:6379/0"
 
     class Config:
         env_file = ".env"
@@ -2,6 +2,7 @@ from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import mongo_command_metrics
 
 client = None
 db = None
@@ -9,13 +10,13 @@ db = None
 
 async def connect_to_mongo():
     global client, db
-    logger.debug(f"Attempting to connect to MongoDB at {settings.mongodb_db_name}")
+    logger.debug("Attempting to connect to MongoDB at %s", settings.mongodb_db_name)
     try:
-        client = AsyncIOMotorClient(settings.mongodb_url)
+        client = AsyncIOMotorClient(settings.mongodb_url, event_listeners=[mongo_command_metrics])
         db = client[settings.mongodb_db_name]
-        logger.info(f"Successfully connected to MongoDB database: {settings.mongodb_db_name}")
+        logger.info("Successfully connected to MongoDB database: %s", settings.mongodb_db_name)
     except Exception as e:
-        logger.error(f"Failed to connect to MongoDB: {e}")
+        logger.error("Failed to connect to MongoDB: %s", e)
         raise
 
 
@@ -31,3 +32,40 @@ def get_database():
     if db is None:
         logger.warning("Database connection not initialized, returning None")
     return db
+
+
+async def ensure_indexes():
+    if db is None:
+        logger.warning("Database connection not initialized, skipping index creation")
+        return
+    indexes = [
+        (db.users, "email", {"unique": True}),
+        (db.medical_records, [("created_at", -1), ("_id", -1)], {}),
+        (
+            db.medical_records,
+            [("status", 1), ("claimed_at", 1)],
+            {"partialFilterExpression": {"status": "pending"}},
+        ),
+        (db.record_summary_terms, [("user_id", 1), ("count", -1), ("term", 1)], {}),
+    ]
+    if settings.email_outbox_durable:
+        indexes.append((db.email_outbox, [("status", 1), ("claimed_at", 1)], {}))
+        indexes.append((db.email_outbox, "expires_at", {"expireAfterSeconds": 0}))
+    if settings.otp_backend == "mongo":
+        indexes.append((db.otp_codes, "expires_at", {"expireAfterSeconds": 0}))
+    if settings.analysis_cache_mongo_enabled:
+        indexes.append((db.analysis_cache, "expires_at", {"expireAfterSeconds": 0}))
+
+    # Each index is created on its own, so one that existing data violates
+    # (e.g. duplicate user emails) does not leave the others missing.
+    failed = 0
+    for collection, keys, options in indexes:
+        try:
+            await collection.create_index(keys, **options)
+        except Exception as e:
+            failed += 1
+            logger.error("Failed to create index %s on %s: %s", keys, collection.name, e)
+    if failed:
+        logger.error("Failed to ensure %s of %s database indexes", failed, len(indexes))
+    else:
+        logger.info("Database indexes ensured")
@@ -1,16 +1,95 @@
+"""
+Logging Module.
+
+This module configures the application logger. Records are handed to a
+queue by the calling thread and formatted and written by a background
+listener thread, so emitting a log line never blocks the event loop on
+stdout. Each record carries the id of the request that produced it.
+"""
+
+import atexit
+import json
 import logging
+import queue
 import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from app.core.config import settings
+
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp each record with the id of the current request."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(
+                timespec="milliseconds"
+            ),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", "-"),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+
+    The stock ``QueueHandler.prepare`` renders the message in the caller;
+    here only the request id is captured up front and the record itself is
+    enqueued untouched.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def build_formatter(log_format: str) -> logging.Formatter:
+    """
+    Build the output formatter.
+
+    Args:
+        log_format: ``json`` for structured lines, anything else for text.
+
+    Returns:
+        logging.Formatter: Formatter used by the output handler.
+    """
+    if log_format == "json":
+        return JsonFormatter()
+    return logging.Formatter(
+        "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+
 
 logger = logging.getLogger("medical_records_api")
-logger.setLevel(logging.DEBUG)
+logger.setLevel(settings.log_level.upper())
+logger.propagate = False
 
 console_handler = logging.StreamHandler(sys.stdout)
-console_handler.setLevel(logging.DEBUG)
+console_handler.setFormatter(build_formatter(settings.log_format))
 
-formatter = logging.Formatter(
-    "%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
-console_handler.setFormatter(formatter)
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+queue_handler = DeferredQueueHandler(log_queue)
+queue_handler.addFilter(RequestIdFilter())
+logger.addHandler(queue_handler)
 
-logger.addHandler(console_handler)
+listener = QueueListener(log_queue, console_handler, respect_handler_level=True)
+listener.start()
+atexit.register(listener.stop)
@@ -0,0 +1,324 @@
+"""
+Metrics Module.
+
+This module provides counters, gauges and histograms rendered in the
+Prometheus text exposition format, and the application's collectors.
+
+Every labelled series owns a small lock, so updates never contend on a
+registry-wide lock and stay safe when they come from the driver threads
+that run MongoDB command listeners.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Iterable
+
+from pymongo import monitoring
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class _CounterChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild(_CounterChild):
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = value
+
+
+class _HistogramChild:
+    def __init__(self, buckets: tuple):
+        self._lock = threading.Lock()
+        self._buckets = buckets
+        self._counts = [0] * (len(buckets) + 1)
+        self._sum = 0.0
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def snapshot(self) -> tuple[list[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        """
+        Initialize the metric.
+
+        Args:
+            name: Metric name.
+            documentation: Help text.
+            labelnames: Names of the labels identifying each series.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """
+        Return the series for the given label values, creating it if needed.
+
+        Args:
+            *values: One value per label name, in order.
+
+        Returns:
+            The series object.
+
+        Raises:
+            ValueError: If the number of values does not match the label names.
+        """
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """Create the series of one label value combination."""
+
+    def _series(self) -> list[tuple[tuple, object]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def render(self) -> list[str]:
+        """
+        Render the metric in the text exposition format.
+
+        Returns:
+            list[str]: Exposition lines.
+        """
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._series():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: tuple, child) -> list[str]:
+        labels = _format_labels(self.labelnames, values)
+        return [f"{self.name}{labels} {_format_value(child.value)}"]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled series."""
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ):
+        """
+        Initialize the histogram.
+
+        Args:
+            name: Metric name.
+            documentation: Help text.
+            labelnames: Names of the labels identifying each series.
+            buckets: Sorted upper bounds of the buckets, without ``+Inf``.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record a value in the unlabelled series."""
+        self.labels().observe(value)
+
+    def _render_child(self, values: tuple, child) -> list[str]:
+        counts, total = child.snapshot()
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts, strict=True):
+            cumulative += count
+            labels = _format_labels(self.labelnames + ("le",), values + (_format_value(bound),))
+            lines.append(f"{self.name}_bucket{labels} {cumulative}")
+        labels = _format_labels(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics exposed together."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        """
+        Add a metric to the registry.
+
+        Args:
+            metric: Metric to expose.
+
+        Returns:
+            The registered metric.
+        """
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """
+        Render every registered metric.
+
+        Returns:
+            str: The exposition document.
+        """
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    Command listener timing MongoDB operations.
+
+    The collection name is taken from the started event and matched to the
+    completion by request and connection id.
+    """
+
+    def __init__(self):
+        """Initialize the listener."""
+        self._collections: dict[tuple, str] = {}
+
+    def started(self, event) -> None:
+        collection = event.command.get(event.command_name)
+        if not isinstance(collection, str):
+            collection = event.command.get("collection", "")
+        self._collections[(event.request_id, event.connection_id)] = collection
+
+    def succeeded(self, event) -> None:
+        self._observe(event, "success")
+
+    def failed(self, event) -> None:
+        self._observe(event, "error")
+
+    def _observe(self, event, outcome: str) -> None:
+        collection = self._collections.pop((event.request_id, event.connection_id), "")
+        mongodb_command_duration_seconds.labels(event.command_name, collection, outcome).observe(
+            event.duration_micros / 1_000_000
+        )
+
+
+registry = MetricsRegistry()
+
+http_requests_total = registry.register(
+    Counter("http_requests_total", "HTTP requests handled.", ("method", "route", "status"))
+)
+http_request_duration_seconds = registry.register(
+    Histogram(
+        "http_request_duration_seconds",
+        "HTTP request latency, including streamed bodies.",
+        ("method", "route"),
+    )
+)
+http_requests_in_progress = registry.register(
+    Gauge("http_requests_in_progress", "HTTP requests currently being handled.", ("method",))
+)
+admission_rejections_total = registry.register(
+    Counter(
+        "admission_rejections_total",
+        "Requests shed by admission control.",
+        ("reason",),
+    )
+)
+llm_request_duration_seconds = registry.register(
+    Histogram(
+        "llm_request_duration_seconds",
+        "Groq chat completion latency, excluding time queued for a slot.",
+        ("model", "mode", "outcome"),
+        buckets=LLM_BUCKETS,
+    )
+)
+llm_tokens_total = registry.register(
+    Counter("llm_tokens_total", "Tokens reported in completion usage.", ("model", "kind"))
+)
+analysis_fallbacks_total = registry.register(
+    Counter(
+        "analysis_fallbacks_total",
+        "Analyses answered without a parsed model JSON response.",
+        ("reason",),
+    )
+)
+mongodb_command_duration_seconds = registry.register(
+    Histogram(
+        "mongodb_command_duration_seconds",
+        "MongoDB command latency as reported by the driver.",
+        ("command", "collection", "outcome"),
+        buckets=DB_BUCKETS,
+    )
+)
+
+mongo_command_metrics = MongoCommandMetrics()
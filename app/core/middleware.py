@@ -0,0 +1,204 @@
+"""
+Middleware Module.
+
+This module provides pure ASGI middleware. Unlike ``BaseHTTPMiddleware``
+it does not wrap the response body, so streamed responses pass through
+untouched.
+"""
+
+import json
+import re
+import time
+import uuid
+
+from app.core.logging import logger, request_id_var
+from app.core.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_progress,
+    http_requests_total,
+)
+
+REQUEST_ID_HEADER = b"x-request-id"
+_VALID_REQUEST_ID = re.compile(r"^[A-Za-z0-9._\-]{1,128}$")
+
+
+class RequestIdMiddleware:
+    """
+    Assign every HTTP request an id for log correlation.
+
+    A well-formed ``X-Request-ID`` sent by the client (or a proxy in front
+    of it) is reused; otherwise a new id is generated. The id is exposed to
+    log records through ``request_id_var`` and echoed in the response.
+    """
+
+    def __init__(self, app):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application.
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == REQUEST_ID_HEADER:
+                candidate = value.decode("latin-1")
+                if _VALID_REQUEST_ID.match(candidate):
+                    request_id = candidate
+                break
+        if request_id is None:
+            request_id = uuid.uuid4().hex
+
+        async def send_with_request_id(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((REQUEST_ID_HEADER, request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = request_id_var.set(request_id)
+        try:
+            await self.app(scope, receive, send_with_request_id)
+        finally:
+            request_id_var.reset(token)
+
+
+class MetricsMiddleware:
+    """
+    Record request counts, latency and concurrency.
+
+    Requests are labelled with the matched route template rather than the
+    raw path, so ids in URLs do not create new series.
+    """
+
+    def __init__(self, app):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application.
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_progress = http_requests_in_progress.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            http_request_duration_seconds.labels(method, route).observe(elapsed)
+            http_requests_total.labels(method, route, status).inc()
+
+
+class AdmissionMiddleware:
+    """
+    Shed requests over their rate limit or the in-flight cap.
+
+    Only paths under ``path_prefix`` are controlled. The check runs before
+    the request body is read, and a rejected request gets an immediate 429
+    with ``Retry-After``. Bearer tokens are resolved to a user with
+    ``identify`` so authenticated requests draw from their user's bucket.
+    Requests to ``long_lived_paths`` (e.g. live feeds) are rate limited but
+    give their in-flight slot back once admitted, since they are capped
+    separately and would otherwise hold slots for hours.
+    """
+
+    def __init__(
+        self,
+        app,
+        controller,
+        identify,
+        path_prefix: str = "/records",
+        long_lived_paths: tuple[str, ...] = (),
+    ):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: The wrapped ASGI application.
+            controller: ``AdmissionController`` making the decisions.
+            identify: Coroutine function returning the user for a bearer
+                token (with an ``id``), or None.
+            path_prefix: Path prefix of the controlled routes.
+            long_lived_paths: Paths not counted against the in-flight cap.
+        """
+        self.app = app
+        self.controller = controller
+        self.identify = identify
+        self.path_prefix = path_prefix
+        self.long_lived_paths = long_lived_paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        user_id = await self._user_id(scope)
+        rejection = await self.controller.acquire(client[0] if client else "unknown", user_id)
+        if rejection is not None:
+            reason, retry_after = rejection
+            await self._reject(send, reason, retry_after)
+            return
+        if scope["path"] in self.long_lived_paths:
+            self.controller.release()
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+    async def _user_id(self, scope):
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme != "Bearer" or not token:
+                    return None
+                try:
+                    user = await self.identify(token)
+                except Exception as e:
+                    logger.error("Could not identify user for admission control: %s", e)
+                    return None
+                return user.id if user else None
+        return None
+
+    async def _reject(self, send, reason, retry_after):
+        detail = "Server is busy" if reason == "in_flight" else "Rate limit exceeded"
+        body = json.dumps({"detail": detail}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,71 @@
+"""
+Keyset Pagination Module.
+
+This module encodes and decodes the opaque cursors used to page through
+collections sorted by ``(created_at, _id)`` in descending order.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+
+def encode_cursor(created_at: datetime, object_id: ObjectId) -> str:
+    """
+    Encode the position after a document as an opaque cursor.
+
+    Args:
+        created_at: Creation time of the last document on the page.
+        object_id: ``_id`` of the last document on the page.
+
+    Returns:
+        str: URL-safe cursor token.
+    """
+    payload = json.dumps({"t": created_at.isoformat(), "id": str(object_id)})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, ObjectId]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor: Cursor token.
+
+    Returns:
+        tuple: Creation time and ``_id`` of the last document already returned.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except (ValueError, KeyError, TypeError, InvalidId) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def after_cursor_filter(cursor: str) -> dict:
+    """
+    Build the query matching documents after a cursor in descending order.
+
+    Args:
+        cursor: Cursor token.
+
+    Returns:
+        dict: MongoDB filter on ``(created_at, _id)``.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    created_at, object_id = decode_cursor(cursor)
+    return {
+        "$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": object_id}},
+        ]
+    }
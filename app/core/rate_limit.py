@@ -0,0 +1,265 @@
+"""
+Rate Limiting Module.
+
+This module provides admission control for the API: token buckets keyed by
+client IP or user, kept in process memory or shared by all workers through
+a Redis-compatible server, and a cap on the requests each worker serves at
+once. Requests over either limit are rejected immediately with a hint of
+when to retry, instead of queueing until they time out.
+"""
+
+import math
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.core.metrics import admission_rejections_total
+from app.core.redis import RedisClient
+
+# Token bucket update run atomically on the server. State is a hash of the
+# remaining tokens and the last update time, expiring once it would be full.
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RateLimitBackend(ABC):
+    """Base class for token bucket storage backends."""
+
+    @abstractmethod
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """
+        Take one token from the bucket at ``key``.
+
+        Args:
+            key: Bucket key.
+            rate: Tokens added per second.
+            burst: Bucket capacity.
+
+        Returns:
+            float: 0 if a token was taken, otherwise seconds until one is available.
+        """
+
+    async def close(self) -> None:
+        """Release resources held by the backend."""
+        return None
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Process-local token buckets with bounded memory.
+
+    Buckets are kept in least-recently-used order; past ``max_keys`` the
+    least recently used one is dropped, which only forgets a bucket that
+    has been refilling the longest.
+    """
+
+    def __init__(self, max_keys: int):
+        """
+        Initialize the backend.
+
+        Args:
+            max_keys: Maximum number of buckets kept.
+        """
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Token buckets shared by all workers through a Redis-compatible server.
+
+    Each take runs as a single server-side script, so concurrent workers
+    never overdraw a bucket.
+    """
+
+    def __init__(self, client: RedisClient, prefix: str = "ratelimit:"):
+        """
+        Initialize the backend.
+
+        Args:
+            client: Redis client.
+            prefix: Key prefix for buckets.
+        """
+        self.client = client
+        self.prefix = prefix
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        wait = await self.client.execute(
+            "EVAL", _TOKEN_BUCKET_SCRIPT, 1, self.prefix + key, rate, burst
+        )
+        return float(wait)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def create_rate_limit_backend(backend: str) -> RateLimitBackend:
+    """
+    Build the rate limit backend selected in the settings.
+
+    Args:
+        backend: ``"memory"`` or ``"redis"``.
+
+    Returns:
+        RateLimitBackend: The configured backend.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    if backend == "memory":
+        return InMemoryRateLimitBackend(max_keys=settings.rate_limit_max_keys)
+    if backend == "redis":
+        return RedisRateLimitBackend(RedisClient(settings.redis_url))
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+class AdmissionController:
+    """
+    Decide whether a request is served or shed.
+
+    Authenticated requests draw from their user's bucket and anonymous ones
+    from their client IP's bucket. Admitted requests also count against
+    ``max_in_flight`` until released. If the backend fails, requests are
+    admitted rather than rejected.
+
+    Attributes:
+        backend: Token bucket storage.
+        in_flight: Number of admitted requests not yet released.
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        ip_rate: float,
+        ip_burst: int,
+        user_rate: float,
+        user_burst: int,
+        max_in_flight: int,
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            backend: Token bucket storage.
+            ip_rate: Requests per second allowed per anonymous client IP.
+            ip_burst: Requests an idle client IP may send at once.
+            user_rate: Requests per second allowed per user.
+            user_burst: Requests an idle user may send at once.
+            max_in_flight: Requests this worker serves at once.
+        """
+        self.backend = backend
+        self.ip_rate = ip_rate
+        self.ip_burst = ip_burst
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._admitted = 0
+        self._rejected = {"ip": 0, "user": 0, "in_flight": 0}
+
+    async def acquire(self, client_ip: str, user_id: Optional[str]) -> Optional[tuple[str, int]]:
+        """
+        Admit a request or tell why it is rejected.
+
+        Args:
+            client_ip: Address of the client.
+            user_id: Authenticated user id, or None for anonymous requests.
+
+        Returns:
+            tuple[str, int]: Rejection reason (``ip``, ``user`` or
+            ``in_flight``) and whole seconds to wait before retrying, or
+            None if the request was admitted and must be released.
+        """
+        if self.in_flight >= self.max_in_flight:
+            return self._reject("in_flight", 1.0)
+
+        if user_id is None:
+            reason, key, rate, burst = "ip", f"ip:{client_ip}", self.ip_rate, self.ip_burst
+        else:
+            reason, key, rate, burst = "user", f"user:{user_id}", self.user_rate, self.user_burst
+        try:
+            wait = await self.backend.take(key, rate, burst)
+        except Exception as e:
+            logger.error("Rate limit backend failed, admitting request: %s", e)
+            wait = 0.0
+        if wait > 0:
+            return self._reject(reason, wait)
+
+        self.in_flight += 1
+        self._admitted += 1
+        return None
+
+    def release(self) -> None:
+        """Release an admitted request."""
+        self.in_flight -= 1
+
+    def _reject(self, reason: str, wait: float) -> tuple[str, int]:
+        self._rejected[reason] += 1
+        admission_rejections_total.labels(reason).inc()
+        return reason, max(1, math.ceil(wait))
+
+    async def close(self) -> None:
+        """Release resources held by the backend."""
+        await self.backend.close()
+
+    def stats(self) -> dict:
+        """
+        Return admission statistics.
+
+        Returns:
+            dict: Requests in flight and its cap, admitted requests, and
+            rejections by reason.
+        """
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "admitted": self._admitted,
+            "rejected": dict(self._rejected),
+        }
+
+
+admission = AdmissionController(
+    backend=create_rate_limit_backend(settings.rate_limit_backend),
+    ip_rate=settings.rate_limit_ip_per_second,
+    ip_burst=settings.rate_limit_ip_burst,
+    user_rate=settings.rate_limit_user_per_second,
+    user_burst=settings.rate_limit_user_burst,
+    max_in_flight=settings.admission_max_in_flight,
+)
@@ -0,0 +1,151 @@
+"""
+Redis Client Module.
+
+This module provides a small asyncio client for the Redis protocol (RESP2)
+with a bounded connection pool. It covers the handful of commands the
+application needs without adding a driver dependency, and works with any
+Redis-compatible server.
+"""
+
+import asyncio
+from typing import Any, Optional
+from urllib.parse import unquote, urlparse
+
+
+class RedisError(Exception):
+    """Error reply returned by the server."""
+
+
+def _encode_command(args: tuple) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        if isinstance(arg, bytes):
+            data = arg
+        else:
+            data = str(arg).encode("utf-8")
+        parts.append(f"${len(data)}\r\n".encode())
+        parts.append(data)
+        parts.append(b"\r\n")
+    return b"".join(parts)
+
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by Redis server")
+    prefix, payload = line[:1], line[1:-2]
+
+    if prefix == b"+":
+        return payload.decode("utf-8")
+    if prefix == b"-":
+        raise RedisError(payload.decode("utf-8"))
+    if prefix == b":":
+        return int(payload)
+    if prefix == b"$":
+        length = int(payload)
+        if length == -1:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if prefix == b"*":
+        length = int(payload)
+        if length == -1:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise RedisError(f"Unexpected reply prefix: {prefix!r}")
+
+
+class RedisClient:
+    """
+    Asynchronous Redis client with a bounded connection pool.
+
+    Attributes:
+        host: Server host name.
+        port: Server port.
+        db: Database index selected on each connection.
+    """
+
+    def __init__(self, url: str, max_connections: int = 10):
+        """
+        Initialize the client.
+
+        Args:
+            url: Server URL, e.g. ``redis://:password@localhost:6379/0``.
+            max_connections: Maximum number of open connections.
+        """
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self._username = unquote(parsed.username) if parsed.username else None
+        self._password = unquote(parsed.password) if parsed.password else None
+        self._idle: list[tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(max_connections)
+
+    async def execute(self, *args) -> Any:
+        """
+        Send one command and return its decoded reply.
+
+        Args:
+            *args: Command name and arguments.
+
+        Returns:
+            Any: Reply value (``bytes`` for bulk strings).
+
+        Raises:
+            RedisError: If the server replies with an error.
+            ConnectionError: If the connection fails.
+        """
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else await self._connect()
+            reader, writer = connection
+            try:
+                writer.write(_encode_command(args))
+                await writer.drain()
+                reply = await _read_reply(reader)
+            except RedisError:
+                self._idle.append(connection)
+                raise
+            except BaseException:
+                writer.close()
+                raise
+            self._idle.append(connection)
+            return reply
+
+    async def _connect(self) -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            if self._password is not None:
+                auth = ("AUTH", self._username, self._password) if self._username else None
+                writer.write(_encode_command(auth or ("AUTH", self._password)))
+                await writer.drain()
+                await _read_reply(reader)
+            if self.db:
+                writer.write(_encode_command(("SELECT", self.db)))
+                await writer.drain()
+                await _read_reply(reader)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def get(self, key: str) -> Optional[bytes]:
+        """Return the value stored at ``key``, or None."""
+        return await self.execute("GET", key)
+
+    async def set(self, key: str, value: Any, px: Optional[int] = None) -> None:
+        """Store ``value`` at ``key``, optionally expiring after ``px`` milliseconds."""
+        if px is None:
+            await self.execute("SET", key, value)
+        else:
+            await self.execute("SET", key, value, "PX", px)
+
+    async def delete(self, key: str) -> int:
+        """Delete ``key`` and return the number of keys removed."""
+        return await self.execute("DEL", key)
+
+    async def close(self) -> None:
+        """Close every idle connection."""
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
@@ -0,0 +1,169 @@
+"""
+Resilience Module.
+
+This module provides the building blocks used to protect calls to external
+services: jittered exponential backoff, a retry budget that caps retries to
+a fraction of regular traffic, and a circuit breaker that fails fast while
+a dependency is down and probes it before resuming traffic.
+"""
+
+import random
+import time
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """
+    Return a jittered exponential backoff delay.
+
+    Args:
+        attempt: Number of the retry, starting at 1.
+        base: Delay before the first retry.
+        maximum: Upper bound before jitter.
+
+    Returns:
+        float: Seconds to wait, between half and all of the capped delay.
+    """
+    delay = min(maximum, base * 2 ** (attempt - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class RetryBudget:
+    """
+    Token bucket limiting extra attempts to a fraction of requests.
+
+    Every request deposits ``ratio`` tokens and every retry (or hedge)
+    spends one, so when a dependency fails across the board the extra load
+    stays bounded instead of multiplying traffic.
+
+    Attributes:
+        ratio: Tokens earned per request.
+        max_tokens: Bucket capacity, which bounds bursts of retries.
+        spent: Number of retries granted.
+        denied: Number of retries refused for lack of budget.
+    """
+
+    def __init__(self, ratio: float, max_tokens: float = 10.0, initial: float = 1.0):
+        """
+        Initialize the budget.
+
+        Args:
+            ratio: Tokens earned per request.
+            max_tokens: Bucket capacity.
+            initial: Tokens available at start.
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = min(initial, max_tokens)
+        self.spent = 0
+        self.denied = 0
+
+    def deposit(self) -> None:
+        """Earn budget for one request."""
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """Spend budget for one retry, if any is left."""
+        if self.tokens < 1.0:
+            self.denied += 1
+            return False
+        self.tokens -= 1.0
+        self.spent += 1
+        return True
+
+    def stats(self) -> dict:
+        """
+        Return budget statistics.
+
+        Returns:
+            dict: Tokens available, retries granted and retries denied.
+        """
+        return {"tokens": round(self.tokens, 3), "spent": self.spent, "denied": self.denied}
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker with half-open probing.
+
+    The circuit opens after ``failure_threshold`` consecutive failures and
+    rejects calls for ``reset_timeout`` seconds. Then a single probe call
+    is let through: its success closes the circuit, its failure opens it
+    again.
+
+    Attributes:
+        state: ``closed``, ``open`` or ``half_open``.
+        rejected: Number of calls refused while open.
+        opened: Number of times the circuit opened.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        """
+        Initialize a closed circuit.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit.
+            reset_timeout: Seconds to stay open before probing.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.rejected = 0
+        self.opened = 0
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+
+    def allow(self) -> bool:
+        """
+        Decide whether a call may proceed.
+
+        Returns:
+            bool: False while open, or while a half-open probe is running.
+        """
+        if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = "half_open"
+            self._probing = False
+        if self.state == "closed":
+            return True
+        if self.state == "half_open" and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit."""
+        self.state = "closed"
+        self._failures = 0
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit past the threshold."""
+        self._failures += 1
+        if self.state == "half_open" or self._failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opened += 1
+            self.state = "open"
+            self._opened_at = time.monotonic()
+            self._probing = False
+
+    def release(self) -> None:
+        """Record a call that ended without a verdict (e.g. cancelled)."""
+        self._probing = False
+
+    def stats(self) -> dict:
+        """
+        Return breaker statistics.
+
+        Returns:
+            dict: State, consecutive failures, times opened and calls rejected.
+        """
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,52 @@
+"""
+JSON Serialization Module.
+
+This module encodes API payloads straight to JSON bytes. ``orjson`` is used
+when it is installed; otherwise the standard library encoder produces the
+same output. ObjectIds are rendered as strings and datetimes in the same
+ISO 8601 form pydantic uses, so fast-path responses match validated ones.
+"""
+
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+from bson import ObjectId
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def _isoformat(value: datetime) -> str:
+    text = value.isoformat()
+    if value.utcoffset() is not None and value.utcoffset() == timezone.utc.utcoffset(None):
+        return text[: -len("+00:00")] + "Z"
+    return text
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return _isoformat(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode a value as compact UTF-8 JSON.
+
+    Args:
+        value: Dicts, lists and scalars, possibly containing ObjectIds and
+            datetimes.
+
+    Returns:
+        bytes: The encoded document.
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_UTC_Z)
+    return json.dumps(value, default=_default, separators=(",", ":"), ensure_ascii=False).encode(
+        "utf-8"
+    )
@@ -0,0 +1,78 @@
+"""
+Request Coalescing Module.
+
+This module provides single-flight execution: concurrent callers asking for
+the same key share one in-flight operation and all receive its result.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into a single execution.
+
+    The shared operation runs in its own task. A caller that is cancelled
+    stops waiting without affecting the others; the operation itself is
+    cancelled only once every caller has gone away. Errors raised by the
+    operation are re-raised to every caller.
+
+    Attributes:
+        coalesced: Number of calls that joined an already running operation.
+    """
+
+    def __init__(self):
+        """Initialize an empty flight table."""
+        self._flights: dict[str, _Flight] = {}
+        self.coalesced = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``fn`` for ``key``, or join the run already in progress.
+
+        Args:
+            key: Identity of the operation (e.g. a prompt fingerprint).
+            fn: Zero-argument coroutine factory performing the operation.
+
+        Returns:
+            Any: The result of the shared operation.
+
+        Raises:
+            Exception: Whatever the shared operation raised.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task: self._forget(key, flight))
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def stats(self) -> dict:
+        """
+        Return coalescing statistics.
+
+        Returns:
+            dict: Number of operations in flight and calls coalesced so far.
+        """
+        return {"in_flight": len(self._flights), "coalesced": self.coalesced}
@@ -0,0 +1,34 @@
+"""
+Server-Sent Events Module.
+
+This module formats messages for ``text/event-stream`` responses.
+"""
+
+import json
+from typing import Any, Optional
+
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_sse(data: Any, event: Optional[str] = None, event_id: Optional[str] = None) -> str:
+    """
+    Format one server-sent event.
+
+    Args:
+        data: Event payload; anything that is not a string is JSON encoded.
+        event: Optional event name.
+        event_id: Optional event id, echoed back by clients as ``Last-Event-ID``.
+
+    Returns:
+        str: The encoded event, terminated by a blank line.
+    """
+    if not isinstance(data, str):
+        data = json.dumps(data, separators=(",", ":"))
+
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event is not None:
+        lines.append(f"event: {event}")
+    lines.extend(f"data: {line}" for line in data.split("\n"))
+    return "\n".join(lines) + "\n\n"
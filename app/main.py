@@ -5,13 +5,23 @@ This module initializes the FastAPI application and configures
 the database connection lifecycle and API routes.
 """
 
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Response
 
 from app.core.config import settings
-from app.core.database import close_mongo_connection, connect_to_mongo
+from app.core.database import close_mongo_connection, connect_to_mongo, ensure_indexes
+from app.core.metrics import CONTENT_TYPE, registry
+from app.core.middleware import AdmissionMiddleware, MetricsMiddleware, RequestIdMiddleware
+from app.core.rate_limit import admission
 from app.routes import auth, records
+from app.services.analytics_service import record_summaries
+from app.services.container import get_ai_service, services
+from app.services.email_outbox import email_outbox
+from app.services.import_service import record_importer
+from app.services.job_service import record_jobs
+from app.services.record_feed import record_feed
 
 
 @asynccontextmanager
@@ -19,7 +29,9 @@ async def lifespan(app: FastAPI):
     """
     Manage application lifecycle events.
 
-    Handles database connection on startup and disconnection on shutdown.
+    Handles database connection, index creation, background maintenance
+    tasks and the saved semantic cache index on startup, and their shutdown
+    in reverse order.
 
     Args:
         app: The FastAPI application instance.
@@ -28,11 +40,40 @@ async def lifespan(app: FastAPI):
         None: Control is passed to the application.
     """
     await connect_to_mongo()
+    await ensure_indexes()
+    await services.auth_service.otp_storage.start()
+    await email_outbox.start()
+    await record_jobs.start()
+    await record_feed.start()
+    semantic_index = None
+    if settings.semantic_cache_enabled and settings.semantic_cache_path:
+        # Imported here so NumPy is only loaded when the index is persisted.
+        from app.services.semantic_cache import semantic_cache
+
+        if semantic_cache.available:
+            semantic_index = semantic_cache
+            await asyncio.to_thread(semantic_index.load, settings.semantic_cache_path)
     yield
+    if semantic_index is not None:
+        await asyncio.to_thread(semantic_index.save, settings.semantic_cache_path)
+    await record_feed.close()
+    await record_jobs.close()
+    await email_outbox.close()
+    await services.auth_service.otp_storage.close()
+    await admission.close()
     await close_mongo_connection()
 
 
 app = FastAPI(title=settings.app_name, version=settings.version, lifespan=lifespan)
+if settings.rate_limit_enabled:
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=admission,
+        identify=lambda token: services.auth_service.get_current_user(token),
+        long_lived_paths=("/records/feed",),
+    )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestIdMiddleware)
 
 app.include_router(auth.router)
 app.include_router(records.router)
@@ -51,3 +92,46 @@ async def root():
         "version": settings.version,
         "docs": "/docs",
     }
+
+
+@app.get("/stats")
+async def stats(ai_service=Depends(get_ai_service)):
+    """
+    Operational statistics endpoint.
+
+    Returns:
+        dict: Runtime statistics for admission control, the LLM concurrency
+            pool, request coalescing, model routing, circuit breaker and
+            retry budget, analysis caches, email outbox, record jobs, record
+            imports, the live record feed and record analytics updates.
+    """
+    return {
+        "admission": admission.stats(),
+        "llm_pool": ai_service.limiter.stats(),
+        "llm_coalescing": ai_service.inflight.stats(),
+        "llm_routing": ai_service.router.stats(),
+        "llm_resilience": {
+            "circuit": ai_service.breaker.stats(),
+            "retry_budget": ai_service.retry_budget.stats(),
+        },
+        "analysis_cache": ai_service.cache.stats() if ai_service.cache else None,
+        "semantic_cache": (
+            ai_service.semantic_cache.stats() if ai_service.semantic_cache else None
+        ),
+        "email_outbox": email_outbox.stats(),
+        "record_jobs": record_jobs.stats(),
+        "record_imports": record_importer.stats(),
+        "record_feed": record_feed.stats(),
+        "record_analytics": record_summaries.stats(),
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics endpoint.
+
+    Returns:
+        Response: Request, LLM and database metrics in the text exposition format.
+    """
+    return Response(registry.render(), media_type=CONTENT_TYPE)
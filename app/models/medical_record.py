@@ -1,5 +1,5 @@
-from datetime import datetime
-from typing import Any, Dict, Optional
+from datetime import date, datetime
+from typing import Any, Dict, Literal, Optional
 
 from pydantic import BaseModel
 
@@ -15,6 +15,14 @@ class PatientData(BaseModel):
 class MedicalAnalysis(BaseModel):
     analysis: str
     recommendations: list[str]
+    degraded: bool = False
+    similarity: Optional[float] = None
+
+
+class PromptStats(BaseModel):
+    input_tokens: int
+    max_tokens: int
+    compacted: bool = False
 
 
 class MedicalRecordCreate(BaseModel):
@@ -24,9 +32,49 @@ class MedicalRecordCreate(BaseModel):
 class MedicalRecord(BaseModel):
     id: str
     patient_data: PatientData
-    ai_analysis: MedicalAnalysis
+    ai_analysis: Optional[MedicalAnalysis] = None
     created_at: datetime
     user_id: Optional[str] = None
+    status: Literal["pending", "completed", "failed"] = "completed"
+    prompt: Optional[PromptStats] = None
 
     class Config:
         from_attributes = True
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    import_id: str
+    rows: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: list[ImportRowError] = []
+    errors_truncated: bool = False
+
+
+class RecordJob(BaseModel):
+    job_id: str
+    status: Literal["pending", "completed", "failed"]
+    record: Optional[MedicalRecord] = None
+
+
+class DayCount(BaseModel):
+    day: date
+    count: int
+
+
+class TermCount(BaseModel):
+    term: str
+    count: int
+
+
+class RecordAnalytics(BaseModel):
+    total: int = 0
+    by_day: list[DayCount] = []
+    by_age_band: Dict[str, int] = {}
+    top_terms: list[TermCount] = []
+    updated_at: Optional[datetime] = None
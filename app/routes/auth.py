@@ -1,13 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
 from app.models.user import OTPVerify, Token, UserCreate
-from app.services.auth_service import auth_service
+from app.services.container import get_auth_service
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
 @router.post("/request-otp")
-async def request_otp(user: UserCreate):
+async def request_otp(user: UserCreate, auth_service=Depends(get_auth_service)):
     success = await auth_service.request_otp(user.email, user.name)
     if not success:
         raise HTTPException(status_code=500, detail="Failed to send OTP email")
@@ -15,7 +15,7 @@ async def request_otp(user: UserCreate):
 
 
 @router.post("/verify-otp", response_model=Token)
-async def verify_otp(otp_data: OTPVerify):
+async def verify_otp(otp_data: OTPVerify, auth_service=Depends(get_auth_service)):
     token = await auth_service.verify_otp(otp_data.email, otp_data.otp)
     if not token:
         raise HTTPException(status_code=401, detail="Invalid or expired OTP")
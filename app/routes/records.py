@@ -1,18 +1,44 @@
+import json
+import time
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, Header, HTTPException
+from bson import ObjectId
+from bson.errors import InvalidId
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pymongo.errors import BulkWriteError
 
+from app.core.conditional import conditional_json
+from app.core.config import settings
 from app.core.database import get_database
 from app.core.logging import logger
-from app.models.medical_record import MedicalAnalysis, MedicalRecord, PatientData
-from app.services.ai_service import ai_service
-from app.services.auth_service import auth_service
+from app.core.pagination import after_cursor_filter, encode_cursor
+from app.core.serialization import dumps
+from app.core.sse import SSE_HEADERS, format_sse
+from app.models.medical_record import (
+    ImportReport,
+    MedicalAnalysis,
+    MedicalRecord,
+    PatientData,
+    PromptStats,
+    RecordAnalytics,
+    RecordJob,
+)
+from app.services.analytics_service import record_summaries
+from app.services.container import get_ai_service, get_auth_service
+from app.services.export_service import export_filter, stream_export
+from app.services.import_service import csv_rows, iter_lines, ndjson_rows, record_importer
+from app.services.job_service import UNCLAIMED, record_jobs
+from app.services.prompt_builder import build_prompt
+from app.services.record_feed import record_feed
 
 router = APIRouter(prefix="/records", tags=["Medical Records"])
 
 
-async def get_current_user_from_token(authorization: Optional[str] = Header(None)):
+async def get_current_user_from_token(
+    authorization: Optional[str] = Header(None), auth_service=Depends(get_auth_service)
+):
     if not authorization or not authorization.startswith("Bearer "):
         logger.warning("Authentication failed: Missing or invalid authorization header")
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -24,29 +50,178 @@ async def get_current_user_from_token(authorization: Optional[str] = Header(None
     return user
 
 
+def build_record_doc(
+    patient_data: PatientData, analysis: Optional[MedicalAnalysis], user_id: str
+) -> dict:
+    now = datetime.now(timezone.utc)
+    doc = {
+        "patient_data": patient_data.model_dump(),
+        "ai_analysis": analysis.model_dump() if analysis else None,
+        "created_at": now,
+        "user_id": user_id,
+        "status": "completed" if analysis else "pending",
+        "prompt": build_prompt(patient_data)[1].model_dump(),
+    }
+    if analysis is None:
+        doc["claimed_at"] = now
+    return doc
+
+
+def record_from_doc(doc: dict) -> MedicalRecord:
+    return MedicalRecord(
+        id=str(doc["_id"]),
+        patient_data=PatientData(**doc["patient_data"]),
+        ai_analysis=MedicalAnalysis(**doc["ai_analysis"]) if doc.get("ai_analysis") else None,
+        created_at=doc["created_at"],
+        user_id=doc.get("user_id"),
+        status=doc.get("status", "completed"),
+        prompt=PromptStats(**doc["prompt"]) if doc.get("prompt") else None,
+    )
+
+
+def record_payload(doc: dict) -> dict:
+    # Fast read path: shapes a stored document like MedicalRecord without
+    # validating it, for documents this API wrote through build_record_doc.
+    patient = doc["patient_data"]
+    analysis = doc.get("ai_analysis")
+    return {
+        "id": str(doc["_id"]),
+        "patient_data": {
+            "patient_name": patient["patient_name"],
+            "age": patient["age"],
+            "symptoms": patient["symptoms"],
+            "medical_history": patient.get("medical_history"),
+            "additional_info": patient.get("additional_info"),
+        },
+        "ai_analysis": (
+            {
+                "analysis": analysis["analysis"],
+                "recommendations": analysis["recommendations"],
+                "degraded": analysis.get("degraded", False),
+                "similarity": analysis.get("similarity"),
+            }
+            if analysis
+            else None
+        ),
+        "created_at": doc["created_at"],
+        "user_id": doc.get("user_id"),
+        "status": doc.get("status", "completed"),
+        "prompt": doc.get("prompt"),
+    }
+
+
+def parse_object_id(value: str, detail: str) -> ObjectId:
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail=detail) from None
+
+
+def ndjson_line(payload: dict) -> str:
+    return json.dumps(payload, separators=(",", ":")) + "\n"
+
+
+def check_batch_size(patients: list[PatientData]):
+    if not patients:
+        raise HTTPException(status_code=422, detail="Batch must contain at least one patient")
+    if len(patients) > settings.batch_max_items:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch exceeds the maximum of {settings.batch_max_items} patients",
+        )
+
+
+async def sse_analysis_events(ai_service, patient_data: PatientData, on_result=None):
+    async for event, data in ai_service.stream_analysis(patient_data):
+        if event != "result":
+            yield format_sse(data, event=event)
+        elif on_result is None:
+            yield format_sse(data.model_dump(), event="result")
+        else:
+            yield format_sse(await on_result(data), event="result")
+
+
+def sse_response(events) -> StreamingResponse:
+    return StreamingResponse(events, media_type="text/event-stream", headers=SSE_HEADERS)
+
+
 @router.post("/analyze")
-async def analyze_patient(patient_data: PatientData) -> MedicalAnalysis:
-    logger.info(f"Received analysis request for patient: {patient_data.patient_name}")
+async def analyze_patient(
+    patient_data: PatientData, stream: bool = False, ai_service=Depends(get_ai_service)
+) -> MedicalAnalysis:
+    logger.info("Received analysis request for patient: %s", patient_data.patient_name)
+    if stream:
+        return sse_response(sse_analysis_events(ai_service, patient_data))
     analysis = await ai_service.analyze_patient_data(patient_data)
     return analysis
 
 
-@router.post("", response_model=MedicalRecord)
-async def create_record(patient_data: PatientData, user=Depends(get_current_user_from_token)):
-    logger.info(f"Creating medical record for user: {user.email}")
+@router.post("/analyze/batch")
+async def analyze_batch(patients: list[PatientData], ai_service=Depends(get_ai_service)):
+    check_batch_size(patients)
+    logger.info("Received batch analysis request for %s patients", len(patients))
+
+    async def stream():
+        async for index, analysis in ai_service.analyze_many(patients, settings.batch_concurrency):
+            yield ndjson_line({"index": index, "analysis": analysis.model_dump()})
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.post(
+    "",
+    response_model=MedicalRecord,
+    responses={202: {"model": RecordJob, "description": "Analysis queued (mode=async)"}},
+)
+async def create_record(
+    patient_data: PatientData,
+    stream: bool = False,
+    mode: str = Query("sync", pattern="^(sync|async)$"),
+    user=Depends(get_current_user_from_token),
+    ai_service=Depends(get_ai_service),
+):
+    logger.info("Creating medical record for user: %s", user.email)
     db = get_database()
 
-    analysis = await ai_service.analyze_patient_data(patient_data)
+    if mode == "async":
+        if stream:
+            raise HTTPException(status_code=400, detail="stream is not supported with mode=async")
+        if record_jobs.full():
+            raise HTTPException(status_code=503, detail="Record job queue is full")
 
-    record_doc = {
-        "patient_data": patient_data.model_dump(),
-        "ai_analysis": analysis.model_dump(),
-        "created_at": datetime.now(timezone.utc),
-        "user_id": user.id,
-    }
+        record_doc = build_record_doc(patient_data, None, user.id)
+        result = await db.medical_records.insert_one(record_doc)
+        await record_jobs.submit(result.inserted_id)
+        record_feed.publish(record_doc)
+        await record_summaries.add([record_doc])
+        logger.info("Pending medical record queued with ID: %s", result.inserted_id)
+
+        job = RecordJob(job_id=str(result.inserted_id), status="pending")
+        return JSONResponse(
+            status_code=202,
+            content=job.model_dump(),
+            headers={"Location": f"/records/jobs/{job.job_id}"},
+        )
+
+    if stream:
+
+        async def store(analysis: MedicalAnalysis) -> dict:
+            record_doc = build_record_doc(patient_data, analysis, user.id)
+            await db.medical_records.insert_one(record_doc)
+            record_feed.publish(record_doc)
+            await record_summaries.add([record_doc])
+            logger.info("Medical record created with ID: %s", record_doc["_id"])
+            return record_from_doc(record_doc).model_dump(mode="json")
+
+        return sse_response(sse_analysis_events(ai_service, patient_data, on_result=store))
+
+    analysis = await ai_service.analyze_patient_data(patient_data)
+    record_doc = build_record_doc(patient_data, analysis, user.id)
 
     result = await db.medical_records.insert_one(record_doc)
-    logger.info(f"Medical record created with ID: {result.inserted_id}")
+    record_feed.publish(record_doc)
+    await record_summaries.add([record_doc])
+    logger.info("Medical record created with ID: %s", result.inserted_id)
 
     return MedicalRecord(
         id=str(result.inserted_id),
@@ -54,27 +229,242 @@ async def create_record(patient_data: PatientData, user=Depends(get_current_user
         ai_analysis=analysis,
         created_at=record_doc["created_at"],
         user_id=user.id,
+        prompt=PromptStats(**record_doc["prompt"]),
     )
 
 
-@router.get("", response_model=list[MedicalRecord])
-async def get_all_records(user=Depends(get_current_user_from_token)):
-    logger.info(f"Fetching all records for user: {user.email}")
+@router.post("/batch")
+async def create_records_batch(
+    patients: list[PatientData],
+    user=Depends(get_current_user_from_token),
+    ai_service=Depends(get_ai_service),
+):
+    check_batch_size(patients)
+    logger.info("Creating %s medical records in batch for user: %s", len(patients), user.email)
+    db = get_database()
+
+    async def flush(chunk: list[tuple[int, dict]]):
+        docs = [doc for _, doc in chunk]
+        failed = {}
+        try:
+            await db.medical_records.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = error.get("errmsg", "Write failed")
+        except Exception as e:
+            logger.error("Batch insert failed: %s", e)
+            failed = dict.fromkeys(range(len(docs)), "Write failed")
+
+        logger.debug("Inserted %s of %s batch records", len(docs) - len(failed), len(docs))
+        await record_summaries.add(
+            [doc for position, doc in enumerate(docs) if position not in failed]
+        )
+        for position, (index, doc) in enumerate(chunk):
+            if position in failed:
+                yield ndjson_line({"index": index, "error": failed[position]})
+            else:
+                record_feed.publish(doc)
+                record = record_from_doc(doc)
+                yield ndjson_line({"index": index, "record": record.model_dump(mode="json")})
+
+    async def stream():
+        chunk = []
+        async for index, analysis in ai_service.analyze_many(patients, settings.batch_concurrency):
+            chunk.append((index, build_record_doc(patients[index], analysis, user.id)))
+            if len(chunk) >= settings.batch_insert_chunk_size:
+                async for line in flush(chunk):
+                    yield line
+                chunk = []
+        if chunk:
+            async for line in flush(chunk):
+                yield line
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.post("/import", response_model=ImportReport)
+async def import_records(
+    request: Request,
+    import_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    analysis: str = Query("none", pattern="^(none|deferred)$"),
+    user=Depends(get_current_user_from_token),
+):
+    # The request body is the raw file. With analysis=deferred records are
+    # stored pending and backfilled by the record job workers.
+    logger.info("Importing %s records for user: %s", import_format, user.email)
     db = get_database()
 
-    cursor = db.medical_records.find()
-    records = []
-
-    async for doc in cursor:
-        records.append(
-            MedicalRecord(
-                id=str(doc["_id"]),
-                patient_data=PatientData(**doc["patient_data"]),
-                ai_analysis=MedicalAnalysis(**doc["ai_analysis"]),
-                created_at=doc["created_at"],
-                user_id=doc.get("user_id"),
-            )
+    def make_doc(patient_data: PatientData) -> dict:
+        doc = build_record_doc(patient_data, None, user.id)
+        if analysis == "deferred":
+            doc["claimed_at"] = UNCLAIMED
+        else:
+            doc["status"] = "completed"
+            del doc["claimed_at"]
+        return doc
+
+    lines = iter_lines(request.stream(), settings.import_max_line_length)
+    if import_format == "csv":
+        rows = csv_rows(lines, settings.import_max_record_lines)
+    else:
+        rows = ndjson_rows(lines)
+    try:
+        report = await record_importer.run(
+            db.medical_records, rows, make_doc, on_inserted=record_summaries.add
         )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e)) from None
+
+    if analysis == "deferred" and report.inserted:
+        record_jobs.request_backfill()
+    return report
+
+
+@router.get("", response_model=list[MedicalRecord])
+async def get_all_records(
+    limit: int = Query(settings.records_page_size, ge=1, le=settings.records_max_page_size),
+    cursor: Optional[str] = None,
+    include_analysis: bool = True,
+    if_none_match: Optional[str] = Header(None),
+    user=Depends(get_current_user_from_token),
+):
+    logger.info("Fetching records page for user: %s", user.email)
+    db = get_database()
+
+    query = {}
+    if cursor:
+        try:
+            query = after_cursor_filter(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+    projection = None if include_analysis else {"ai_analysis": 0}
+    docs = (
+        await db.medical_records.find(query, projection)
+        .sort([("created_at", -1), ("_id", -1)])
+        .limit(limit + 1)
+        .to_list(length=limit + 1)
+    )
+
+    headers = {}
+    if len(docs) > limit:
+        docs = docs[:limit]
+        headers["X-Next-Cursor"] = encode_cursor(docs[-1]["created_at"], docs[-1]["_id"])
+
+    logger.debug("Retrieved %s records from database", len(docs))
+    return conditional_json(dumps([record_payload(doc) for doc in docs]), if_none_match, headers)
+
+
+@router.get("/analytics", response_model=RecordAnalytics)
+async def get_record_analytics(
+    days: int = Query(settings.analytics_default_days, ge=1, le=settings.analytics_max_days),
+    top_terms: int = Query(settings.analytics_top_terms, ge=0, le=100),
+    user=Depends(get_current_user_from_token),
+):
+    # Served from the user's summary document, maintained as records are
+    # stored, instead of aggregating medical_records.
+    logger.info("Fetching record analytics for user: %s", user.email)
+    return await record_summaries.read(user.id, days, top_terms)
+
+
+@router.get("/feed")
+async def follow_records(
+    last_event_id: Optional[str] = Header(None),
+    after: Optional[str] = None,
+    user=Depends(get_current_user_from_token),
+):
+    # Resumes after Last-Event-ID (sent by reconnecting EventSource clients)
+    # or the ``after`` record id.
+    resume = last_event_id or after
+    resume_id = parse_object_id(resume, "Invalid resume id") if resume else None
+    if record_feed.full():
+        raise HTTPException(status_code=503, detail="Too many feed subscribers")
+    logger.info("Record feed subscribed by user: %s", user.email)
+
+    async def events():
+        async for event, doc in record_feed.follow(user.id, resume_id):
+            if event == "record":
+                yield format_sse(
+                    dumps(record_payload(doc)).decode(), event="record", event_id=str(doc["_id"])
+                )
+            elif event == "heartbeat":
+                yield ": heartbeat\n\n"
+            else:
+                yield format_sse(doc, event=event)
+
+    return sse_response(events())
+
+
+@router.get("/export")
+async def export_records(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    after_id: Optional[str] = None,
+    user=Depends(get_current_user_from_token),
+):
+    logger.info("Exporting records as %s for user: %s", export_format, user.email)
+    db = get_database()
+
+    resume_after = parse_object_id(after_id, "Invalid after_id") if after_id else None
+
+    cursor = db.medical_records.find(
+        export_filter(start, end, resume_after),
+        sort=[("_id", 1)],
+        batch_size=settings.export_batch_size,
+    )
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_export(cursor, export_format, settings.export_chunk_bytes),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="medical_records.{export_format}"'},
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=RecordJob)
+async def get_record_job(
+    job_id: str,
+    wait: float = Query(0, ge=0, le=settings.record_job_max_wait_seconds),
+    user=Depends(get_current_user_from_token),
+):
+    record_id = parse_object_id(job_id, "Invalid job id")
+    db = get_database()
+    deadline = time.monotonic() + wait
+
+    while True:
+        doc = await db.medical_records.find_one({"_id": record_id, "user_id": user.id})
+        if doc is None:
+            raise HTTPException(status_code=404, detail="Job not found")
+
+        remaining = deadline - time.monotonic()
+        if doc.get("status") != "pending" or remaining <= 0:
+            break
+        await record_jobs.wait(record_id, timeout=min(remaining, 1.0))
+
+    record = record_from_doc(doc)
+    return RecordJob(
+        job_id=job_id,
+        status=record.status,
+        record=record if record.status != "pending" else None,
+    )
+
+
+@router.get("/{record_id}", response_model=MedicalRecord)
+async def get_record(
+    record_id: str,
+    include_analysis: bool = True,
+    if_none_match: Optional[str] = Header(None),
+    user=Depends(get_current_user_from_token),
+):
+    # The ETag hashes the encoded record, so it changes whenever the record
+    # (e.g. a pending analysis completing) or the projection does.
+    object_id = parse_object_id(record_id, "Invalid record id")
+    db = get_database()
+
+    projection = None if include_analysis else {"ai_analysis": 0}
+    doc = await db.medical_records.find_one({"_id": object_id, "user_id": user.id}, projection)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="Record not found")
 
-    logger.debug(f"Retrieved {len(records)} records from database")
-    return records
+    logger.debug("Fetched record %s for user: %s", record_id, user.email)
+    return conditional_json(dumps(record_payload(doc)), if_none_match)
@@ -5,14 +5,182 @@ This module provides AI-powered medical analysis using Groq's LLaMA models.
 It analyzes patient symptoms and provides recommendations.
 """
 
+import asyncio
 import json
 import re
+import time
+from collections import deque
 
-from groq import Groq
+from groq import (
+    APIConnectionError,
+    APITimeoutError,
+    AsyncGroq,
+    InternalServerError,
+    RateLimitError,
+)
+from pydantic import ValidationError
 
+from app.core.concurrency import ConcurrencyLimiter
 from app.core.config import settings
 from app.core.logging import logger
+from app.core.metrics import (
+    analysis_fallbacks_total,
+    llm_request_duration_seconds,
+    llm_tokens_total,
+)
+from app.core.resilience import CircuitBreaker, CircuitOpenError, RetryBudget, backoff_delay
+from app.core.singleflight import SingleFlight
 from app.models.medical_record import MedicalAnalysis, PatientData
+from app.services.analysis_cache import analysis_cache, analysis_cache_key
+from app.services.analysis_parser import IncrementalAnalysisParser
+from app.services.prompt_builder import build_prompt
+from app.services.semantic_cache import semantic_cache
+
+SYSTEM_PROMPT = "You are a helpful medical assistant providing general health information."
+
+# Errors that say the API is struggling rather than that the request is wrong:
+# they are retried and count against the circuit breaker.
+RETRYABLE_ERRORS = (TimeoutError, APIConnectionError, RateLimitError, InternalServerError)
+
+
+def _chunk_usage(chunk):
+    """Return the usage attached to a stream chunk (Groq sends it on the last one)."""
+    usage = getattr(chunk, "usage", None)
+    if usage is None:
+        usage = getattr(getattr(chunk, "x_groq", None), "usage", None)
+    return usage
+
+
+class StreamBackpressureError(Exception):
+    """Raised when a streaming client falls too far behind the model output."""
+
+
+class ModelRouter:
+    """
+    Choose the model for a prompt and the deadline for hedging it.
+
+    With the ``size`` policy, prompts up to ``threshold_tokens`` go to the
+    fast model and larger ones to the large model; the ``fixed`` policy
+    always uses the fast model. Recent successful latencies are kept per
+    model, and a request still running after the configured percentile of
+    them is hedged with a second identical request. Hedges are paced by a
+    token bucket so that at most ``max_ratio`` of requests are duplicated,
+    even when a whole model slows down.
+
+    Attributes:
+        hedges: Number of hedged requests sent.
+        hedge_wins: Number of hedged requests that answered first.
+    """
+
+    def __init__(
+        self,
+        policy: str,
+        fast_model: str,
+        large_model: str,
+        threshold_tokens: int,
+        hedging_enabled: bool,
+        hedge_percentile: float,
+        hedge_min_delay: float,
+        hedge_default_delay: float,
+        hedge_max_ratio: float,
+        window: int = 200,
+        min_samples: int = 20,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            policy: ``fixed`` or ``size``.
+            fast_model: Model for small prompts (and every prompt when fixed).
+            large_model: Model for prompts above ``threshold_tokens``.
+            threshold_tokens: Largest prompt sent to the fast model.
+            hedging_enabled: Whether slow requests are hedged.
+            hedge_percentile: Latency percentile used as the hedge deadline.
+            hedge_min_delay: Lower bound of the hedge deadline in seconds.
+            hedge_default_delay: Deadline used until enough samples exist.
+            hedge_max_ratio: Maximum fraction of requests that may be hedged.
+            window: Number of recent latencies kept per model.
+            min_samples: Samples needed before the percentile is trusted.
+        """
+        self.policy = policy
+        self.fast_model = fast_model
+        self.large_model = large_model
+        self.threshold_tokens = threshold_tokens
+        self.hedging_enabled = hedging_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_default_delay = hedge_default_delay
+        self.hedge_max_ratio = hedge_max_ratio
+        self.window = window
+        self.min_samples = min_samples
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._latencies: dict[str, deque] = {}
+        self._hedge_budget = RetryBudget(hedge_max_ratio)
+
+    def choose(self, input_tokens: int) -> str:
+        """Return the model for a prompt of ``input_tokens`` tokens."""
+        if self.policy == "size" and input_tokens > self.threshold_tokens:
+            return self.large_model
+        return self.fast_model
+
+    def observe(self, model: str, seconds: float) -> None:
+        """Record the latency of a successful request to ``model``."""
+        samples = self._latencies.get(model)
+        if samples is None:
+            samples = self._latencies[model] = deque(maxlen=self.window)
+        samples.append(seconds)
+
+    def percentile(self, model: str, fraction: float):
+        """Return a latency percentile for ``model``, or None without enough samples."""
+        samples = self._latencies.get(model)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def hedge_delay(self, model: str) -> float:
+        """Return how long to wait for ``model`` before hedging."""
+        latency = self.percentile(model, self.hedge_percentile)
+        if latency is None:
+            return self.hedge_default_delay
+        return max(self.hedge_min_delay, latency)
+
+    def admit(self) -> None:
+        """Earn hedge budget for one primary request."""
+        self._hedge_budget.deposit()
+
+    def try_hedge(self) -> bool:
+        """Spend hedge budget for one hedge, if any is left."""
+        if not self._hedge_budget.try_spend():
+            return False
+        self.hedges += 1
+        return True
+
+    def stats(self) -> dict:
+        """
+        Return routing and hedging statistics.
+
+        Returns:
+            dict: Policy, hedge counters, and per-model latency percentiles
+            and current hedge deadline.
+        """
+        return {
+            "policy": self.policy,
+            "hedging_enabled": self.hedging_enabled,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "models": {
+                model: {
+                    "samples": len(samples),
+                    "p50": self.percentile(model, 0.50),
+                    "p95": self.percentile(model, 0.95),
+                    "p99": self.percentile(model, 0.99),
+                    "hedge_delay": self.hedge_delay(model),
+                }
+                for model, samples in self._latencies.items()
+            },
+        }
 
 
 class AIService:
@@ -23,18 +191,59 @@ class AIService:
     and generate medical insights and recommendations.
 
     Attributes:
-        client: Groq API client instance.
+        client: Asynchronous Groq API client instance.
+        limiter: Bounds the number of in-flight completions.
+        cache: Exact-match analysis cache, or None when disabled.
+        semantic_cache: Near-duplicate analysis cache, or None when disabled.
+        inflight: Coalesces concurrent requests with the same prompt fingerprint.
+        router: Chooses the model per prompt and hedges slow requests.
+        breaker: Fails fast while the API keeps timing out or erroring.
+        retry_budget: Caps retries to a fraction of completion requests.
     """
 
     def __init__(self):
         """Initialize the AI service with Groq client."""
-        self.client = Groq(api_key=settings.groq_api_key)
+        self.client = AsyncGroq(
+            api_key=settings.groq_api_key,
+            timeout=settings.groq_timeout_seconds,
+            max_retries=0,
+        )
+        self.limiter = ConcurrencyLimiter(settings.groq_max_concurrency)
+        self.cache = analysis_cache if settings.analysis_cache_enabled else None
+        self.semantic_cache = None
+        if settings.semantic_cache_enabled:
+            if semantic_cache.available:
+                self.semantic_cache = semantic_cache
+            else:
+                logger.warning("Semantic cache disabled: NumPy is not installed")
+        self.inflight = SingleFlight()
+        self.router = ModelRouter(
+            policy=settings.model_routing_policy,
+            fast_model=settings.groq_model,
+            large_model=settings.groq_large_model,
+            threshold_tokens=settings.model_routing_threshold_tokens,
+            hedging_enabled=settings.hedging_enabled,
+            hedge_percentile=settings.hedge_percentile,
+            hedge_min_delay=settings.hedge_min_delay_seconds,
+            hedge_default_delay=settings.hedge_default_delay_seconds,
+            hedge_max_ratio=settings.hedge_max_ratio,
+        )
+        self.breaker = CircuitBreaker(
+            settings.circuit_failure_threshold, settings.circuit_reset_seconds
+        )
+        self.retry_budget = RetryBudget(settings.groq_retry_budget_ratio)
         logger.debug("AI Service initialized")
 
     async def analyze_patient_data(self, patient_data: PatientData) -> MedicalAnalysis:
         """
         Analyze patient data using AI and return medical insights.
 
+        Identical normalized inputs are answered from the analysis cache,
+        near-duplicates from the semantic cache when it is enabled, and
+        concurrent identical requests share a single completion. When the
+        model cannot be reached, or its circuit is open, a fallback marked
+        ``degraded`` is returned instead.
+
         Args:
             patient_data: Patient information including name, age, symptoms,
                          and medical history.
@@ -43,66 +252,408 @@ class AIService:
             MedicalAnalysis: Analysis results with recommendations.
         """
         logger.info(
-            f"Starting analysis for patient: {patient_data.patient_name}, age: {patient_data.age}"
+            "Starting analysis for patient: %s, age: %s",
+            patient_data.patient_name,
+            patient_data.age,
         )
-        logger.debug(f"Patient symptoms: {patient_data.symptoms}")
+        logger.debug("Patient symptoms: %s", patient_data.symptoms)
 
-        prompt = f"""You are a medical assistant. Analyze the following patient information and provide:
-1. A brief medical analysis
-2. A list of recommendations
+        params = self._completion_params(patient_data)
+        cache_key = analysis_cache_key(patient_data, params["model"])
+        cached = await self._cached_analysis(patient_data, cache_key, params["model"])
+        if cached is not None:
+            return cached
 
-Patient Information:
-- Name: {patient_data.patient_name}
-- Age: {patient_data.age}
-- Symptoms: {patient_data.symptoms}
-- Medical History: {patient_data.medical_history or 'None'}
+        try:
+            analysis = await self.inflight.do(
+                cache_key, lambda: self._analyze_uncached(patient_data, cache_key, params)
+            )
+        except CircuitOpenError:
+            logger.warning("Groq circuit open, serving degraded analysis")
+            analysis_fallbacks_total.labels("circuit_open").inc()
+            return self._fallback_analysis()
+        except Exception as e:
+            logger.error("AI analysis failed: %s", e)
+            analysis_fallbacks_total.labels("error").inc()
+            return self._fallback_analysis()
 
-Please respond in JSON format:
-{{
-    "analysis": "your analysis here",
-    "recommendations": ["recommendation 1", "recommendation 2", ...]
-}}
+        logger.info("Analysis completed successfully for patient: %s", patient_data.patient_name)
+        return analysis
 
-IMPORTANT: Provide general health advice only. This is not a substitute for professional medical diagnosis."""
+    async def stream_analysis(self, patient_data: PatientData):
+        """
+        Analyze patient data while streaming the model output.
 
+        Cached analyses are returned immediately as the final result.
+        Streams are not coalesced: every caller receives its own tokens.
+
+        Args:
+            patient_data: Patient information.
+
+        Yields:
+            tuple[str, Any]: ``("token", text)`` for raw completion text,
+            ``("analysis", delta)`` and ``("recommendation", item)`` as they are
+            parsed, ``("error", message)`` on failure, and finally
+            ``("result", MedicalAnalysis)``. A client more than
+            ``GROQ_STREAM_BUFFER_EVENTS`` events behind gets an error and no
+            result.
+        """
+        logger.info("Starting streamed analysis for patient: %s", patient_data.patient_name)
+
+        params = self._completion_params(patient_data)
+        cache_key = analysis_cache_key(patient_data, params["model"])
+        cached = await self._cached_analysis(patient_data, cache_key, params["model"])
+        if cached is not None:
+            yield "result", cached
+            return
+
+        events: asyncio.Queue = asyncio.Queue(settings.groq_stream_buffer_events)
+        reader = asyncio.create_task(self._read_stream(params, events))
         try:
-            logger.debug("Sending request to AI model")
-            chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are a helpful medical assistant providing general health information.",
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                model=settings.groq_model,
-                temperature=0.7,
-                max_tokens=1024,
-            )
+            while not (reader.done() and events.empty()):
+                getter = asyncio.ensure_future(events.get())
+                await asyncio.wait((getter, reader), return_when=asyncio.FIRST_COMPLETED)
+                if getter.done():
+                    yield getter.result()
+                else:
+                    getter.cancel()
+            analysis = self._parse_response(reader.result())
+        except CircuitOpenError:
+            logger.warning("Groq circuit open, serving degraded analysis")
+            analysis_fallbacks_total.labels("circuit_open").inc()
+            yield "error", "Analysis temporarily unavailable"
+            yield "result", self._fallback_analysis()
+            return
+        except StreamBackpressureError:
+            logger.warning("Dropped streaming client that fell behind the model output")
+            yield "error", "Client fell behind the analysis stream"
+            return
+        except Exception as e:
+            logger.error("Streamed AI analysis failed: %s", e)
+            analysis_fallbacks_total.labels("error").inc()
+            yield "error", "Analysis failed"
+            yield "result", self._fallback_analysis()
+            return
+        finally:
+            if not reader.done():
+                reader.cancel()
+                await asyncio.gather(reader, return_exceptions=True)
+
+        await self._store_analysis(patient_data, cache_key, params["model"], analysis)
+        logger.info("Streamed analysis completed for patient: %s", patient_data.patient_name)
+        yield "result", analysis
+
+    async def _read_stream(self, params: dict, events: asyncio.Queue) -> str:
+        """
+        Read a streamed completion, handing its events to ``events``.
+
+        Runs as its own task so the pool slot is held only while reading
+        from Groq: events are handed over without waiting, so a client that
+        stops reading never stalls the upstream read.
+
+        Args:
+            params: Completion parameters.
+            events: Bounded queue drained by the streaming client.
+
+        Returns:
+            str: The complete model output.
+
+        Raises:
+            CircuitOpenError: If the Groq circuit is open.
+            StreamBackpressureError: If ``events`` filled up because the
+                client fell behind.
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("Groq circuit is open")
+        parser = IncrementalAnalysisParser()
+        async with self.limiter.slot() as waited:
+            logger.debug("Streaming request to AI model after %.3fs in queue", waited)
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                async with asyncio.timeout(settings.groq_timeout_seconds):
+                    stream = await self.client.chat.completions.create(**params, stream=True)
+                    async for chunk in stream:
+                        self._record_usage(params["model"], _chunk_usage(chunk))
+                        text = chunk.choices[0].delta.content if chunk.choices else None
+                        if not text:
+                            continue
+                        events.put_nowait(("token", text))
+                        for event in parser.feed(text):
+                            events.put_nowait(event)
+                outcome = "success"
+            except asyncio.QueueFull:
+                self.breaker.release()
+                outcome = "cancelled"
+                raise StreamBackpressureError("Streaming client fell behind") from None
+            except BaseException as e:
+                outcome = self._settle_failure(e)
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                self._record_latency(params["model"], "stream", outcome, elapsed)
+            self.breaker.record_success()
+        return parser.text
+
+    async def analyze_many(self, patients: list[PatientData], concurrency: int):
+        """
+        Analyze several patients with bounded parallelism.
+
+        Results are yielded as soon as each analysis finishes, so they may
+        arrive out of input order.
+
+        Args:
+            patients: Patient information to analyze.
+            concurrency: Maximum number of analyses running at once.
+
+        Yields:
+            tuple[int, MedicalAnalysis]: Input index and its analysis.
+        """
+        pending = iter(enumerate(patients))
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def worker():
+            for index, patient_data in pending:
+                await results.put((index, await self.analyze_patient_data(patient_data)))
+
+        workers = [
+            asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, len(patients))))
+        ]
+        try:
+            for _ in range(len(patients)):
+                yield await results.get()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+    async def _analyze_uncached(
+        self, patient_data: PatientData, cache_key: str, params: dict
+    ) -> MedicalAnalysis:
+        """
+        Request a fresh analysis and store it in the caches.
 
-            response_text = chat_completion.choices[0].message.content
-            logger.debug("Received response from AI model")
-            json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
+        Runs once per prompt fingerprint no matter how many callers are
+        waiting for it.
 
-            if json_match:
-                result = json.loads(json_match.group())
+        Args:
+            patient_data: Patient information.
+            cache_key: Prompt fingerprint from ``analysis_cache_key``.
+            params: Completion arguments from ``_completion_params``.
+
+        Returns:
+            MedicalAnalysis: Parsed analysis.
+        """
+        analysis = await self._request_analysis(params)
+        await self._store_analysis(patient_data, cache_key, params["model"], analysis)
+        return analysis
+
+    async def _cached_analysis(self, patient_data: PatientData, cache_key: str, model: str):
+        """Return an exact or near-duplicate cached analysis, or None."""
+        if self.cache is not None:
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                logger.info("Analysis cache hit for patient: %s", patient_data.patient_name)
+                return cached
+        if self.semantic_cache is not None:
+            similar = self.semantic_cache.lookup(patient_data, model)
+            if similar is not None:
                 logger.info(
-                    f"Analysis completed successfully for patient: {patient_data.patient_name}"
+                    "Semantic cache hit for patient: %s (similarity %.3f)",
+                    patient_data.patient_name,
+                    similar.similarity,
                 )
-                return MedicalAnalysis(**result)
-            else:
-                logger.warning("AI response was not in expected JSON format, using raw response")
-                return MedicalAnalysis(
-                    analysis=response_text,
-                    recommendations=["Consult with a healthcare professional"],
+                return similar
+        return None
+
+    async def _store_analysis(
+        self, patient_data: PatientData, cache_key: str, model: str, analysis: MedicalAnalysis
+    ) -> None:
+        if self.cache is not None:
+            await self.cache.set(cache_key, analysis)
+        if self.semantic_cache is not None:
+            self.semantic_cache.add(patient_data, model, analysis)
+
+    def _completion_params(self, patient_data: PatientData) -> dict:
+        """
+        Build the chat completion arguments for an analysis request.
+
+        The prompt is compacted to the configured input budget and
+        ``max_tokens`` is sized to it by ``build_prompt``; the router picks
+        the model from the prompt size.
+
+        Args:
+            patient_data: Patient information.
+
+        Returns:
+            dict: Keyword arguments for ``chat.completions.create``.
+        """
+        prompt, stats = build_prompt(patient_data)
+        if stats.compacted:
+            logger.debug("Prompt compacted to %s tokens", stats.input_tokens)
+        return {
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "model": self.router.choose(stats.input_tokens),
+            "temperature": 0.7,
+            "max_tokens": stats.max_tokens,
+        }
+
+    async def _request_analysis(self, params: dict) -> MedicalAnalysis:
+        """
+        Call the model and parse its answer.
+
+        Timeouts and transient API errors are retried with jittered backoff,
+        up to ``groq_max_retries`` times and only while the retry budget
+        allows it, so an outage does not multiply the load on the API.
+
+        Args:
+            params: Completion arguments from ``_completion_params``.
+
+        Returns:
+            MedicalAnalysis: Parsed analysis.
+
+        Raises:
+            CircuitOpenError: If the circuit is open.
+            Exception: The last error raised by the Groq client.
+        """
+        self.retry_budget.deposit()
+        retries = 0
+        while True:
+            try:
+                chat_completion = await self._hedged_completion(params)
+                break
+            except RETRYABLE_ERRORS as e:
+                retries += 1
+                if retries > settings.groq_max_retries or not self.retry_budget.try_spend():
+                    raise
+                delay = backoff_delay(
+                    retries, settings.groq_retry_base_seconds, settings.groq_retry_max_seconds
                 )
+                logger.warning(
+                    "AI request failed (%s), retry %s in %.2fs", type(e).__name__, retries, delay
+                )
+                await asyncio.sleep(delay)
+        self._record_usage(params["model"], getattr(chat_completion, "usage", None))
 
-        except Exception as e:
-            logger.error(f"AI analysis failed: {e}")
-            return MedicalAnalysis(
-                analysis="Unable to analyze at this time. Please try again later.",
-                recommendations=["Consult with a healthcare professional if symptoms persist"],
-            )
+        logger.debug("Received response from AI model")
+        return self._parse_response(chat_completion.choices[0].message.content)
+
+    async def _hedged_completion(self, params: dict):
+        """
+        Run a completion, hedging it if it outlives the router's deadline.
+
+        The hedge is skipped when the concurrency pool has callers waiting,
+        since it would only queue behind them. Whichever attempt succeeds
+        first wins and the other is cancelled.
+
+        Args:
+            params: Completion arguments.
+
+        Returns:
+            The first successful chat completion.
+
+        Raises:
+            Exception: The last error, if every attempt failed.
+        """
+        model = params["model"]
+        self.router.admit()
+        primary = asyncio.ensure_future(self._attempt(params))
+        tasks = {primary}
+        try:
+            if self.router.hedging_enabled:
+                done, _ = await asyncio.wait(tasks, timeout=self.router.hedge_delay(model))
+                if not done and self.limiter.waiting == 0 and self.router.try_hedge():
+                    logger.debug("Hedging request to %s", model)
+                    tasks.add(asyncio.ensure_future(self._attempt(params)))
 
+            error = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.router.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
 
-ai_service = AIService()
+    async def _attempt(self, params: dict):
+        """Send one completion request within a concurrency slot and deadline."""
+        model = params["model"]
+        if not self.breaker.allow():
+            raise CircuitOpenError("Groq circuit is open")
+        async with self.limiter.slot() as waited:
+            logger.debug("Sending request to AI model after %.3fs in queue", waited)
+            start = time.perf_counter()
+            outcome = "error"
+            try:
+                async with asyncio.timeout(settings.groq_timeout_seconds):
+                    chat_completion = await self.client.chat.completions.create(**params)
+                outcome = "success"
+            except BaseException as e:
+                outcome = self._settle_failure(e)
+                raise
+            finally:
+                elapsed = time.perf_counter() - start
+                self._record_latency(model, "sync", outcome, elapsed)
+        self.breaker.record_success()
+        self.router.observe(model, elapsed)
+        return chat_completion
+
+    def _settle_failure(self, error: BaseException) -> str:
+        """Report a failed call to the circuit breaker and return its metric outcome."""
+        if isinstance(error, RETRYABLE_ERRORS):
+            self.breaker.record_failure()
+            return "timeout" if isinstance(error, (TimeoutError, APITimeoutError)) else "error"
+        self.breaker.release()
+        return "cancelled" if isinstance(error, asyncio.CancelledError) else "error"
+
+    def _record_latency(self, model: str, mode: str, outcome: str, seconds: float) -> None:
+        llm_request_duration_seconds.labels(model, mode, outcome).observe(seconds)
+
+    def _record_usage(self, model: str, usage) -> None:
+        """Count the prompt and completion tokens reported by the API, if any."""
+        if usage is None:
+            return
+        llm_tokens_total.labels(model, "prompt").inc(usage.prompt_tokens or 0)
+        llm_tokens_total.labels(model, "completion").inc(usage.completion_tokens or 0)
+
+    def _fallback_analysis(self) -> MedicalAnalysis:
+        """Return the answer served when the model cannot be reached."""
+        return MedicalAnalysis(
+            analysis="Unable to analyze at this time. Please try again later.",
+            recommendations=["Consult with a healthcare professional if symptoms persist"],
+            degraded=True,
+        )
+
+    def _parse_response(self, response_text: str) -> MedicalAnalysis:
+        """
+        Extract the JSON analysis from the model output.
+
+        Args:
+            response_text: Raw completion text.
+
+        Returns:
+            MedicalAnalysis: Parsed analysis, or the raw text when no valid
+            JSON analysis is found.
+        """
+        json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
+
+        if json_match:
+            try:
+                return MedicalAnalysis.model_validate(json.loads(json_match.group()))
+            except (json.JSONDecodeError, ValidationError) as e:
+                logger.debug("Rejected JSON in AI response: %s", e)
+
+        logger.warning("AI response was not in expected JSON format, using raw response")
+        analysis_fallbacks_total.labels("unparsed").inc()
+        return MedicalAnalysis(
+            analysis=response_text,
+            recommendations=["Consult with a healthcare professional"],
+        )
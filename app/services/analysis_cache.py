@@ -0,0 +1,208 @@
+"""
+Analysis Cache Module.
+
+This module caches AI analyses keyed by the normalized prompt inputs so
+identical triage requests are answered without another LLM call. A bounded
+in-process LRU is consulted first, optionally backed by a MongoDB collection
+with a TTL index so every worker shares the results.
+"""
+
+import hashlib
+import json
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.logging import logger
+from app.models.medical_record import MedicalAnalysis, PatientData
+from app.services.prompt_builder import select_additional_info
+
+ANALYSIS_CACHE_COLLECTION = "analysis_cache"
+_WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at but for from has have in is it of on or the to was with".split()
+)
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """
+    Normalize free text for cache keying.
+
+    Args:
+        value: Raw text, possibly None.
+
+    Returns:
+        str: Lower-cased text with collapsed whitespace.
+    """
+    if not value:
+        return ""
+    return " ".join(value.lower().split())
+
+
+def text_terms(value: Optional[str]) -> list[str]:
+    """
+    Split free text into comparable terms.
+
+    Words are lower-cased, stop words dropped and plural ``s`` stripped, so
+    "Headaches and fever" gives ``["headache", "fever"]``.
+
+    Args:
+        value: Raw text, possibly None.
+
+    Returns:
+        list[str]: Terms in the order they appear.
+    """
+    found = []
+    for word in _WORD.findall(normalize_text(value)):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        found.append(word)
+    return found
+
+
+def analysis_cache_key(patient_data: PatientData, model: str) -> str:
+    """
+    Derive the cache key for an analysis request.
+
+    Args:
+        patient_data: Patient information sent to the model.
+        model: Name of the model producing the analysis.
+
+    Returns:
+        str: Hex SHA-256 digest of the normalized prompt inputs and model.
+    """
+    payload = {
+        "model": model,
+        "age": patient_data.age,
+        "symptoms": normalize_text(patient_data.symptoms),
+        "medical_history": normalize_text(patient_data.medical_history),
+        "additional_info": select_additional_info(patient_data.additional_info),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Two-tier cache of medical analyses.
+
+    Attributes:
+        memory: In-process LRU tier.
+        mongo_enabled: Whether the shared MongoDB tier is consulted.
+        ttl_seconds: Lifetime of a cached analysis in both tiers.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, mongo_enabled: bool = False):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Capacity of the in-process tier.
+            ttl_seconds: Lifetime of a cached analysis.
+            mongo_enabled: Enable the shared MongoDB tier.
+        """
+        self.memory = TTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self.mongo_enabled = mongo_enabled
+        self.ttl_seconds = ttl_seconds
+        self.mongo_hits = 0
+        self.mongo_misses = 0
+        self.mongo_errors = 0
+
+    async def get(self, key: str) -> Optional[MedicalAnalysis]:
+        """
+        Look up an analysis, promoting shared-tier hits into memory.
+
+        Args:
+            key: Cache key from ``analysis_cache_key``.
+
+        Returns:
+            MedicalAnalysis: A copy of the cached analysis, or None.
+        """
+        cached = self.memory.get(key)
+        if cached is not None:
+            return cached.model_copy()
+
+        db = self._shared_db()
+        if db is None:
+            return None
+
+        try:
+            doc = await db[ANALYSIS_CACHE_COLLECTION].find_one(
+                {"_id": key, "expires_at": {"$gt": datetime.now(timezone.utc)}}
+            )
+        except Exception as e:
+            self.mongo_errors += 1
+            logger.warning("Analysis cache lookup failed: %s", e)
+            return None
+
+        if doc is None:
+            self.mongo_misses += 1
+            return None
+
+        self.mongo_hits += 1
+        analysis = MedicalAnalysis(**doc["analysis"])
+        self.memory.set(key, analysis)
+        return analysis.model_copy()
+
+    async def set(self, key: str, analysis: MedicalAnalysis) -> None:
+        """
+        Store an analysis in every enabled tier.
+
+        Args:
+            key: Cache key from ``analysis_cache_key``.
+            analysis: Analysis to cache.
+        """
+        self.memory.set(key, analysis.model_copy())
+
+        db = self._shared_db()
+        if db is None:
+            return
+
+        now = datetime.now(timezone.utc)
+        try:
+            await db[ANALYSIS_CACHE_COLLECTION].replace_one(
+                {"_id": key},
+                {
+                    "analysis": analysis.model_dump(),
+                    "created_at": now,
+                    "expires_at": now + timedelta(seconds=self.ttl_seconds),
+                },
+                upsert=True,
+            )
+        except Exception as e:
+            self.mongo_errors += 1
+            logger.warning("Analysis cache write failed: %s", e)
+
+    def _shared_db(self):
+        if not self.mongo_enabled:
+            return None
+        return get_database()
+
+    def stats(self) -> dict:
+        """
+        Return hit/miss statistics for both tiers.
+
+        Returns:
+            dict: In-memory tier stats plus shared-tier counters.
+        """
+        return {
+            "memory": self.memory.stats(),
+            "mongo": {
+                "enabled": self.mongo_enabled,
+                "hits": self.mongo_hits,
+                "misses": self.mongo_misses,
+                "errors": self.mongo_errors,
+            },
+        }
+
+
+analysis_cache = AnalysisCache(
+    max_entries=settings.analysis_cache_max_entries,
+    ttl_seconds=settings.analysis_cache_ttl_seconds,
+    mongo_enabled=settings.analysis_cache_mongo_enabled,
+)
@@ -0,0 +1,126 @@
+"""
+Incremental Analysis Parser Module.
+
+This module extracts the ``analysis`` text and ``recommendations`` items
+from a model answer while it is still being streamed, so clients can render
+them before the completion finishes.
+"""
+
+import json
+import re
+from typing import Optional
+
+_ANALYSIS_START = re.compile(r'"analysis"\s*:\s*"')
+_RECOMMENDATIONS_START = re.compile(r'"recommendations"\s*:\s*\[')
+
+
+def _scan_string(text: str, start: int) -> tuple[str, Optional[int]]:
+    """
+    Scan a JSON string body starting just after its opening quote.
+
+    Args:
+        text: Buffer holding the (possibly incomplete) JSON document.
+        start: Index of the first character inside the string.
+
+    Returns:
+        tuple: The raw body up to the last safely decodable character, and the
+        index just past the closing quote (None if the string is not closed yet).
+    """
+    i = start
+    while i < len(text):
+        char = text[i]
+        if char == '"':
+            return text[start:i], i + 1
+        if char == "\\":
+            width = 6 if text[i + 1 : i + 2] == "u" else 2
+            if i + width > len(text):
+                break
+            i += width
+            continue
+        i += 1
+    return text[start:i], None
+
+
+def _decode(raw: str) -> Optional[str]:
+    """
+    Decode a JSON string body.
+
+    Control characters are accepted as models often emit raw newlines. Other
+    invalid input, such as a ``\\'`` escape, gives None so the caller can skip
+    the event and leave the verdict to the final parse.
+    """
+    try:
+        return json.loads(f'"{raw}"', strict=False)
+    except json.JSONDecodeError:
+        return None
+
+
+class IncrementalAnalysisParser:
+    """
+    Parse a streamed ``{"analysis": ..., "recommendations": [...]}`` answer.
+
+    Attributes:
+        text: Everything fed so far.
+    """
+
+    def __init__(self):
+        """Initialize an empty parser."""
+        self.text = ""
+        self._analysis_sent = 0
+        self._recommendations_sent = 0
+
+    def feed(self, chunk: str) -> list[tuple[str, str]]:
+        """
+        Add streamed text and return what became available.
+
+        Args:
+            chunk: Next piece of the completion.
+
+        Returns:
+            list: ``("analysis", delta)`` events carrying new analysis text and
+            ``("recommendation", item)`` events for each completed item.
+        """
+        self.text += chunk
+        events = []
+
+        analysis = self._partial_analysis()
+        if analysis is not None and len(analysis) > self._analysis_sent:
+            events.append(("analysis", analysis[self._analysis_sent :]))
+            self._analysis_sent = len(analysis)
+
+        recommendations = self._complete_recommendations()
+        for item in recommendations[self._recommendations_sent :]:
+            events.append(("recommendation", item))
+        self._recommendations_sent = len(recommendations)
+
+        return events
+
+    def _partial_analysis(self) -> Optional[str]:
+        match = _ANALYSIS_START.search(self.text)
+        if match is None:
+            return None
+        raw, _ = _scan_string(self.text, match.end())
+        return _decode(raw)
+
+    def _complete_recommendations(self) -> list[str]:
+        match = _RECOMMENDATIONS_START.search(self.text)
+        if match is None:
+            return []
+
+        items = []
+        i = match.end()
+        while i < len(self.text):
+            char = self.text[i]
+            if char in " \t\r\n,":
+                i += 1
+            elif char == '"':
+                raw, end = _scan_string(self.text, i + 1)
+                if end is None:
+                    break
+                item = _decode(raw)
+                if item is not None:
+                    items.append(item)
+                i = end
+            else:
+                break
+        return items
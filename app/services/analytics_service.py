@@ -0,0 +1,267 @@
+"""
+Record Analytics Module.
+
+This module keeps one summary document per user in ``record_summaries``
+with their record count by creation day and by age band, and one counter
+document per user and symptom term in ``record_summary_terms``. Every
+stored record bumps its user's counters with atomic ``$inc`` upserts, so
+reading the analytics is a ``find_one`` by ``_id`` that projects only the
+requested days plus an indexed query for the top terms, however many
+records the user has and however varied their symptoms are.
+
+Summaries can be recomputed from ``medical_records``, e.g. after a failed
+update left them behind:
+
+    python -m app.services.analytics_service [--user USER_ID]
+"""
+
+import argparse
+import asyncio
+from collections import Counter, defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from app.core.config import settings
+from app.core.database import close_mongo_connection, connect_to_mongo, get_database
+from app.core.logging import logger
+from app.models.medical_record import DayCount, RecordAnalytics, TermCount
+from app.services.analysis_cache import text_terms
+
+SUMMARY_COLLECTION = "record_summaries"
+TERMS_COLLECTION = "record_summary_terms"
+# Fields of a stored record the summaries are computed from.
+SUMMARY_FIELDS = {"user_id": 1, "created_at": 1, "patient_data.age": 1, "patient_data.symptoms": 1}
+
+
+class RecordSummaries:
+    """
+    Incrementally maintained per-user record analytics.
+
+    Attributes:
+        enabled: Whether stored records update the summaries.
+        age_band_years: Width of an age band.
+        rebuild_batch_size: Records read per query when rebuilding.
+    """
+
+    def __init__(self, enabled: bool, age_band_years: int, rebuild_batch_size: int):
+        """
+        Initialize the summaries.
+
+        Args:
+            enabled: Whether stored records update the summaries.
+            age_band_years: Width of an age band.
+            rebuild_batch_size: Records read per query when rebuilding.
+        """
+        self.enabled = enabled
+        self.age_band_years = age_band_years
+        self.rebuild_batch_size = rebuild_batch_size
+        self._counters = {"updates": 0, "failed_updates": 0, "rebuilds": 0}
+
+    def age_band(self, age: int) -> str:
+        """Return the label of the age band containing ``age``, e.g. ``30-39``."""
+        low = max(age, 0) // self.age_band_years * self.age_band_years
+        return f"{low}-{low + self.age_band_years - 1}"
+
+    def increments(self, docs: Iterable[dict]) -> tuple[dict[str, Counter], Counter]:
+        """
+        Compute the counter increments of stored records.
+
+        A term is counted once per record however often it is repeated.
+
+        Args:
+            docs: Stored record documents.
+
+        Returns:
+            tuple: ``$inc`` fields of each user's summary by user id, and
+            record counts by ``(user_id, term)``.
+        """
+        grouped: dict[str, Counter] = defaultdict(Counter)
+        terms: Counter = Counter()
+        for doc in docs:
+            user_id = doc.get("user_id")
+            if user_id is None:
+                continue
+            patient = doc["patient_data"]
+            increments = grouped[user_id]
+            increments["total"] += 1
+            increments[f"days.{doc['created_at'].date().isoformat()}"] += 1
+            increments[f"age_bands.{self.age_band(patient['age'])}"] += 1
+            for term in set(text_terms(patient["symptoms"])):
+                if not term.isdigit():
+                    terms[user_id, term] += 1
+        return grouped, terms
+
+    async def _apply(self, docs: Iterable[dict]) -> None:
+        db = get_database()
+        now = datetime.now(timezone.utc)
+        summaries, terms = self.increments(docs)
+        writes = [
+            db[SUMMARY_COLLECTION].update_one(
+                {"_id": user_id},
+                {"$inc": dict(increments), "$set": {"updated_at": now}},
+                upsert=True,
+            )
+            for user_id, increments in summaries.items()
+        ]
+        if terms:
+            term_updates = [
+                UpdateOne(
+                    {"_id": f"{user_id}|{term}"},
+                    {"$inc": {"count": count}, "$setOnInsert": {"user_id": user_id, "term": term}},
+                    upsert=True,
+                )
+                for (user_id, term), count in terms.items()
+            ]
+            writes.append(db[TERMS_COLLECTION].bulk_write(term_updates, ordered=False))
+        await asyncio.gather(*writes)
+
+    async def add(self, docs: list[dict]) -> None:
+        """
+        Count newly stored records in their users' summaries.
+
+        Failures are logged rather than raised: the records are already
+        stored, and a rebuild brings the summaries back in line.
+
+        Args:
+            docs: Stored record documents.
+        """
+        if not self.enabled or not docs:
+            return
+        try:
+            await self._apply(docs)
+        except Exception as e:
+            self._counters["failed_updates"] += 1
+            logger.error("Failed to update record summaries: %s", e)
+            return
+        self._counters["updates"] += 1
+
+    async def read(
+        self, user_id: str, days: int, top_terms: int, today: Optional[date] = None
+    ) -> RecordAnalytics:
+        """
+        Read a user's analytics.
+
+        Args:
+            user_id: Owner of the records.
+            days: Number of days, ending today (UTC), to report counts for.
+            top_terms: Number of most frequent symptom terms to report.
+            today: Last reported day; defaults to the current UTC date.
+
+        Returns:
+            RecordAnalytics: Counts by day (oldest first, including days
+            without records), by age band and for the top symptom terms.
+        """
+        today = today or datetime.now(timezone.utc).date()
+        window = [(today - timedelta(days=offset)).isoformat() for offset in range(days)][::-1]
+        projection = {"total": 1, "age_bands": 1, "updated_at": 1}
+        projection.update({f"days.{day}": 1 for day in window})
+        db = get_database()
+        doc, top = await asyncio.gather(
+            db[SUMMARY_COLLECTION].find_one({"_id": user_id}, projection),
+            self._top_terms(db, user_id, top_terms),
+        )
+        doc = doc or {}
+
+        counts_by_day = doc.get("days", {})
+        age_bands = doc.get("age_bands", {})
+        return RecordAnalytics(
+            total=doc.get("total", 0),
+            by_day=[DayCount(day=day, count=counts_by_day.get(day, 0)) for day in window],
+            by_age_band=dict(
+                sorted(age_bands.items(), key=lambda item: int(item[0].split("-")[0]))
+            ),
+            top_terms=[TermCount(term=term["term"], count=term["count"]) for term in top],
+            updated_at=doc.get("updated_at"),
+        )
+
+    async def _top_terms(self, db, user_id: str, limit: int) -> list[dict]:
+        if limit == 0:
+            return []
+        return (
+            await db[TERMS_COLLECTION]
+            .find({"user_id": user_id}, {"term": 1, "count": 1})
+            .sort([("count", -1), ("term", 1)])
+            .limit(limit)
+            .to_list(length=limit)
+        )
+
+    async def rebuild(self, user_id: Optional[str] = None) -> int:
+        """
+        Recompute summaries from scratch from ``medical_records``.
+
+        Records are read in ``_id`` order up to an id taken when the rebuild
+        starts; records stored after that are counted by ``add`` as usual.
+        Records stored in the moment between taking that id and clearing the
+        summaries may be miscounted, so rebuild while writes are quiet.
+
+        Args:
+            user_id: Rebuild only this user's summary; all users when None.
+
+        Returns:
+            int: Number of records counted.
+        """
+        db = get_database()
+        boundary = ObjectId()
+        await db[SUMMARY_COLLECTION].delete_many({} if user_id is None else {"_id": user_id})
+        await db[TERMS_COLLECTION].delete_many({} if user_id is None else {"user_id": user_id})
+
+        query: dict = {} if user_id is None else {"user_id": user_id}
+        after = None
+        counted = 0
+        while True:
+            id_range = {"$lt": boundary} if after is None else {"$gt": after, "$lt": boundary}
+            docs = (
+                await db.medical_records.find({**query, "_id": id_range}, SUMMARY_FIELDS)
+                .sort("_id", 1)
+                .limit(self.rebuild_batch_size)
+                .to_list(length=self.rebuild_batch_size)
+            )
+            if docs:
+                await self._apply(docs)
+                counted += len(docs)
+            if len(docs) < self.rebuild_batch_size:
+                break
+            after = docs[-1]["_id"]
+
+        self._counters["rebuilds"] += 1
+        logger.info("Record summaries rebuilt from %s records", counted)
+        return counted
+
+    def stats(self) -> dict:
+        """
+        Return summary maintenance statistics.
+
+        Returns:
+            dict: Whether updates are enabled and update and rebuild counters.
+        """
+        return {"enabled": self.enabled, **self._counters}
+
+
+record_summaries = RecordSummaries(
+    enabled=settings.analytics_enabled,
+    age_band_years=settings.analytics_age_band_years,
+    rebuild_batch_size=settings.analytics_rebuild_batch_size,
+)
+
+
+async def _rebuild(user_id: Optional[str]) -> int:
+    await connect_to_mongo()
+    try:
+        return await record_summaries.rebuild(user_id)
+    finally:
+        await close_mongo_connection()
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild the per-user record analytics")
+    parser.add_argument("--user", help="rebuild only this user's summary")
+    args = parser.parse_args(argv)
+    counted = asyncio.run(_rebuild(args.user))
+    print(f"Rebuilt record summaries from {counted} records")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,16 +5,252 @@ This module handles user authentication using OTP (One-Time Password)
 verification via email and JWT token generation.
 """
 
+import asyncio
+import heapq
+import hmac
+import json
+from abc import ABC, abstractmethod
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 from jose import JWTError, jwt
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.database import get_database
 from app.core.logging import logger
+from app.core.redis import RedisClient
 from app.models.user import Token, User
-from app.services.email_service import email_service
+from app.services.container import services
+from app.services.email_outbox import email_outbox
+
+OTP_COLLECTION = "otp_codes"
+
+
+class OTPStore(ABC):
+    """
+    Base class for OTP storage backends.
+
+    Entries are dicts with ``otp``, ``name`` and ``expiry`` (an aware
+    datetime) keyed by email address. Backends never return an entry past
+    its expiry.
+    """
+
+    @abstractmethod
+    async def set(self, email: str, entry: dict) -> None:
+        """Store the pending OTP for ``email``, replacing any previous one."""
+
+    @abstractmethod
+    async def get(self, email: str) -> Optional[dict]:
+        """Return the live OTP entry for ``email``, or None."""
+
+    @abstractmethod
+    async def delete(self, email: str) -> None:
+        """Remove the OTP entry for ``email``."""
+
+    async def start(self) -> None:
+        """Start background maintenance, if the backend needs any."""
+        return None
+
+    async def close(self) -> None:
+        """Stop background maintenance and release resources."""
+        return None
+
+
+class InMemoryOTPStore(OTPStore):
+    """
+    Process-local OTP store with bounded memory.
+
+    Entries live in a dict for O(1) lookups. A min-heap ordered by expiry
+    lets expired entries be purged cheaply on every write and by a periodic
+    background sweep. When ``max_entries`` is reached the entries closest to
+    expiry are evicted first.
+
+    Attributes:
+        max_entries: Maximum number of pending OTPs kept.
+        sweep_interval: Seconds between background sweeps.
+    """
+
+    def __init__(self, max_entries: int, sweep_interval: float):
+        """
+        Initialize the store.
+
+        Args:
+            max_entries: Maximum number of pending OTPs kept.
+            sweep_interval: Seconds between background sweeps.
+        """
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._entries: dict[str, dict] = {}
+        self._expiries: list[tuple[datetime, str]] = []
+        self._sweeper: Optional[asyncio.Task] = None
+
+    async def set(self, email: str, entry: dict) -> None:
+        self._entries[email] = entry
+        heapq.heappush(self._expiries, (entry["expiry"], email))
+        self.purge_expired()
+        while len(self._entries) > self.max_entries:
+            self._pop_earliest()
+        if len(self._expiries) > 2 * len(self._entries) + 64:
+            self._compact()
+
+    async def get(self, email: str) -> Optional[dict]:
+        entry = self._entries.get(email)
+        if entry is not None and entry["expiry"] <= datetime.now(timezone.utc):
+            del self._entries[email]
+            return None
+        return entry
+
+    async def delete(self, email: str) -> None:
+        self._entries.pop(email, None)
+
+    def purge_expired(self) -> int:
+        """
+        Drop every expired entry.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        now = datetime.now(timezone.utc)
+        removed = 0
+        while self._expiries and self._expiries[0][0] <= now:
+            if self._pop_earliest():
+                removed += 1
+        return removed
+
+    def _pop_earliest(self) -> bool:
+        expiry, email = heapq.heappop(self._expiries)
+        entry = self._entries.get(email)
+        if entry is not None and entry["expiry"] == expiry:
+            del self._entries[email]
+            return True
+        return False
+
+    def _compact(self) -> None:
+        self._expiries = [(entry["expiry"], email) for email, entry in self._entries.items()]
+        heapq.heapify(self._expiries)
+
+    async def start(self) -> None:
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep())
+
+    async def close(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+
+    async def _sweep(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            removed = self.purge_expired()
+            if removed:
+                logger.debug("Purged %s expired OTP entries", removed)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MongoOTPStore(OTPStore):
+    """
+    OTP store shared by all workers through a MongoDB collection.
+
+    Documents carry an ``expires_at`` field covered by a TTL index (created
+    at startup) so MongoDB removes abandoned entries by itself.
+    """
+
+    async def set(self, email: str, entry: dict) -> None:
+        await get_database()[OTP_COLLECTION].replace_one(
+            {"_id": email},
+            {"otp": entry["otp"], "name": entry["name"], "expires_at": entry["expiry"]},
+            upsert=True,
+        )
+
+    async def get(self, email: str) -> Optional[dict]:
+        doc = await get_database()[OTP_COLLECTION].find_one(
+            {"_id": email, "expires_at": {"$gt": datetime.now(timezone.utc)}}
+        )
+        if doc is None:
+            return None
+        return {
+            "otp": doc["otp"],
+            "name": doc["name"],
+            "expiry": doc["expires_at"].replace(tzinfo=timezone.utc),
+        }
+
+    async def delete(self, email: str) -> None:
+        await get_database()[OTP_COLLECTION].delete_one({"_id": email})
+
+
+class RedisOTPStore(OTPStore):
+    """
+    OTP store shared by all workers through a Redis-compatible server.
+
+    Entries are stored as JSON with a millisecond expiry, so the server
+    removes abandoned entries by itself.
+    """
+
+    def __init__(self, client: RedisClient, prefix: str = "otp:"):
+        """
+        Initialize the store.
+
+        Args:
+            client: Redis client.
+            prefix: Key prefix for OTP entries.
+        """
+        self.client = client
+        self.prefix = prefix
+
+    async def set(self, email: str, entry: dict) -> None:
+        ttl = entry["expiry"] - datetime.now(timezone.utc)
+        value = json.dumps(
+            {"otp": entry["otp"], "name": entry["name"], "expiry": entry["expiry"].isoformat()}
+        )
+        await self.client.set(
+            self.prefix + email, value, px=max(1, int(ttl.total_seconds() * 1000))
+        )
+
+    async def get(self, email: str) -> Optional[dict]:
+        value = await self.client.get(self.prefix + email)
+        if value is None:
+            return None
+        data = json.loads(value)
+        return {
+            "otp": data["otp"],
+            "name": data["name"],
+            "expiry": datetime.fromisoformat(data["expiry"]),
+        }
+
+    async def delete(self, email: str) -> None:
+        await self.client.delete(self.prefix + email)
+
+    async def close(self) -> None:
+        await self.client.close()
+
+
+def create_otp_store(backend: str) -> OTPStore:
+    """
+    Build the OTP store selected in the settings.
+
+    Args:
+        backend: ``"memory"``, ``"mongo"`` or ``"redis"``.
+
+    Returns:
+        OTPStore: The configured store.
+
+    Raises:
+        ValueError: If the backend name is unknown.
+    """
+    if backend == "memory":
+        return InMemoryOTPStore(
+            max_entries=settings.otp_max_entries,
+            sweep_interval=settings.otp_sweep_interval_seconds,
+        )
+    if backend == "mongo":
+        return MongoOTPStore()
+    if backend == "redis":
+        return RedisOTPStore(RedisClient(settings.redis_url))
+    raise ValueError(f"Unknown OTP backend: {backend}")
 
 
 class AuthService:
@@ -26,32 +262,38 @@ class AuthService:
     Attributes:
         secret_key: Secret key for JWT encoding.
         algorithm: Algorithm used for JWT encoding.
-        otp_storage: In-memory storage for OTP codes.
+        otp_storage: Store holding pending OTP codes.
+        principal_cache: Recently authenticated users keyed by token subject.
     """
 
     def __init__(self):
         """Initialize the authentication service."""
         self.secret_key = settings.secret_key
         self.algorithm = settings.algorithm
-        self.otp_storage = {}  # In-memory OTP storage (for production, use Redis)
+        self.otp_storage = create_otp_store(settings.otp_backend)
+        self.principal_cache = TTLCache(
+            max_entries=settings.auth_cache_max_entries,
+            ttl_seconds=settings.auth_cache_ttl_seconds,
+        )
 
     async def request_otp(self, email: str, name: str) -> bool:
         """
-        Generate and send OTP to user's email.
+        Generate an OTP and queue it for delivery to the user's email.
 
         Args:
             email: User's email address.
             name: User's name.
 
         Returns:
-            bool: True if OTP was sent successfully.
+            bool: True if the OTP email was queued successfully.
         """
-        logger.debug(f"Generating OTP for user: {email}")
+        logger.debug("Generating OTP for user: %s", email)
+        email_service = services.email_service
         otp = email_service.generate_otp()
         expiry = datetime.now(timezone.utc) + timedelta(minutes=settings.otp_expire_minutes)
-        self.otp_storage[email] = {"otp": otp, "name": name, "expiry": expiry}
-        logger.info(f"OTP requested for email: {email}")
-        return await email_service.send_otp_email(email, otp)
+        await self.otp_storage.set(email, {"otp": otp, "name": name, "expiry": expiry})
+        logger.info("OTP requested for email: %s", email)
+        return await email_outbox.enqueue(email_service.build_otp_email(email, otp), expiry)
 
     async def verify_otp(self, email: str, otp: str) -> Optional[Token]:
         """
@@ -64,21 +306,21 @@ class AuthService:
         Returns:
             Token: JWT access token if verification succeeds, None otherwise.
         """
-        logger.debug(f"Verifying OTP for email: {email}")
+        logger.debug("Verifying OTP for email: %s", email)
 
-        if email not in self.otp_storage:
-            logger.warning(f"OTP verification failed: No OTP found for email {email}")
-            return None
+        stored_data = await self.otp_storage.get(email)
 
-        stored_data = self.otp_storage[email]
+        if stored_data is None:
+            logger.warning("OTP verification failed: No OTP found for email %s", email)
+            return None
 
-        if stored_data["otp"] != otp:
-            logger.warning(f"OTP verification failed: Invalid OTP for email {email}")
+        if not hmac.compare_digest(stored_data["otp"].encode(), otp.encode()):
+            logger.warning("OTP verification failed: Invalid OTP for email %s", email)
             return None
 
         if datetime.now(timezone.utc) > stored_data["expiry"]:
-            del self.otp_storage[email]
-            logger.warning(f"OTP verification failed: OTP expired for email {email}")
+            await self.otp_storage.delete(email)
+            logger.warning("OTP verification failed: OTP expired for email %s", email)
             return None
 
         db = get_database()
@@ -92,14 +334,15 @@ class AuthService:
             }
             result = await db.users.insert_one(user_doc)
             user_id = str(result.inserted_id)
-            logger.info(f"New user created: {email} with ID {user_id}")
+            logger.info("New user created: %s with ID %s", email, user_id)
         else:
             user_id = str(user_data["_id"])
-            logger.info(f"Existing user logged in: {email}")
+            self.invalidate_user(user_id)
+            logger.info("Existing user logged in: %s", email)
 
-        del self.otp_storage[email]
+        await self.otp_storage.delete(email)
         token = self.create_access_token({"sub": user_id, "email": email})
-        logger.info(f"Access token generated for user: {email}")
+        logger.info("Access token generated for user: %s", email)
         return Token(access_token=token)
 
     def create_access_token(self, data: dict) -> str:
@@ -120,10 +363,26 @@ class AuthService:
         encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
         return encoded_jwt
 
+    def invalidate_user(self, user_id: str) -> None:
+        """
+        Drop a user from the principal cache.
+
+        Call this whenever a user's stored profile changes or their access
+        must be re-checked against the database on the next request.
+
+        Args:
+            user_id: ID of the user (the token ``sub`` claim).
+        """
+        if self.principal_cache.delete(user_id):
+            logger.debug("Principal cache entry invalidated for user: %s", user_id)
+
     async def get_current_user(self, token: str) -> Optional[User]:
         """
         Get current user from JWT token.
 
+        Users are served from the principal cache for up to
+        ``auth_cache_ttl_seconds`` before being looked up again.
+
         Args:
             token: JWT access token.
 
@@ -140,24 +399,28 @@ class AuthService:
                 logger.warning("Token validation failed: Missing user_id or email in payload")
                 return None
 
+            cached = self.principal_cache.get(user_id)
+            if cached is not None and cached.email == email:
+                logger.debug("Token validated from principal cache for user: %s", email)
+                return cached
+
             db = get_database()
             user_data = await db.users.find_one({"email": email})
 
             if user_data is None:
-                logger.warning(f"Token validation failed: User not found for email {email}")
+                logger.warning("Token validation failed: User not found for email %s", email)
                 return None
 
-            logger.debug(f"Token validated successfully for user: {email}")
-            return User(
+            logger.debug("Token validated successfully for user: %s", email)
+            user = User(
                 id=str(user_data["_id"]),
                 name=user_data["name"],
                 email=user_data["email"],
                 created_at=user_data["created_at"],
             )
+            self.principal_cache.set(user_id, user)
+            return user
 
         except JWTError as e:
-            logger.error(f"JWT decode error: {e}")
+            logger.error("JWT decode error: %s", e)
             return None
-
-
-auth_service = AuthService()
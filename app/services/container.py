@@ -0,0 +1,120 @@
+"""
+Service Container Module.
+
+This module builds the application services on first use instead of at
+import time. Importing the application therefore no longer loads the Groq
+and Resend SDKs or configures their clients; a worker pays for each
+service only when a request (or the lifespan) first needs it.
+
+Routes receive services through the FastAPI dependencies defined here,
+so tests can swap them with ``app.dependency_overrides`` or
+``services.override``.
+"""
+
+from typing import TYPE_CHECKING, Callable
+
+if TYPE_CHECKING:
+    from app.services.ai_service import AIService
+    from app.services.auth_service import AuthService
+    from app.services.email_service import EmailService
+
+
+def _build_ai_service() -> "AIService":
+    from app.services.ai_service import AIService
+
+    return AIService()
+
+
+def _build_auth_service() -> "AuthService":
+    from app.services.auth_service import AuthService
+
+    return AuthService()
+
+
+def _build_email_service() -> "EmailService":
+    from app.services.email_service import EmailService
+
+    return EmailService()
+
+
+class ServiceContainer:
+    """
+    Lazily built application services.
+
+    Each service is constructed the first time it is accessed and then
+    shared by all callers of the process.
+
+    Attributes:
+        factories: Builder of each service, by name.
+    """
+
+    def __init__(self, factories: dict[str, Callable[[], object]]):
+        """
+        Initialize an empty container.
+
+        Args:
+            factories: Builder of each service, by name.
+        """
+        self.factories = factories
+        self._services: dict[str, object] = {}
+
+    def get(self, name: str):
+        """
+        Return a service, building it on first access.
+
+        Args:
+            name: Service name.
+
+        Returns:
+            object: The shared service instance.
+
+        Raises:
+            KeyError: If no factory is registered under ``name``.
+        """
+        service = self._services.get(name)
+        if service is None:
+            service = self._services[name] = self.factories[name]()
+        return service
+
+    def override(self, name: str, service: object) -> None:
+        """Use ``service`` for ``name`` instead of building one."""
+        self._services[name] = service
+
+    def built(self, name: str) -> bool:
+        """Return whether ``name`` has been built (or overridden)."""
+        return name in self._services
+
+    def reset(self) -> None:
+        """Forget every built service; the next access builds a new one."""
+        self._services.clear()
+
+    @property
+    def ai_service(self) -> "AIService":
+        return self.get("ai_service")
+
+    @property
+    def auth_service(self) -> "AuthService":
+        return self.get("auth_service")
+
+    @property
+    def email_service(self) -> "EmailService":
+        return self.get("email_service")
+
+
+services = ServiceContainer(
+    {
+        "ai_service": _build_ai_service,
+        "auth_service": _build_auth_service,
+        "email_service": _build_email_service,
+    }
+)
+
+
+async def get_ai_service() -> "AIService":
+    """FastAPI dependency returning the AI service."""
+    return services.ai_service
+
+
+async def get_auth_service() -> "AuthService":
+    """FastAPI dependency returning the authentication service."""
+    return services.auth_service
@@ -0,0 +1,302 @@
+"""
+Email Outbox Module.
+
+This module decouples request handling from email delivery. Messages are
+queued in memory and recorded durably in MongoDB, then delivered by a pool
+of background workers that batch sends, retry failures with exponential
+backoff and dead-letter messages that keep failing. Each process renews its
+claim on the messages it holds and periodically takes over messages whose
+claim went stale, e.g. because the process that queued them crashed.
+"""
+
+import asyncio
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Optional
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.logging import logger
+from app.core.resilience import backoff_delay
+from app.services.container import services
+
+OUTBOX_COLLECTION = "email_outbox"
+
+
+class EmailOutbox:
+    """
+    Queue of outgoing emails delivered by background workers.
+
+    Attributes:
+        sender: Coroutine sending a list of Resend message params.
+        workers: Number of concurrent sender tasks.
+        batch_size: Maximum number of messages sent in one provider call.
+        max_attempts: Attempts before a message is dead-lettered.
+        dead_letters: Most recent dead-lettered messages.
+    """
+
+    def __init__(
+        self,
+        sender: Callable[[list[dict]], Awaitable[None]],
+        workers: int,
+        batch_size: int,
+        max_attempts: int,
+        retry_base_seconds: float,
+        retry_max_seconds: float,
+        max_queue: int,
+        durable: bool = True,
+    ):
+        """
+        Initialize the outbox.
+
+        Args:
+            sender: Coroutine sending a list of Resend message params.
+            workers: Number of concurrent sender tasks.
+            batch_size: Maximum number of messages per provider call.
+            max_attempts: Attempts before a message is dead-lettered.
+            retry_base_seconds: Backoff before the first retry.
+            retry_max_seconds: Upper bound on the backoff.
+            max_queue: Maximum number of queued messages.
+            durable: Record messages in MongoDB so they survive restarts.
+        """
+        self.sender = sender
+        self.workers = workers
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.durable = durable
+        self.dead_letters: deque = deque(maxlen=100)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._tasks: list[asyncio.Task] = []
+        self._retries: set[asyncio.Task] = set()
+        self._recovery: Optional[asyncio.Task] = None
+        # Undelivered messages this process has claimed, by id.
+        self._held: dict[ObjectId, dict] = {}
+        self._counters = {"enqueued": 0, "sent": 0, "failed_attempts": 0, "dead": 0, "expired": 0}
+        self._send_seconds_total = 0.0
+        self._send_seconds_max = 0.0
+        self._send_calls = 0
+
+    async def enqueue(self, params: dict, expires_at: Optional[datetime] = None) -> bool:
+        """
+        Queue a message for delivery.
+
+        Args:
+            params: Resend message params (from, to, subject, html).
+            expires_at: Drop the message instead of sending it after this time.
+
+        Returns:
+            bool: True if the message was accepted.
+        """
+        now = datetime.now(timezone.utc)
+        message = {
+            "_id": ObjectId(),
+            "params": params,
+            "status": "pending",
+            "attempts": 0,
+            "created_at": now,
+            "claimed_at": now,
+            "expires_at": expires_at,
+        }
+        if self._queue.full():
+            logger.error("Email outbox is full, rejecting message")
+            return False
+
+        db = self._db()
+        if db is not None:
+            try:
+                await db[OUTBOX_COLLECTION].insert_one(message)
+            except Exception as e:
+                logger.warning("Failed to persist outbox message: %s", e)
+
+        self._queue.put_nowait(message)
+        self._held[message["_id"]] = message
+        self._counters["enqueued"] += 1
+        return True
+
+    async def start(self) -> None:
+        """Recover pending messages from MongoDB and start the workers."""
+        if self._tasks:
+            return
+        await self._recover()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._recovery = asyncio.create_task(self._recovery_loop())
+        logger.info("Email outbox started with %s workers", self.workers)
+
+    async def close(self) -> None:
+        """Stop the workers; undelivered messages stay pending in MongoDB."""
+        tasks = [*self._tasks, *self._retries] + ([self._recovery] if self._recovery else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._retries.clear()
+        self._recovery = None
+
+    async def _recovery_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.email_outbox_recover_interval_seconds)
+            await self._renew_claims()
+            if not self._queue.full():
+                await self._recover()
+
+    async def _renew_claims(self) -> None:
+        db = self._db()
+        if db is None or not self._held:
+            return
+        try:
+            await db[OUTBOX_COLLECTION].update_many(
+                {"_id": {"$in": list(self._held)}, "status": "pending"},
+                {"$set": {"claimed_at": datetime.now(timezone.utc)}},
+            )
+        except Exception as e:
+            logger.warning("Failed to renew claims on %s outbox messages: %s", len(self._held), e)
+
+    async def _recover(self) -> None:
+        db = self._db()
+        if db is None:
+            return
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.email_outbox_claim_timeout_seconds)
+        recovered = 0
+        try:
+            cursor = db[OUTBOX_COLLECTION].find({"status": "pending", "claimed_at": {"$lt": stale}})
+            async for message in cursor:
+                if self._queue.full():
+                    break
+                if message["_id"] in self._held:
+                    continue
+                claimed = await db[OUTBOX_COLLECTION].update_one(
+                    {"_id": message["_id"], "claimed_at": message["claimed_at"]},
+                    {"$set": {"claimed_at": now}},
+                )
+                if claimed.modified_count:
+                    self._queue.put_nowait(message)
+                    self._held[message["_id"]] = message
+                    recovered += 1
+        except Exception as e:
+            logger.error("Failed to recover pending outbox messages: %s", e)
+        if recovered:
+            logger.info("Recovered %s pending outbox messages", recovered)
+
+    async def _worker(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._deliver(batch)
+
+    async def _deliver(self, batch: list[dict]) -> None:
+        now = datetime.now(timezone.utc)
+        live, expired = [], []
+        for message in batch:
+            expires_at = message.get("expires_at")
+            if expires_at is not None and expires_at.replace(tzinfo=timezone.utc) <= now:
+                expired.append(message)
+            else:
+                live.append(message)
+        if expired:
+            self._counters["expired"] += len(expired)
+            self._release(expired)
+            await self._update(expired, {"status": "expired"})
+        if not live:
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.sender([message["params"] for message in live])
+        except Exception as e:
+            self._record_send(time.perf_counter() - started)
+            logger.warning("Email batch of %s failed: %s", len(live), e)
+            for message in live:
+                await self._retry_or_dead_letter(message, str(e))
+            return
+
+        self._record_send(time.perf_counter() - started)
+        self._counters["sent"] += len(live)
+        self._release(live)
+        await self._update(live, {"status": "sent", "sent_at": datetime.now(timezone.utc)})
+        logger.debug("Sent %s outbox emails", len(live))
+
+    async def _retry_or_dead_letter(self, message: dict, error: str) -> None:
+        self._counters["failed_attempts"] += 1
+        message["attempts"] += 1
+        if message["attempts"] >= self.max_attempts:
+            self._counters["dead"] += 1
+            self.dead_letters.append({"id": str(message["_id"]), "error": error})
+            self._release([message])
+            logger.error(
+                "Email %s dead-lettered after %s attempts", message["_id"], message["attempts"]
+            )
+            await self._update(
+                [message], {"status": "dead", "attempts": message["attempts"], "last_error": error}
+            )
+            return
+
+        await self._update([message], {"attempts": message["attempts"], "last_error": error})
+        delay = backoff_delay(message["attempts"], self.retry_base_seconds, self.retry_max_seconds)
+        task = asyncio.create_task(self._requeue_after(message, delay))
+        self._retries.add(task)
+        task.add_done_callback(self._retries.discard)
+
+    async def _requeue_after(self, message: dict, delay: float) -> None:
+        await asyncio.sleep(delay)
+        await self._queue.put(message)
+
+    def _release(self, messages: list[dict]) -> None:
+        for message in messages:
+            self._held.pop(message["_id"], None)
+
+    async def _update(self, messages: list[dict], fields: dict) -> None:
+        db = self._db()
+        if db is None:
+            return
+        try:
+            await db[OUTBOX_COLLECTION].update_many(
+                {"_id": {"$in": [message["_id"] for message in messages]}}, {"$set": fields}
+            )
+        except Exception as e:
+            logger.warning("Failed to update %s outbox messages: %s", len(messages), e)
+
+    def _record_send(self, seconds: float) -> None:
+        self._send_calls += 1
+        self._send_seconds_total += seconds
+        self._send_seconds_max = max(self._send_seconds_max, seconds)
+
+    def _db(self):
+        if not self.durable:
+            return None
+        return get_database()
+
+    def stats(self) -> dict:
+        """
+        Return queue depth, delivery counters and send latency.
+
+        Returns:
+            dict: Outbox statistics.
+        """
+        calls = self._send_calls
+        return {
+            "queue_depth": self._queue.qsize(),
+            "retries_scheduled": len(self._retries),
+            "workers": len(self._tasks),
+            **self._counters,
+            "send_seconds_avg": round(self._send_seconds_total / calls, 6) if calls else 0.0,
+            "send_seconds_max": round(self._send_seconds_max, 6),
+        }
+
+
+email_outbox = EmailOutbox(
+    sender=lambda messages: services.email_service.send_emails(messages),
+    workers=settings.email_outbox_workers,
+    batch_size=settings.email_outbox_batch_size,
+    max_attempts=settings.email_outbox_max_attempts,
+    retry_base_seconds=settings.email_outbox_retry_base_seconds,
+    retry_max_seconds=settings.email_outbox_retry_max_seconds,
+    max_queue=settings.email_outbox_max_queue,
+    durable=settings.email_outbox_durable,
+)
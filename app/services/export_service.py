@@ -0,0 +1,143 @@
+"""
+Record Export Module.
+
+This module serializes medical records straight from a MongoDB cursor to
+NDJSON or CSV, emitting output in bounded chunks so memory use does not
+depend on the size of the collection.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from bson import ObjectId
+
+from app.core.logging import logger
+
+CSV_COLUMNS = [
+    "id",
+    "created_at",
+    "user_id",
+    "patient_name",
+    "age",
+    "symptoms",
+    "medical_history",
+    "additional_info",
+    "analysis",
+    "recommendations",
+]
+
+
+def export_filter(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    after_id: Optional[ObjectId] = None,
+) -> dict:
+    """
+    Build the MongoDB filter for an export.
+
+    Args:
+        start: Only export records created at or after this time.
+        end: Only export records created before this time.
+        after_id: Resume after the record with this ``_id``.
+
+    Returns:
+        dict: MongoDB filter.
+    """
+    query = {}
+    if start or end:
+        query["created_at"] = {}
+        if start:
+            query["created_at"]["$gte"] = start
+        if end:
+            query["created_at"]["$lt"] = end
+    if after_id:
+        query["_id"] = {"$gt": after_id}
+    return query
+
+
+def _json_default(value):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def ndjson_row(doc: dict) -> str:
+    """
+    Serialize one stored record as an NDJSON line.
+
+    Args:
+        doc: Raw ``medical_records`` document.
+
+    Returns:
+        str: JSON object terminated by a newline.
+    """
+    row = {"id": doc["_id"], **{k: v for k, v in doc.items() if k != "_id"}}
+    return json.dumps(row, default=_json_default, separators=(",", ":")) + "\n"
+
+
+def csv_row(doc: dict) -> list:
+    """
+    Flatten one stored record into CSV columns.
+
+    Args:
+        doc: Raw ``medical_records`` document.
+
+    Returns:
+        list: Values in ``CSV_COLUMNS`` order.
+    """
+    patient = doc.get("patient_data") or {}
+    analysis = doc.get("ai_analysis") or {}
+    additional_info = patient.get("additional_info")
+    recommendations = analysis.get("recommendations")
+    return [
+        str(doc["_id"]),
+        doc["created_at"].isoformat() if doc.get("created_at") else "",
+        doc.get("user_id") or "",
+        patient.get("patient_name", ""),
+        patient.get("age", ""),
+        patient.get("symptoms", ""),
+        patient.get("medical_history") or "",
+        json.dumps(additional_info) if additional_info is not None else "",
+        analysis.get("analysis", ""),
+        json.dumps(recommendations) if recommendations is not None else "",
+    ]
+
+
+async def stream_export(cursor, export_format: str, chunk_bytes: int) -> AsyncIterator[str]:
+    """
+    Serialize the documents of a cursor incrementally.
+
+    Args:
+        cursor: Motor cursor over ``medical_records``.
+        export_format: ``"ndjson"`` or ``"csv"``.
+        chunk_bytes: Approximate size of each emitted chunk.
+
+    Yields:
+        str: Serialized output, roughly ``chunk_bytes`` at a time.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == "csv" else None
+    if writer is not None:
+        writer.writerow(CSV_COLUMNS)
+
+    exported = 0
+    async for doc in cursor:
+        if writer is not None:
+            writer.writerow(csv_row(doc))
+        else:
+            buffer.write(ndjson_row(doc))
+        exported += 1
+
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+    logger.info("Exported %s records as %s", exported, export_format)
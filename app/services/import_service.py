@@ -0,0 +1,344 @@
+"""
+Record Import Module.
+
+This module loads medical records in bulk from NDJSON or CSV uploads. The
+upload is decoded, split into rows and validated as it arrives, and valid
+rows are written with unordered ``insert_many`` calls in fixed-size chunks,
+so memory use does not depend on the size of the file.
+"""
+
+import asyncio
+import codecs
+import csv
+import json
+import uuid
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional
+
+from pydantic import ValidationError
+from pymongo.errors import BulkWriteError
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.medical_record import ImportReport, ImportRowError, PatientData
+
+REQUIRED_CSV_COLUMNS = ("patient_name", "age", "symptoms")
+LINE_TOO_LONG = "Line exceeds the maximum length"
+RECORD_TOO_LONG = "Quoted value spans too many lines"
+
+Row = tuple[int, Optional[PatientData], Optional[str]]
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_length: int) -> AsyncIterator[Optional[str]]:
+    """
+    Split a UTF-8 byte stream into lines.
+
+    Args:
+        chunks: Raw upload chunks, split anywhere.
+        max_length: Longest line kept, in characters.
+
+    Yields:
+        str: Each line without its terminator, or None in place of a line
+        longer than ``max_length``, which is discarded as it streams in.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    pending = ""
+    skipping = False
+    async for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            if skipping:
+                skipping = False
+                continue
+            line = line.removesuffix("\r")
+            yield line if len(line) <= max_length else None
+        if skipping or len(pending) > max_length:
+            if not skipping:
+                yield None
+                skipping = True
+            pending = ""
+    pending += decoder.decode(b"", final=True)
+    if pending and not skipping:
+        pending = pending.removesuffix("\r")
+        yield pending if len(pending) <= max_length else None
+
+
+def describe_error(error: Exception) -> str:
+    """Summarize a parsing or validation error for the import report."""
+    if isinstance(error, ValidationError):
+        return "; ".join(
+            f"{'.'.join(str(part) for part in item['loc']) or 'row'}: {item['msg']}"
+            for item in error.errors()
+        )
+    if isinstance(error, json.JSONDecodeError):
+        return f"Invalid JSON: {error.msg}"
+    return str(error)
+
+
+async def ndjson_rows(lines: AsyncIterator[Optional[str]]) -> AsyncIterator[Row]:
+    """
+    Validate NDJSON lines as patients.
+
+    Each object is either a patient or, as written by the NDJSON export, a
+    record with a ``patient_data`` field. Blank lines are skipped.
+
+    Args:
+        lines: Lines from ``iter_lines``.
+
+    Yields:
+        tuple: Row number, then the patient or None, then the error or None.
+    """
+    row = 0
+    async for line in lines:
+        if line is not None and not line.strip():
+            continue
+        row += 1
+        if line is None:
+            yield row, None, LINE_TOO_LONG
+            continue
+        try:
+            data = json.loads(line)
+            if isinstance(data, dict) and "patient_data" in data:
+                data = data["patient_data"]
+            patient_data = PatientData.model_validate(data)
+        except ValueError as e:
+            yield row, None, describe_error(e)
+            continue
+        yield row, patient_data, None
+
+
+def _patient_from_csv(header: list[str], values: list[str]) -> PatientData:
+    fields = dict(zip(header, values, strict=False))
+    additional_info = fields.get("additional_info")
+    return PatientData(
+        patient_name=fields.get("patient_name"),
+        age=fields.get("age"),
+        symptoms=fields.get("symptoms"),
+        medical_history=fields.get("medical_history") or None,
+        additional_info=json.loads(additional_info) if additional_info else None,
+    )
+
+
+class _IncompleteRecordError(Exception):
+    """Raised to ``csv.reader`` when a quoted value runs past the lines read so far."""
+
+
+def _record_lines(lines: list[str]) -> Iterator[str]:
+    for line in lines:
+        yield line + "\n"
+    raise _IncompleteRecordError
+
+
+async def csv_rows(
+    lines: AsyncIterator[Optional[str]], max_record_lines: int
+) -> AsyncIterator[Row]:
+    """
+    Validate CSV rows as patients.
+
+    The header names the columns; ``patient_name``, ``age`` and ``symptoms``
+    are required, ``medical_history`` and ``additional_info`` (JSON) are
+    optional and other columns are ignored, so CSV exports can be imported
+    as they are. Quoted values may span up to ``max_record_lines`` lines;
+    a row is parsed again from its first line as each of its lines arrives.
+
+    Args:
+        lines: Lines from ``iter_lines``.
+        max_record_lines: Most lines a single row may span.
+
+    Yields:
+        tuple: Line of the file where the row starts (the header is line 1),
+        then the patient or None, then the error or None.
+
+    Raises:
+        ValueError: If the header lacks a required column.
+    """
+    header = None
+    record: list[str] = []
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if line is None:
+            yield line_number - len(record), None, LINE_TOO_LONG
+            record = []
+            continue
+        record.append(line)
+        reader = csv.reader(_record_lines(record))
+        try:
+            values = next(reader)
+        except _IncompleteRecordError:
+            if len(record) < max_record_lines:
+                continue
+            yield line_number - len(record) + 1, None, RECORD_TOO_LONG
+            record = []
+            continue
+        except csv.Error as e:
+            yield line_number - len(record) + 1, None, str(e)
+            record = []
+            continue
+        row = line_number - reader.line_num + 1
+        record = []
+        if not "".join(values).strip():
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            missing = [name for name in REQUIRED_CSV_COLUMNS if name not in header]
+            if missing:
+                raise ValueError(f"CSV header is missing columns: {', '.join(missing)}")
+            continue
+        try:
+            patient_data = _patient_from_csv(header, values)
+        except ValueError as e:
+            yield row, None, describe_error(e)
+            continue
+        yield row, patient_data, None
+    if record:
+        yield line_number - len(record) + 1, None, "Unterminated quoted value"
+
+
+class RecordImporter:
+    """
+    Write validated import rows to MongoDB in chunks.
+
+    Parsing of the next chunk overlaps with the insert of the previous one.
+    Progress of running imports is kept for the stats endpoint.
+
+    Attributes:
+        chunk_size: Documents per ``insert_many`` call.
+        max_reported_errors: Row errors listed in a report before truncating.
+    """
+
+    def __init__(self, chunk_size: int, max_reported_errors: int):
+        """
+        Initialize the importer.
+
+        Args:
+            chunk_size: Documents per ``insert_many`` call.
+            max_reported_errors: Row errors listed in a report before truncating.
+        """
+        self.chunk_size = chunk_size
+        self.max_reported_errors = max_reported_errors
+        self._active: dict[str, ImportReport] = {}
+        self._counters = {"imports": 0, "rows": 0, "inserted": 0, "failed": 0}
+
+    async def run(
+        self,
+        collection,
+        rows: AsyncIterator[Row],
+        make_doc: Callable[[PatientData], dict],
+        on_inserted: Optional[Callable[[list[dict]], Awaitable[None]]] = None,
+    ) -> ImportReport:
+        """
+        Import rows into a collection.
+
+        Args:
+            collection: Target Motor collection.
+            rows: Rows from ``ndjson_rows`` or ``csv_rows``.
+            make_doc: Builds the document stored for a patient.
+            on_inserted: Awaited with the documents of each chunk that were
+                stored.
+
+        Returns:
+            ImportReport: Row counts and the errors of rejected rows.
+        """
+        report = ImportReport(import_id=uuid.uuid4().hex)
+        self._active[report.import_id] = report
+        inserting: Optional[asyncio.Task] = None
+        chunk: list[tuple[int, dict]] = []
+        try:
+            async for row, patient_data, error in rows:
+                report.rows += 1
+                if error is not None:
+                    self._reject(report, row, error)
+                    continue
+                doc = make_doc(patient_data)
+                doc["import_id"] = report.import_id
+                chunk.append((row, doc))
+                if len(chunk) >= self.chunk_size:
+                    if inserting is not None:
+                        await inserting
+                    inserting = asyncio.create_task(
+                        self._insert(collection, chunk, report, on_inserted)
+                    )
+                    chunk = []
+            if inserting is not None:
+                await inserting
+                inserting = None
+            if chunk:
+                await self._insert(collection, chunk, report, on_inserted)
+        finally:
+            if inserting is not None:
+                inserting.cancel()
+            del self._active[report.import_id]
+            self._counters["imports"] += 1
+            self._counters["rows"] += report.rows
+            self._counters["inserted"] += report.inserted
+            self._counters["failed"] += report.failed
+
+        logger.info(
+            "Import %s finished: %s rows, %s inserted, %s failed",
+            report.import_id,
+            report.rows,
+            report.inserted,
+            report.failed,
+        )
+        return report
+
+    async def _insert(
+        self,
+        collection,
+        chunk: list[tuple[int, dict]],
+        report: ImportReport,
+        on_inserted: Optional[Callable[[list[dict]], Awaitable[None]]],
+    ):
+        docs = [doc for _, doc in chunk]
+        failed = {}
+        try:
+            await collection.insert_many(docs, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failed[error["index"]] = error.get("errmsg", "Write failed")
+        except Exception as e:
+            logger.error("Import insert failed: %s", e)
+            failed = dict.fromkeys(range(len(docs)), "Write failed")
+
+        report.inserted += len(docs) - len(failed)
+        for position, (row, _) in enumerate(chunk):
+            if position in failed:
+                self._reject(report, row, failed[position])
+        if on_inserted is not None and len(failed) < len(docs):
+            await on_inserted([doc for position, doc in enumerate(docs) if position not in failed])
+        logger.debug(
+            "Import %s progress: %s rows, %s inserted, %s failed",
+            report.import_id,
+            report.rows,
+            report.inserted,
+            report.failed,
+        )
+
+    def _reject(self, report: ImportReport, row: int, error: str) -> None:
+        report.failed += 1
+        if len(report.errors) < self.max_reported_errors:
+            report.errors.append(ImportRowError(row=row, error=error))
+        else:
+            report.errors_truncated = True
+
+    def stats(self) -> dict:
+        """
+        Return import statistics.
+
+        Returns:
+            dict: Progress of running imports and totals of finished ones.
+        """
+        return {
+            "active": [
+                report.model_dump(include={"import_id", "rows", "inserted", "failed"})
+                for report in self._active.values()
+            ],
+            **self._counters,
+        }
+
+
+record_importer = RecordImporter(
+    chunk_size=settings.import_chunk_size,
+    max_reported_errors=settings.import_max_reported_errors,
+)
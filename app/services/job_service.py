@@ -0,0 +1,266 @@
+"""
+Record Job Module.
+
+This module runs deferred AI analysis for records created in async mode.
+Pending records are stored immediately; a pool of background workers
+fills in their analysis and status. Records left pending by a previous
+process, or stored unclaimed for backfill (e.g. by bulk imports), are
+claimed and re-queued at startup and then periodically. A job whose
+analysis came back degraded, because the AI service was unavailable, is
+left unclaimed for the backfill to retry rather than completed with the
+fallback text.
+"""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.logging import logger
+from app.models.medical_record import PatientData
+from app.services.container import services
+
+# ``claimed_at`` of pending records no worker has claimed yet; older than any
+# claim timeout, so the next backfill pass picks them up.
+UNCLAIMED = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class RecordJobQueue:
+    """
+    Queue of pending records awaiting AI analysis.
+
+    Attributes:
+        workers: Number of concurrent worker tasks.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        """
+        Initialize the queue.
+
+        Args:
+            workers: Number of concurrent worker tasks.
+            max_queue: Maximum number of queued jobs.
+        """
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._tasks: list[asyncio.Task] = []
+        self._backfill: Optional[asyncio.Task] = None
+        self._backfill_requested = asyncio.Event()
+        self._waiters: dict[ObjectId, asyncio.Event] = {}
+        self._counters = {
+            "enqueued": 0,
+            "deferred": 0,
+            "completed": 0,
+            "failed": 0,
+            "retried": 0,
+            "recovered": 0,
+        }
+
+    def full(self) -> bool:
+        """Return True if no more jobs can be queued."""
+        return self._queue.full()
+
+    def enqueue(self, record_id: ObjectId) -> None:
+        """
+        Queue a pending record for analysis.
+
+        Args:
+            record_id: ``_id`` of the pending record.
+
+        Raises:
+            asyncio.QueueFull: If the queue is full.
+        """
+        self._queue.put_nowait(record_id)
+        self._counters["enqueued"] += 1
+
+    async def submit(self, record_id: ObjectId) -> bool:
+        """
+        Queue a stored pending record, or leave it to the backfill if the queue is full.
+
+        The queue can fill up between a caller checking ``full`` and storing
+        its record; the record is then marked unclaimed so the next backfill
+        pass picks it up.
+
+        Args:
+            record_id: ``_id`` of the pending record.
+
+        Returns:
+            bool: Whether the record was queued right away.
+        """
+        try:
+            self.enqueue(record_id)
+            return True
+        except asyncio.QueueFull:
+            pass
+        self._counters["deferred"] += 1
+        logger.warning("Record job queue full, deferring %s to the backfill", record_id)
+        try:
+            await get_database().medical_records.update_one(
+                {"_id": record_id, "status": "pending"}, {"$set": {"claimed_at": UNCLAIMED}}
+            )
+        except Exception as e:
+            # Still recovered once its claim times out.
+            logger.error("Failed to defer record job %s: %s", record_id, e)
+        return False
+
+    async def wait(self, record_id: ObjectId, timeout: float) -> None:
+        """
+        Wait until this process finishes a job, or the timeout elapses.
+
+        Args:
+            record_id: ``_id`` of the pending record.
+            timeout: Maximum number of seconds to wait.
+        """
+        event = self._waiters.setdefault(record_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            if self._waiters.get(record_id) is event and not event.is_set():
+                del self._waiters[record_id]
+
+    def request_backfill(self) -> None:
+        """Look for unclaimed pending records now rather than at the next interval."""
+        self._backfill_requested.set()
+
+    async def start(self) -> None:
+        """Re-queue records left pending by earlier processes and start the workers."""
+        if self._tasks:
+            return
+        await self._recover()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._backfill = asyncio.create_task(self._backfill_loop())
+        logger.info("Record job queue started with %s workers", self.workers)
+
+    async def close(self) -> None:
+        """Stop the workers; unfinished jobs stay pending in MongoDB."""
+        tasks = self._tasks + ([self._backfill] if self._backfill else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks = []
+        self._backfill = None
+
+    async def _backfill_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self._backfill_requested.wait(),
+                    settings.record_job_backfill_interval_seconds,
+                )
+            except asyncio.TimeoutError:
+                pass
+            self._backfill_requested.clear()
+            if not self._queue.full():
+                await self._recover()
+
+    async def _recover(self) -> None:
+        db = get_database()
+        if db is None:
+            return
+        now = datetime.now(timezone.utc)
+        stale = now - timedelta(seconds=settings.record_job_claim_timeout_seconds)
+        recovered = 0
+        try:
+            cursor = db.medical_records.find(
+                {"status": "pending", "claimed_at": {"$lt": stale}}, {"claimed_at": 1}
+            )
+            async for doc in cursor:
+                if self._queue.full():
+                    break
+                claimed = await db.medical_records.update_one(
+                    {"_id": doc["_id"], "status": "pending", "claimed_at": doc["claimed_at"]},
+                    {"$set": {"claimed_at": now}},
+                )
+                if claimed.modified_count:
+                    self.enqueue(doc["_id"])
+                    recovered += 1
+        except Exception as e:
+            logger.error("Failed to recover pending record jobs: %s", e)
+        self._counters["recovered"] += recovered
+        if recovered:
+            logger.info("Re-queued %s pending record jobs", recovered)
+
+    async def _worker(self) -> None:
+        while True:
+            record_id = await self._queue.get()
+            try:
+                await self._process(record_id)
+            finally:
+                event = self._waiters.pop(record_id, None)
+                if event is not None:
+                    event.set()
+
+    async def _process(self, record_id: ObjectId) -> None:
+        db = get_database()
+        try:
+            doc = await db.medical_records.find_one(
+                {"_id": record_id, "status": "pending"}, {"patient_data": 1, "attempts": 1}
+            )
+            if doc is None:
+                return
+            analysis = await services.ai_service.analyze_patient_data(
+                PatientData(**doc["patient_data"])
+            )
+            if analysis.degraded:
+                await self._retry_later(db, record_id, doc.get("attempts", 0) + 1)
+                return
+            await db.medical_records.update_one(
+                {"_id": record_id, "status": "pending"},
+                {
+                    "$set": {
+                        "ai_analysis": analysis.model_dump(),
+                        "status": "completed",
+                        "completed_at": datetime.now(timezone.utc),
+                    },
+                    "$unset": {"claimed_at": ""},
+                },
+            )
+            self._counters["completed"] += 1
+            logger.info("Record job completed: %s", record_id)
+        except Exception as e:
+            self._counters["failed"] += 1
+            logger.error("Record job %s failed: %s", record_id, e)
+            await self._mark_failed(db, record_id, str(e))
+
+    async def _retry_later(self, db, record_id: ObjectId, attempts: int) -> None:
+        if attempts >= settings.record_job_max_attempts:
+            self._counters["failed"] += 1
+            logger.error("Record job %s failed after %s degraded analyses", record_id, attempts)
+            await self._mark_failed(db, record_id, "AI analysis unavailable")
+            return
+        self._counters["retried"] += 1
+        logger.warning(
+            "Record job %s got a degraded analysis, leaving it to the backfill", record_id
+        )
+        await db.medical_records.update_one(
+            {"_id": record_id, "status": "pending"},
+            {"$set": {"claimed_at": UNCLAIMED, "attempts": attempts}},
+        )
+
+    async def _mark_failed(self, db, record_id: ObjectId, error: str) -> None:
+        try:
+            await db.medical_records.update_one(
+                {"_id": record_id, "status": "pending"},
+                {"$set": {"status": "failed", "error": error}},
+            )
+        except Exception as e:
+            logger.error("Failed to mark record job %s as failed: %s", record_id, e)
+
+    def stats(self) -> dict:
+        """
+        Return queue depth and job counters.
+
+        Returns:
+            dict: Record job statistics.
+        """
+        return {"queue_depth": self._queue.qsize(), "workers": len(self._tasks), **self._counters}
+
+
+record_jobs = RecordJobQueue(
+    workers=settings.record_job_workers, max_queue=settings.record_job_max_queue
+)
@@ -0,0 +1,236 @@
+"""
+Prompt Builder Module.
+
+This module turns patient data into the analysis prompt under a token
+budget. Tokens are counted locally, repeated sentences are dropped, long
+sections are trimmed to their beginning and most recent end, only the
+``additional_info`` keys relevant to triage are included, and the number
+of completion tokens requested is scaled to the size of the input.
+"""
+
+import json
+import re
+from typing import Any, Optional
+
+from app.core.config import settings
+from app.models.medical_record import PatientData, PromptStats
+
+_TOKEN_PIECES = re.compile(r"\w+|[^\w\s]")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?;])\s+|\n+")
+ELISION = "[...]"
+MIN_SECTION_TOKENS = 8
+
+PROMPT_TEMPLATE = """You are a medical assistant. Analyze the following patient information and provide:
+1. A brief medical analysis
+2. A list of recommendations
+
+Patient Information:
+- Age: {age}
+- Symptoms: {symptoms}
+- Medical History: {medical_history}{additional_info}
+
+Please respond in JSON format:
+{{
+    "analysis": "your analysis here",
+    "recommendations": ["recommendation 1", "recommendation 2", ...]
+}}
+
+IMPORTANT: Provide general health advice only. This is not a substitute for professional medical diagnosis."""
+
+
+def count_tokens(text: Optional[str]) -> int:
+    """
+    Estimate the number of model tokens in ``text``.
+
+    Each punctuation mark and each word counts as one token, plus one per
+    further four characters of a long word. This tracks LLaMA-style BPE
+    tokenizers closely for clinical English without shipping a vocabulary.
+
+    Args:
+        text: Text to measure.
+
+    Returns:
+        int: Estimated token count.
+    """
+    if not text:
+        return 0
+    return sum(1 + max(0, len(piece) - 4) // 4 for piece in _TOKEN_PIECES.findall(text))
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split text into sentences and lines, dropping empty pieces."""
+    return [piece.strip() for piece in _SENTENCE_BREAK.split(text) if piece.strip()]
+
+
+def dedupe_sentences(sentences: list[str]) -> list[str]:
+    """Drop sentences repeated verbatim (ignoring case and spacing), keeping the first."""
+    seen = set()
+    unique = []
+    for sentence in sentences:
+        key = " ".join(sentence.lower().split())
+        if key not in seen:
+            seen.add(key)
+            unique.append(sentence)
+    return unique
+
+
+def _truncate_words(text: str, budget: int) -> str:
+    words = []
+    used = 0
+    for word in text.split():
+        cost = count_tokens(word)
+        if used + cost > budget:
+            break
+        words.append(word)
+        used += cost
+    return " ".join(words)
+
+
+def compact_text(text: Optional[str], budget: int) -> tuple[str, bool]:
+    """
+    Fit free text into ``budget`` tokens.
+
+    Repeated sentences are removed first. If the text is still too long,
+    its opening (a third of the budget) and its most recent end are kept
+    with an elision marker between them.
+
+    Args:
+        text: Text to compact.
+        budget: Maximum number of tokens.
+
+    Returns:
+        tuple: The compacted text and whether anything was removed.
+    """
+    if not text:
+        return "", False
+    if count_tokens(text) <= budget:
+        return text, False
+
+    sentences = dedupe_sentences(split_sentences(text))
+    joined = " ".join(sentences)
+    if count_tokens(joined) <= budget:
+        return joined, True
+
+    budget -= count_tokens(ELISION)
+    head_budget = budget // 3
+    head: list[str] = []
+    used = 0
+    for sentence in sentences:
+        cost = count_tokens(sentence)
+        if used + cost > head_budget:
+            break
+        head.append(sentence)
+        used += cost
+
+    tail: list[str] = []
+    for sentence in reversed(sentences[len(head) :]):
+        cost = count_tokens(sentence)
+        if used + cost > budget:
+            if not tail:
+                tail.append(_truncate_words(sentence, budget - used))
+            break
+        tail.insert(0, sentence)
+        used += cost
+
+    return " ".join([*head, ELISION, *tail]).strip(), True
+
+
+def _key(name: str) -> str:
+    return re.sub(r"[\s\-]+", "_", name.strip().lower())
+
+
+def _render_value(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    return json.dumps(value, separators=(", ", ": "), ensure_ascii=False, default=str)
+
+
+def select_additional_info(additional_info: Optional[dict]) -> dict:
+    """
+    Keep the ``additional_info`` entries listed in ``PROMPT_ADDITIONAL_INFO_KEYS``.
+
+    Keys are matched case-insensitively, treating spaces and dashes as
+    underscores. Empty values are dropped.
+
+    Args:
+        additional_info: Free-form patient details.
+
+    Returns:
+        dict: Relevant entries in their original order.
+    """
+    if not additional_info:
+        return {}
+    wanted = {_key(name) for name in settings.prompt_additional_info_keys}
+    return {
+        name: value
+        for name, value in additional_info.items()
+        if _key(name) in wanted and value not in (None, "", [], {})
+    }
+
+
+def completion_budget(input_tokens: int) -> int:
+    """
+    Choose ``max_tokens`` for a prompt of ``input_tokens`` tokens.
+
+    Args:
+        input_tokens: Estimated size of the prompt.
+
+    Returns:
+        int: Between ``ANALYSIS_MIN_TOKENS`` and ``ANALYSIS_MAX_TOKENS``,
+        growing with the amount of patient information.
+    """
+    wanted = settings.analysis_min_tokens + input_tokens // 2
+    return max(settings.analysis_min_tokens, min(settings.analysis_max_tokens, wanted))
+
+
+def build_prompt(patient_data: PatientData) -> tuple[str, PromptStats]:
+    """
+    Build the analysis prompt within the configured input budget.
+
+    Symptoms may use up to half of ``PROMPT_MAX_INPUT_TOKENS`` and the
+    selected ``additional_info`` up to a quarter; the medical history gets
+    whatever is left. The patient name is deliberately left out: it does
+    not inform the analysis, and keeping it out lets cached answers be
+    shared safely.
+
+    Args:
+        patient_data: Patient information.
+
+    Returns:
+        tuple: Prompt text and its size statistics.
+    """
+    budget = settings.prompt_max_input_tokens
+
+    symptoms, symptoms_compacted = compact_text(patient_data.symptoms, budget // 2)
+    remaining = budget - count_tokens(symptoms)
+
+    selected = select_additional_info(patient_data.additional_info)
+    info_lines = []
+    info_budget = budget // 4
+    info_compacted = False
+    for name, value in selected.items():
+        if info_budget < MIN_SECTION_TOKENS:
+            break
+        line, compacted = compact_text(f"{name}: {_render_value(value)}", info_budget)
+        info_compacted = info_compacted or compacted
+        info_lines.append(line)
+        info_budget -= count_tokens(line)
+        remaining -= count_tokens(line)
+    info_compacted = info_compacted or len(info_lines) < len(selected)
+
+    history, history_compacted = compact_text(patient_data.medical_history, max(remaining, 0))
+    additional = "".join(f"\n  - {line}" for line in info_lines)
+
+    prompt = PROMPT_TEMPLATE.format(
+        age=patient_data.age,
+        symptoms=symptoms,
+        medical_history=history or "None",
+        additional_info=f"\n- Additional Information:{additional}" if additional else "",
+    )
+    input_tokens = count_tokens(prompt)
+    stats = PromptStats(
+        input_tokens=input_tokens,
+        max_tokens=completion_budget(input_tokens),
+        compacted=symptoms_compacted or info_compacted or history_compacted,
+    )
+    return prompt, stats
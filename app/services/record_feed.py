@@ -0,0 +1,281 @@
+"""
+Record Feed Module.
+
+This module pushes newly created medical records to the subscribers of the
+user who owns them. When the
+database is a replica set or sharded cluster, a MongoDB change stream on
+``medical_records`` feeds every worker's subscribers with inserts from all
+workers. Otherwise records are fanned out in process as this worker's
+routes create them.
+
+Each subscriber has a bounded queue. A subscriber that falls behind by a
+full queue is dropped after the records already queued, and resumes from
+the id of the last record it received: missed records are then replayed
+from the collection page by page before live delivery continues.
+"""
+
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Optional
+
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.logging import logger
+from app.core.resilience import backoff_delay
+
+# The stream is shared by every subscriber of this worker, so it can only
+# narrow to owned inserts; each record is matched to its owner's
+# subscriptions in ``_fan_out``.
+OWNED_INSERTS = [{"$match": {"operationType": "insert", "fullDocument.user_id": {"$ne": None}}}]
+# Change stream errors after which the stored resume token cannot be used.
+NON_RESUMABLE_ERRORS = {280, 286}
+
+
+class FeedSubscription:
+    """
+    Bounded queue of records awaiting delivery to one subscriber.
+
+    Attributes:
+        user_id: Owner of the records the subscriber receives.
+        overflowed: Whether a record was dropped because the queue was full.
+    """
+
+    def __init__(self, user_id: str, max_queue: int):
+        """
+        Initialize the subscription.
+
+        Args:
+            user_id: Owner of the records the subscriber receives.
+            max_queue: Records buffered before the subscriber overflows.
+        """
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.overflowed = False
+
+    def offer(self, doc: dict) -> bool:
+        """Queue a record; returns False once the subscriber has overflowed."""
+        if self.overflowed:
+            return False
+        try:
+            self.queue.put_nowait(doc)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            return False
+        return True
+
+
+class RecordFeed:
+    """
+    Fan-out of new records to live subscribers.
+
+    Attributes:
+        backend: ``auto``, ``change_stream`` or ``memory``.
+        source: Where records come from once started: ``change_stream`` or
+            ``memory``.
+        queue_size: Records buffered per subscriber.
+        max_subscribers: Subscribers accepted at once.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        queue_size: int,
+        max_subscribers: int,
+        heartbeat_seconds: float,
+        replay_page_size: int,
+    ):
+        """
+        Initialize the feed.
+
+        Args:
+            backend: ``auto`` to use change streams when the database
+                supports them, ``change_stream`` to require them, or
+                ``memory`` for in-process fan-out only.
+            queue_size: Records buffered per subscriber.
+            max_subscribers: Subscribers accepted at once.
+            heartbeat_seconds: Idle time after which a heartbeat is sent.
+            replay_page_size: Records read per query when replaying.
+
+        Raises:
+            ValueError: If the backend name is unknown.
+        """
+        if backend not in ("auto", "change_stream", "memory"):
+            raise ValueError(f"Unknown record feed backend: {backend}")
+        self.backend = backend
+        self.source = "memory"
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.heartbeat_seconds = heartbeat_seconds
+        self.replay_page_size = replay_page_size
+        self._subscribers: set[FeedSubscription] = set()
+        self._watcher: Optional[asyncio.Task] = None
+        self._counters = {"published": 0, "delivered": 0, "replayed": 0, "overflows": 0}
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def full(self) -> bool:
+        """Return whether the subscriber limit has been reached."""
+        return len(self._subscribers) >= self.max_subscribers
+
+    async def start(self) -> None:
+        """Choose the record source and start watching the change stream if used."""
+        if self._watcher is not None or self.backend == "memory":
+            return
+        if self.backend == "auto" and not await self._supports_change_streams():
+            logger.info("Change streams unavailable, record feed uses in-process fan-out")
+            return
+        self.source = "change_stream"
+        self._watcher = asyncio.create_task(self._watch())
+        logger.info("Record feed started on the medical_records change stream")
+
+    async def close(self) -> None:
+        """Stop watching the change stream."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            await asyncio.gather(self._watcher, return_exceptions=True)
+            self._watcher = None
+        self.source = "memory"
+
+    async def _supports_change_streams(self) -> bool:
+        db = get_database()
+        if db is None:
+            return False
+        try:
+            hello = await db.command("hello")
+        except Exception as e:
+            logger.warning("Could not inspect the MongoDB deployment: %s", e)
+            return False
+        return "setName" in hello or hello.get("msg") == "isdbgrid"
+
+    async def _watch(self) -> None:
+        token = None
+        failures = 0
+        while True:
+            try:
+                collection = get_database().medical_records
+                async with collection.watch(OWNED_INSERTS, resume_after=token) as stream:
+                    async for change in stream:
+                        token = change["_id"]
+                        failures = 0
+                        self._fan_out(change["fullDocument"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                if getattr(e, "code", None) in NON_RESUMABLE_ERRORS:
+                    token = None
+                logger.error("Record change stream failed, reopening: %s", e)
+                await asyncio.sleep(
+                    backoff_delay(
+                        failures,
+                        settings.record_feed_retry_base_seconds,
+                        settings.record_feed_retry_max_seconds,
+                    )
+                )
+
+    def publish(self, doc: dict) -> None:
+        """
+        Deliver a record created by this worker.
+
+        Ignored while the change stream is the source, since it delivers the
+        insert itself.
+
+        Args:
+            doc: Stored record document, including its ``_id``.
+        """
+        if self.source == "memory":
+            self._fan_out(doc)
+
+    def _fan_out(self, doc: dict) -> None:
+        self._counters["published"] += 1
+        for subscription in self._subscribers:
+            if subscription.overflowed or subscription.user_id != doc.get("user_id"):
+                continue
+            if not subscription.offer(doc):
+                self._counters["overflows"] += 1
+
+    async def follow(
+        self, user_id: str, after: Optional[ObjectId] = None
+    ) -> AsyncIterator[tuple[str, dict]]:
+        """
+        Stream one user's records to a subscriber.
+
+        Args:
+            user_id: Owner of the records to stream.
+            after: Id of the last record the subscriber received; records
+                created since then are replayed first.
+
+        Yields:
+            tuple: ``("record", doc)`` for each record, ``("heartbeat", {})``
+            after ``heartbeat_seconds`` without one, and finally
+            ``("overflow", {"resume": last_id})`` if the subscriber fell
+            too far behind, after which the stream ends.
+        """
+        subscription = FeedSubscription(user_id, self.queue_size)
+        self._subscribers.add(subscription)
+        try:
+            last_id = after
+            replayed: deque = deque(maxlen=self.queue_size)
+            if after is not None:
+                async for doc in self._replay(user_id, after):
+                    replayed.append(doc["_id"])
+                    last_id = doc["_id"]
+                    self._counters["replayed"] += 1
+                    yield "record", doc
+            while True:
+                if subscription.overflowed and subscription.queue.empty():
+                    yield "overflow", {"resume": str(last_id) if last_id else None}
+                    return
+                try:
+                    doc = await asyncio.wait_for(subscription.queue.get(), self.heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield "heartbeat", {}
+                    continue
+                if doc["_id"] in replayed:
+                    continue
+                last_id = doc["_id"]
+                self._counters["delivered"] += 1
+                yield "record", doc
+        finally:
+            self._subscribers.discard(subscription)
+
+    async def _replay(self, user_id: str, after: ObjectId) -> AsyncIterator[dict]:
+        collection = get_database().medical_records
+        while True:
+            docs = (
+                await collection.find({"_id": {"$gt": after}, "user_id": user_id})
+                .sort("_id", 1)
+                .limit(self.replay_page_size)
+                .to_list(length=self.replay_page_size)
+            )
+            for doc in docs:
+                yield doc
+            if len(docs) < self.replay_page_size:
+                return
+            after = docs[-1]["_id"]
+
+    def stats(self) -> dict:
+        """
+        Return feed statistics.
+
+        Returns:
+            dict: Source, subscriber count and limit, and record counters.
+        """
+        return {
+            "source": self.source,
+            "subscribers": len(self._subscribers),
+            "max_subscribers": self.max_subscribers,
+            **self._counters,
+        }
+
+
+record_feed = RecordFeed(
+    backend=settings.record_feed_backend,
+    queue_size=settings.record_feed_queue_size,
+    max_subscribers=settings.record_feed_max_subscribers,
+    heartbeat_seconds=settings.record_feed_heartbeat_seconds,
+    replay_page_size=settings.record_feed_replay_page_size,
+)
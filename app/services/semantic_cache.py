@@ -0,0 +1,426 @@
+"""
+Semantic Analysis Cache Module.
+
+This module reuses analyses for near-duplicate requests such as "headache,
+fever" and "fever and headache". Symptoms and medical history are turned
+into hashed TF-IDF vectors locally, and a request is answered with a stored
+analysis when their cosine similarity reaches a threshold.
+
+Vectors are kept in one array and indexed by partition (model, age band and
+the additional information the prompt uses), then by a SimHash signature.
+A lookup only scores the buckets within a small Hamming radius of the query
+signature, so its cost depends on the bucket sizes rather than the number
+of entries. The index can be saved to disk and loaded at startup.
+
+NumPy is optional: without it the cache reports itself unavailable.
+"""
+
+import hashlib
+import itertools
+import json
+import math
+import os
+import time
+import zlib
+from collections import Counter
+from typing import Optional
+
+from app.core.config import settings
+from app.core.logging import logger
+from app.models.medical_record import MedicalAnalysis, PatientData
+from app.services.analysis_cache import text_terms
+from app.services.prompt_builder import select_additional_info
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on the environment
+    np = None
+
+INDEX_VERSION = 1
+LOAD_BATCH = 65536
+
+
+def terms(patient_data: PatientData) -> list[str]:
+    """
+    Extract the terms compared between requests.
+
+    History terms are prefixed so they never match symptom terms.
+
+    Args:
+        patient_data: Patient information.
+
+    Returns:
+        list[str]: Symptom terms followed by history terms.
+    """
+    history = ["h:" + term for term in text_terms(patient_data.medical_history)]
+    return text_terms(patient_data.symptoms) + history
+
+
+def partition_key(patient_data: PatientData, model: str, age_band_years: int) -> str:
+    """
+    Return the partition a request is searched in.
+
+    Only analyses from the same model, the same age band and the same
+    relevant additional information (allergies, medications, ...) are
+    candidates for reuse.
+
+    Args:
+        patient_data: Patient information.
+        model: Name of the model producing the analysis.
+        age_band_years: Width of an age band.
+
+    Returns:
+        str: Partition key.
+    """
+    info = select_additional_info(patient_data.additional_info)
+    digest = ""
+    if info:
+        encoded = json.dumps(info, sort_keys=True, separators=(",", ":"), default=str)
+        digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+    return f"{model}|{patient_data.age // age_band_years}|{digest}"
+
+
+class _Bucket:
+    """Growable array of the slots sharing a partition and signature."""
+
+    __slots__ = ("slots", "size")
+
+    def __init__(self):
+        self.slots = np.empty(4, dtype=np.int32)
+        self.size = 0
+
+    def append(self, slot: int, positions) -> None:
+        if self.size == len(self.slots):
+            self.slots = np.concatenate([self.slots, np.empty_like(self.slots)])
+        self.slots[self.size] = slot
+        positions[slot] = self.size
+        self.size += 1
+
+    def remove(self, slot: int, positions) -> None:
+        position = positions[slot]
+        last = self.slots[self.size - 1]
+        self.slots[position] = last
+        positions[last] = position
+        self.size -= 1
+
+
+class SemanticAnalysisCache:
+    """
+    Near-duplicate analysis cache backed by NumPy arrays.
+
+    Vectors are quantized to int8 with a scale per vector (a quarter of the
+    float32 size, and cheap to widen when scoring) in a ring of at most
+    ``max_entries`` slots; once full, the oldest entry is overwritten. Document frequencies
+    for the IDF weights are cumulative and are not reduced on eviction.
+
+    Attributes:
+        available: Whether NumPy is installed.
+        threshold: Minimum cosine similarity for a hit.
+        hits: Number of lookups answered from the cache.
+        misses: Number of lookups that found no similar entry.
+        evictions: Number of entries overwritten to respect ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        max_entries: int,
+        ttl_seconds: float,
+        dimensions: int = 256,
+        signature_bits: int = 12,
+        probe_radius: int = 1,
+        age_band_years: int = 10,
+        seed: int = 0,
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            threshold: Minimum cosine similarity for a hit.
+            max_entries: Maximum number of stored analyses.
+            ttl_seconds: Lifetime of a stored analysis.
+            dimensions: Size of the hashed feature space.
+            signature_bits: Random hyperplanes in the SimHash signature.
+            probe_radius: Signature bits a candidate bucket may differ in.
+            age_band_years: Width of the age bands partitioning the index.
+            seed: Seed of the SimHash hyperplanes.
+        """
+        self.available = np is not None
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.dimensions = dimensions
+        self.signature_bits = signature_bits
+        self.probe_radius = probe_radius
+        self.age_band_years = age_band_years
+        self.seed = seed
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._probes = [
+            sum(1 << bit for bit in flipped)
+            for radius in range(probe_radius + 1)
+            for flipped in itertools.combinations(range(signature_bits), radius)
+        ]
+        if self.available:
+            rng = np.random.default_rng(seed)
+            self._planes = rng.standard_normal((signature_bits, dimensions)).astype(np.float32)
+            self._bit_values = (1 << np.arange(signature_bits)).astype(np.int64)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._count = 0
+        self._cursor = 0
+        self._docs = 0
+        self._partitions: dict[str, dict[int, _Bucket]] = {}
+        self._slot_keys: list[Optional[tuple[str, int]]] = []
+        self._analyses: list[Optional[str]] = []
+        if self.available:
+            self._df = np.zeros(self.dimensions, dtype=np.float32)
+            self._vectors = np.empty((0, self.dimensions), dtype=np.int8)
+            self._scales = np.empty(0, dtype=np.float32)
+            self._created = np.empty(0, dtype=np.float64)
+            self._positions = np.empty(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _vectorize(self, patient_data: PatientData):
+        counts = Counter(terms(patient_data))
+        if not counts:
+            return None, None
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for term, count in counts.items():
+            digest = zlib.crc32(term.encode("utf-8"))
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.dimensions] += sign * (1.0 + math.log(count))
+        touched = np.flatnonzero(vector)
+        vector *= np.log((1.0 + self._docs) / (1.0 + self._df)) + 1.0
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return None, None
+        return vector / norm, touched
+
+    def _signature(self, vector) -> int:
+        return int(((self._planes @ vector) > 0) @ self._bit_values)
+
+    def lookup(self, patient_data: PatientData, model: str) -> Optional[MedicalAnalysis]:
+        """
+        Find the stored analysis of the most similar request.
+
+        Args:
+            patient_data: Patient information.
+            model: Name of the model producing the analysis.
+
+        Returns:
+            MedicalAnalysis: A copy of the stored analysis with ``similarity``
+            set to the cosine similarity, or None below the threshold.
+        """
+        partition = self._partitions.get(partition_key(patient_data, model, self.age_band_years))
+        vector = None
+        if partition is not None:
+            vector, _ = self._vectorize(patient_data)
+        if vector is None:
+            self.misses += 1
+            return None
+
+        signature = self._signature(vector)
+        candidates = [
+            bucket.slots[: bucket.size]
+            for probe in self._probes
+            if (bucket := partition.get(signature ^ probe)) is not None
+        ]
+        if not candidates:
+            self.misses += 1
+            return None
+
+        slots = np.concatenate(candidates) if len(candidates) > 1 else candidates[0]
+        scores = (self._vectors[slots].astype(np.float32) @ vector) * self._scales[slots]
+        scores[self._created[slots] < time.time() - self.ttl_seconds] = -1.0
+        best = int(np.argmax(scores))
+        similarity = float(scores[best])
+        if similarity < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        analysis = MedicalAnalysis.model_validate_json(self._analyses[slots[best]])
+        analysis.similarity = round(min(similarity, 1.0), 4)
+        return analysis
+
+    def add(self, patient_data: PatientData, model: str, analysis: MedicalAnalysis) -> None:
+        """
+        Store an analysis for later near-duplicate requests.
+
+        Args:
+            patient_data: Patient information the analysis answers.
+            model: Name of the model that produced it.
+            analysis: Analysis to store.
+        """
+        vector, touched = self._vectorize(patient_data)
+        if vector is None:
+            return
+        self._df[touched] += 1.0
+        self._docs += 1
+
+        slot = self._claim_slot()
+        scale = float(np.abs(vector).max()) / 127.0
+        self._vectors[slot] = np.rint(vector / scale)
+        self._scales[slot] = scale
+        self._created[slot] = time.time()
+        self._analyses[slot] = analysis.model_dump_json(exclude={"similarity"})
+        partition = partition_key(patient_data, model, self.age_band_years)
+        self._insert(slot, partition, self._signature(vector))
+
+    def _insert(self, slot: int, partition: str, signature: int) -> None:
+        bucket = self._partitions.setdefault(partition, {}).get(signature)
+        if bucket is None:
+            bucket = self._partitions[partition][signature] = _Bucket()
+        bucket.append(slot, self._positions)
+        self._slot_keys[slot] = (partition, signature)
+
+    def _claim_slot(self) -> int:
+        if self._count < self.max_entries:
+            if self._count == len(self._created):
+                self._grow(min(self.max_entries, max(1024, 2 * self._count)))
+            self._count += 1
+            return self._count - 1
+
+        slot = self._cursor
+        self._cursor = (self._cursor + 1) % self.max_entries
+        partition, signature = self._slot_keys[slot]
+        buckets = self._partitions[partition]
+        buckets[signature].remove(slot, self._positions)
+        if buckets[signature].size == 0:
+            del buckets[signature]
+            if not buckets:
+                del self._partitions[partition]
+        self.evictions += 1
+        return slot
+
+    def _grow(self, capacity: int) -> None:
+        extra = capacity - len(self._created)
+        self._vectors = np.concatenate(
+            [self._vectors, np.empty((extra, self.dimensions), dtype=np.int8)]
+        )
+        self._scales = np.concatenate([self._scales, np.empty(extra, dtype=np.float32)])
+        self._created = np.concatenate([self._created, np.empty(extra, dtype=np.float64)])
+        self._positions = np.concatenate([self._positions, np.empty(extra, dtype=np.int32)])
+        self._slot_keys.extend([None] * extra)
+        self._analyses.extend([None] * extra)
+
+    def save(self, path: str) -> None:
+        """
+        Write the index to ``path`` atomically.
+
+        Args:
+            path: Destination file (NumPy ``.npz`` format).
+        """
+        used = self._count
+        partitions = sorted({key[0] for key in self._slot_keys[:used]})
+        numbers = {name: number for number, name in enumerate(partitions)}
+        meta = {
+            "version": INDEX_VERSION,
+            "dimensions": self.dimensions,
+            "signature_bits": self.signature_bits,
+            "seed": self.seed,
+            "cursor": self._cursor,
+            "docs": self._docs,
+            "partitions": partitions,
+        }
+        analyses = "\n".join(self._analyses[:used]).encode("utf-8")
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as output:
+            np.savez(
+                output,
+                meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+                vectors=self._vectors[:used],
+                scales=self._scales[:used],
+                created=self._created[:used],
+                partitions=np.array(
+                    [numbers[key[0]] for key in self._slot_keys[:used]], dtype=np.int32
+                ),
+                df=self._df,
+                analyses=np.frombuffer(analyses, dtype=np.uint8),
+            )
+        os.replace(temporary, path)
+        logger.info("Saved semantic cache index with %s entries to %s", used, path)
+
+    def load(self, path: str) -> bool:
+        """
+        Replace the index with one saved by ``save``.
+
+        Entries beyond ``max_entries`` are dropped. Files written with a
+        different vector layout are ignored.
+
+        Args:
+            path: File written by ``save``.
+
+        Returns:
+            bool: Whether an index was loaded.
+        """
+        try:
+            with np.load(path) as data:
+                meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+                layout = (meta["version"], meta["dimensions"], meta["signature_bits"], meta["seed"])
+                expected = (INDEX_VERSION, self.dimensions, self.signature_bits, self.seed)
+                if layout != expected:
+                    logger.warning("Ignoring semantic cache index %s with another layout", path)
+                    return False
+                used = min(len(data["created"]), self.max_entries)
+                vectors = data["vectors"][:used]
+                scales = data["scales"][:used]
+                created = data["created"][:used]
+                partitions = data["partitions"][:used]
+                df = data["df"]
+                analyses = data["analyses"].tobytes().decode("utf-8").split("\n")[:used]
+        except FileNotFoundError:
+            logger.info("No semantic cache index at %s, starting empty", path)
+            return False
+
+        self._reset()
+        self._grow(used)
+        self._vectors[:] = vectors
+        self._scales[:] = scales
+        self._created[:] = created
+        self._analyses[:] = analyses
+        self._df[:] = df
+        self._docs = meta["docs"]
+        self._count = used
+        self._cursor = meta["cursor"] if meta["cursor"] < used else 0
+        names = meta["partitions"]
+        for start in range(0, used, LOAD_BATCH):
+            batch = self._vectors[start : start + LOAD_BATCH].astype(np.float32)
+            signatures = ((batch @ self._planes.T) > 0) @ self._bit_values
+            for slot, signature in enumerate(signatures.tolist(), start):
+                self._insert(slot, names[partitions[slot]], signature)
+        logger.info("Loaded semantic cache index with %s entries from %s", used, path)
+        return True
+
+    def stats(self) -> dict:
+        """
+        Return cache statistics.
+
+        Returns:
+            dict: Entries, partitions, threshold and hit/miss/eviction counters.
+        """
+        return {
+            "available": self.available,
+            "entries": self._count,
+            "partitions": len(self._partitions),
+            "threshold": self.threshold,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+semantic_cache = SemanticAnalysisCache(
+    threshold=settings.semantic_cache_threshold,
+    max_entries=settings.semantic_cache_max_entries,
+    ttl_seconds=settings.semantic_cache_ttl_seconds,
+    dimensions=settings.semantic_cache_dimensions,
+    signature_bits=settings.semantic_cache_signature_bits,
+    probe_radius=settings.semantic_cache_probe_radius,
+    age_band_years=settings.semantic_cache_age_band_years,
+)
@@ -0,0 +1,425 @@
+"""
+Benchmark Runner.
+
+Drives the FastAPI application in-process at fixed concurrency levels,
+with Groq, MongoDB and Resend replaced by the stand-ins in
+``benchmarks.stubs``, and reports throughput, latency percentiles and
+memory as JSON.
+
+Usage:
+    python -m benchmarks.run --concurrency 1 16 64 --requests 500 --output bench.json
+    python -m benchmarks.run --compare bench.json --output bench-new.json
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Optional
+
+SCENARIOS = ("analyze", "analyze_cached", "create_record", "list_records", "auth_flow")
+BENCH_ENVIRONMENT = {
+    "MONGODB_URL": "mongodb://bench.invalid:27017",
+    "GROQ_API_KEY": "bench",
+    "RESEND_API_KEY": "bench",
+    "LOG_LEVEL": "WARNING",
+    # Every simulated client shares one address, so per-IP limits would throttle the run.
+    "RATE_LIMIT_ENABLED": "false",
+}
+
+
+def configure_environment() -> None:
+    """Provide placeholder settings so the app imports without a real .env."""
+    for name, value in BENCH_ENVIRONMENT.items():
+        os.environ.setdefault(name, value)
+
+
+def patient(index: int) -> dict:
+    """Build a patient payload; distinct indexes give distinct cache keys."""
+    return {
+        "patient_name": f"Bench Patient {index}",
+        "age": 20 + index % 60,
+        "symptoms": f"persistent cough and mild fever, day {index}",
+        "medical_history": "seasonal allergies",
+    }
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """
+    Return the nearest-rank percentile of already sorted values.
+
+    Args:
+        sorted_values: Samples in ascending order.
+        fraction: Percentile as a fraction, e.g. 0.95.
+
+    Returns:
+        float: The percentile, or 0.0 for no samples.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def memory_mb() -> dict:
+    """Return the current and peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    current_mb = None
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        current_mb = round(pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024), 1)
+    except (OSError, ValueError):
+        pass
+    return {"rss_mb": current_mb, "peak_rss_mb": round(peak_mb, 1)}
+
+
+def git_commit() -> Optional[str]:
+    """Return the current commit hash, if run from a git checkout."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+async def drive(
+    request: Callable[[int], Awaitable[bool]], concurrency: int, total: int
+) -> tuple[list[float], int, float]:
+    """
+    Issue ``total`` requests from ``concurrency`` concurrent workers.
+
+    Args:
+        request: Coroutine function sending request number ``i``; returns
+            whether it succeeded.
+        concurrency: Number of concurrent workers.
+        total: Number of requests to send.
+
+    Returns:
+        tuple: Latencies in seconds, error count and wall-clock duration.
+    """
+    counter = itertools.count()
+    latencies: list[float] = []
+    errors = 0
+
+    async def worker():
+        nonlocal errors
+        for index in iter(lambda: next(counter), None):
+            if index >= total:
+                return
+            start = time.perf_counter()
+            try:
+                ok = await request(index)
+            except Exception:
+                ok = False
+            latencies.append(time.perf_counter() - start)
+            if not ok:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - started
+
+
+def summarize(
+    scenario: str, concurrency: int, latencies: list[float], errors: int, elapsed: float
+) -> dict:
+    """Build the result entry for one scenario run."""
+    ordered = sorted(latencies)
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(ordered),
+        "errors": errors,
+        "duration_s": round(elapsed, 4),
+        "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+            "p50": round(percentile(ordered, 0.50) * 1000, 3),
+            "p95": round(percentile(ordered, 0.95) * 1000, 3),
+            "p99": round(percentile(ordered, 0.99) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        },
+        "memory": memory_mb(),
+    }
+
+
+@asynccontextmanager
+async def bench_environment(first_token_latency: float, token_delay: float):
+    """
+    Swap the application's external services for local stand-ins.
+
+    Starts the background services the lifespan would start, and restores
+    the original clients on exit.
+
+    Args:
+        first_token_latency: Fake Groq latency before the first token.
+        token_delay: Fake Groq delay between streamed chunks.
+
+    Yields:
+        None: Control while the stand-ins are installed.
+    """
+    import httpx
+    from groq import AsyncGroq
+
+    from app.core import database
+    from app.services.container import services
+    from app.services.email_outbox import email_outbox
+    from app.services.job_service import record_jobs
+    from benchmarks.stubs import InMemoryDatabase, fake_groq_app, noop_sender
+
+    ai_service, auth_service = services.ai_service, services.auth_service
+    saved = (database.db, ai_service.client, email_outbox.sender)
+    groq_http = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=fake_groq_app(first_token_latency, token_delay))
+    )
+    database.db = InMemoryDatabase()
+    ai_service.client = AsyncGroq(
+        api_key="bench", base_url="http://groq.bench", http_client=groq_http, max_retries=0
+    )
+    email_outbox.sender = noop_sender
+    await auth_service.otp_storage.start()
+    await email_outbox.start()
+    await record_jobs.start()
+    try:
+        yield
+    finally:
+        await record_jobs.close()
+        await email_outbox.close()
+        await auth_service.otp_storage.close()
+        await groq_http.aclose()
+        database.db, ai_service.client, email_outbox.sender = saved
+
+
+async def login(client, email: str) -> Optional[str]:
+    """
+    Run the OTP flow for ``email``, reading the code from the OTP store.
+
+    Returns:
+        str: The access token, or None if any step failed.
+    """
+    from app.services.container import services
+
+    response = await client.post("/auth/request-otp", json={"email": email, "name": "Bench"})
+    if response.status_code != 200:
+        return None
+    stored = await services.auth_service.otp_storage.get(email)
+    if stored is None:
+        return None
+    response = await client.post("/auth/verify-otp", json={"email": email, "otp": stored["otp"]})
+    if response.status_code != 200:
+        return None
+    return response.json()["access_token"]
+
+
+def build_scenarios(client, headers: dict) -> dict:
+    """Map scenario names to request functions."""
+
+    async def analyze(index: int) -> bool:
+        response = await client.post("/records/analyze", json=patient(index))
+        return response.status_code == 200
+
+    async def analyze_cached(index: int) -> bool:
+        response = await client.post("/records/analyze", json=patient(0))
+        return response.status_code == 200
+
+    async def create_record(index: int) -> bool:
+        response = await client.post("/records", json=patient(index), headers=headers)
+        return response.status_code == 200
+
+    async def list_records(index: int) -> bool:
+        response = await client.get("/records", params={"limit": 50}, headers=headers)
+        return response.status_code == 200
+
+    async def auth_flow(index: int) -> bool:
+        return await login(client, f"bench-{index}@example.com") is not None
+
+    return {
+        "analyze": analyze,
+        "analyze_cached": analyze_cached,
+        "create_record": create_record,
+        "list_records": list_records,
+        "auth_flow": auth_flow,
+    }
+
+
+async def run_benchmarks(
+    scenarios: list[str],
+    concurrency_levels: list[int],
+    requests: int,
+    first_token_latency: float = 0.05,
+    token_delay: float = 0.0,
+    seed_records: int = 1000,
+) -> dict:
+    """
+    Run every scenario at every concurrency level.
+
+    Args:
+        scenarios: Scenario names from ``SCENARIOS``.
+        concurrency_levels: Numbers of concurrent clients.
+        requests: Requests per scenario and concurrency level.
+        first_token_latency: Fake Groq latency before the first token.
+        token_delay: Fake Groq delay between streamed chunks.
+        seed_records: Records inserted before the first scenario runs.
+
+    Returns:
+        dict: Run metadata and one result entry per scenario and level.
+    """
+    import httpx
+
+    from app.core.config import settings
+    from app.main import app
+    from app.services.container import services
+
+    results = []
+    async with bench_environment(first_token_latency, token_delay):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            token = await login(client, "bench-owner@example.com")
+            if token is None:
+                raise RuntimeError("Benchmark login failed")
+            headers = {"Authorization": f"Bearer {token}"}
+            await seed(seed_records)
+            request_functions = build_scenarios(client, headers)
+
+            for scenario in scenarios:
+                for concurrency in concurrency_levels:
+                    if services.ai_service.cache is not None:
+                        services.ai_service.cache.memory.clear()
+                    latencies, errors, elapsed = await drive(
+                        request_functions[scenario], concurrency, requests
+                    )
+                    result = summarize(scenario, concurrency, latencies, errors, elapsed)
+                    results.append(result)
+                    print(format_result(result), file=sys.stderr)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": requests,
+            "groq_first_token_latency_s": first_token_latency,
+            "groq_token_delay_s": token_delay,
+            "groq_max_concurrency": settings.groq_max_concurrency,
+            "seed_records": seed_records,
+        },
+        "results": results,
+    }
+
+
+async def seed(count: int) -> None:
+    """Insert ``count`` completed records owned by a throwaway user."""
+    from app.core.database import get_database
+    from app.models.medical_record import MedicalAnalysis, PatientData
+    from app.routes.records import build_record_doc
+
+    analysis = MedicalAnalysis(analysis="Seeded analysis", recommendations=["Rest"])
+    docs = [
+        build_record_doc(PatientData(**patient(index)), analysis, "seed-user")
+        for index in range(count)
+    ]
+    if docs:
+        await get_database().medical_records.insert_many(docs)
+
+
+def format_result(result: dict) -> str:
+    """Render a result entry as one human-readable line."""
+    latency = result["latency_ms"]
+    return (
+        f"{result['scenario']:<15} c={result['concurrency']:<4} "
+        f"rps={result['rps']:>9.1f} p50={latency['p50']:>8.2f}ms "
+        f"p95={latency['p95']:>8.2f}ms p99={latency['p99']:>8.2f}ms "
+        f"errors={result['errors']} peak_rss={result['memory']['peak_rss_mb']}MiB"
+    )
+
+
+def compare(baseline: dict, current: dict) -> list[str]:
+    """
+    Compare two result documents.
+
+    Args:
+        baseline: Earlier output of this runner.
+        current: Output of this run.
+
+    Returns:
+        list[str]: One line per scenario and concurrency level present in both,
+        with the relative change in RPS and p95 latency.
+    """
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    lines = []
+    for result in current["results"]:
+        before = previous.get((result["scenario"], result["concurrency"]))
+        if before is None:
+            continue
+        rps_change = _relative(before["rps"], result["rps"])
+        p95_change = _relative(before["latency_ms"]["p95"], result["latency_ms"]["p95"])
+        lines.append(
+            f"{result['scenario']:<15} c={result['concurrency']:<4} "
+            f"rps {before['rps']:.1f} -> {result['rps']:.1f} ({rps_change:+.1f}%) "
+            f"p95 {before['latency_ms']['p95']:.2f} -> {result['latency_ms']['p95']:.2f}ms "
+            f"({p95_change:+.1f}%)"
+        )
+    return lines
+
+
+def _relative(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def parse_args(argv: Optional[list[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline benchmark of the Medical Records API")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 16, 64])
+    parser.add_argument("--requests", type=int, default=500, help="requests per run")
+    parser.add_argument("--groq-latency", type=float, default=0.05, help="seconds to first token")
+    parser.add_argument("--groq-token-delay", type=float, default=0.0, help="seconds per chunk")
+    parser.add_argument("--seed-records", type=int, default=1000)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    args = parse_args(argv)
+    configure_environment()
+
+    report = asyncio.run(
+        run_benchmarks(
+            args.scenarios,
+            args.concurrency,
+            args.requests,
+            first_token_latency=args.groq_latency,
+            token_delay=args.groq_token_delay,
+            seed_records=args.seed_records,
+        )
+    )
+
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(encoded + "\n")
+    else:
+        print(encoded)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            for line in compare(json.load(baseline), report):
+                print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
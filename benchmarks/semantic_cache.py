@@ -0,0 +1,155 @@
+"""
+Semantic Cache Benchmark.
+
+Measures lookup latency of the semantic analysis cache as the number of
+stored analyses grows, for near-duplicate queries (stored symptoms in
+another order) and unrelated ones.
+
+Usage:
+    python -m benchmarks.semantic_cache --sizes 10000 100000 1000000 --output semantic.json
+"""
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from benchmarks.run import configure_environment, git_commit, percentile
+
+SYMPTOMS = (
+    "headache fever cough fatigue nausea vomiting dizziness rash chills sweating sore-throat "
+    "congestion wheezing palpitations insomnia anxiety back-pain chest-pain joint-pain "
+    "abdominal-pain diarrhea constipation bloating heartburn numbness tingling weakness "
+    "blurred-vision earache tinnitus itching swelling bruising cramps shortness-of-breath "
+    "weight-loss weight-gain thirst frequent-urination confusion tremor stiffness"
+).split()
+# Coded findings widen the vocabulary so that, as in production where only
+# misses are stored, the index is not dominated by repeats of a few requests.
+FINDINGS = [f"finding{number}" for number in range(5000)]
+HISTORY = (
+    "asthma diabetes hypertension migraine eczema arthritis anemia hypothyroidism "
+    "depression gerd obesity smoking"
+).split()
+
+
+def make_patient(rng: random.Random, symptoms: list[str], history: list[str]):
+    """Build a patient with the given symptoms and history terms."""
+    from app.models.medical_record import PatientData
+
+    return PatientData(
+        patient_name="Bench Patient",
+        age=rng.randint(18, 90),
+        symptoms=", ".join(symptoms),
+        medical_history=", ".join(history) or None,
+    )
+
+
+def random_patient(rng: random.Random):
+    """Build a patient with a random set of symptoms and history."""
+    symptoms = rng.sample(SYMPTOMS, rng.randint(1, 3)) + rng.sample(FINDINGS, rng.randint(1, 3))
+    return make_patient(rng, symptoms, rng.sample(HISTORY, rng.randint(0, 2)))
+
+
+def time_lookups(cache, queries: list, model: str) -> dict:
+    """Return lookup latency percentiles in microseconds and the hit count."""
+    hits = 0
+    samples = []
+    for patient_data in queries:
+        start = time.perf_counter()
+        hits += cache.lookup(patient_data, model) is not None
+        samples.append((time.perf_counter() - start) * 1_000_000)
+    samples.sort()
+    return {
+        "hits": hits,
+        "p50_us": round(percentile(samples, 0.5), 1),
+        "p99_us": round(percentile(samples, 0.99), 1),
+    }
+
+
+def run(sizes: list[int], queries: int, seed: int = 0) -> dict:
+    """
+    Fill a cache to each size and time lookups against it.
+
+    Args:
+        sizes: Numbers of stored analyses, in increasing order.
+        queries: Lookups timed per size and query kind.
+        seed: Seed of the generated patients.
+
+    Returns:
+        dict: Run metadata and per-size results.
+    """
+    from app.core.config import settings
+    from app.models.medical_record import MedicalAnalysis
+    from app.services.semantic_cache import SemanticAnalysisCache
+
+    model = settings.groq_model
+    rng = random.Random(seed)
+    cache = SemanticAnalysisCache(
+        threshold=settings.semantic_cache_threshold,
+        max_entries=max(sizes),
+        ttl_seconds=settings.semantic_cache_ttl_seconds,
+        dimensions=settings.semantic_cache_dimensions,
+        signature_bits=settings.semantic_cache_signature_bits,
+        probe_radius=settings.semantic_cache_probe_radius,
+        age_band_years=settings.semantic_cache_age_band_years,
+    )
+    analysis = MedicalAnalysis(analysis="Benchmark analysis", recommendations=["Rest"])
+    stored = []
+    results = []
+    for size in sizes:
+        start = time.perf_counter()
+        while len(cache) < size:
+            patient_data = random_patient(rng)
+            cache.add(patient_data, model, analysis)
+            stored.append(patient_data)
+        fill_seconds = time.perf_counter() - start
+
+        near = []
+        for patient_data in rng.sample(stored, min(queries, len(stored))):
+            symptoms = [part.strip() for part in patient_data.symptoms.split(",")]
+            rng.shuffle(symptoms)
+            near.append(patient_data.model_copy(update={"symptoms": " and ".join(symptoms)}))
+        unrelated = [random_patient(rng) for _ in range(queries)]
+        results.append(
+            {
+                "entries": len(cache),
+                "partitions": cache.stats()["partitions"],
+                "fill_seconds": round(fill_seconds, 2),
+                "near_duplicate": time_lookups(cache, near, model),
+                "unrelated": time_lookups(cache, unrelated, model),
+            }
+        )
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "queries": queries,
+            "threshold": cache.threshold,
+            "dimensions": cache.dimensions,
+            "signature_bits": cache.signature_bits,
+            "probe_radius": cache.probe_radius,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Semantic analysis cache lookup latency")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+    configure_environment()
+
+    encoded = json.dumps(run(sorted(args.sizes), args.queries), indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(encoded + "\n")
+    else:
+        print(encoded)
+
+
+if __name__ == "__main__":
+    main()
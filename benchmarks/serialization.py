@@ -0,0 +1,137 @@
+"""
+Record Serialization Benchmark.
+
+Measures the per-record cost of rendering ``GET /records`` pages through
+the validated path (model construction, response-model validation and the
+standard encoder) against the fast path (``record_payload`` plus
+``app.core.serialization.dumps``).
+
+Usage:
+    python -m benchmarks.serialization --sizes 10 100 1000 --output serialization.json
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from bson import ObjectId
+
+from benchmarks.run import configure_environment, git_commit, patient
+
+
+def make_docs(count: int) -> list[dict]:
+    """Build stored record documents the way the API writes them."""
+    from app.models.medical_record import MedicalAnalysis, PatientData
+    from app.routes.records import build_record_doc
+
+    analysis = MedicalAnalysis(
+        analysis="Symptoms are consistent with a self-limiting viral infection.",
+        recommendations=["Rest", "Stay hydrated", "See a doctor if symptoms persist"],
+    )
+    start = datetime(2024, 1, 1)
+    docs = []
+    for index in range(count):
+        doc = build_record_doc(PatientData(**patient(index)), analysis, "bench-user")
+        # Documents read back from MongoDB carry an _id and naive UTC datetimes.
+        doc["_id"] = ObjectId()
+        doc["created_at"] = start + timedelta(seconds=index)
+        docs.append(doc)
+    return docs
+
+
+def validated_path() -> Callable[[list[dict]], bytes]:
+    """Return the previous rendering: build models, re-validate, encode."""
+    from pydantic import TypeAdapter
+
+    from app.models.medical_record import MedicalRecord
+    from app.routes.records import record_from_doc
+
+    adapter = TypeAdapter(list[MedicalRecord])
+
+    def render(docs: list[dict]) -> bytes:
+        records = [record_from_doc(doc) for doc in docs]
+        value = adapter.validate_python(records, from_attributes=True)
+        content = adapter.dump_python(value, mode="json")
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    return render
+
+
+def fast_path() -> Callable[[list[dict]], bytes]:
+    """Return the fast rendering used by ``GET /records``."""
+    from app.core.serialization import dumps
+    from app.routes.records import record_payload
+
+    def render(docs: list[dict]) -> bytes:
+        return dumps([record_payload(doc) for doc in docs])
+
+    return render
+
+
+def time_per_record(render: Callable[[list[dict]], bytes], docs: list[dict], rounds: int) -> float:
+    """Return the best-of-``rounds`` cost per record in microseconds."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        render(docs)
+        best = min(best, time.perf_counter() - start)
+    return best / len(docs) * 1_000_000
+
+
+def run(sizes: list[int], rounds: int) -> dict:
+    """
+    Benchmark both paths for every page size.
+
+    Args:
+        sizes: Numbers of records per page.
+        rounds: Repetitions per measurement; the fastest is kept.
+
+    Returns:
+        dict: Run metadata and per-size results.
+    """
+    from app.core import serialization
+
+    paths = {"validated": validated_path(), "fast": fast_path()}
+    results = []
+    for size in sizes:
+        docs = make_docs(size)
+        costs = {name: time_per_record(render, docs, rounds) for name, render in paths.items()}
+        results.append(
+            {
+                "records": size,
+                "validated_us_per_record": round(costs["validated"], 3),
+                "fast_us_per_record": round(costs["fast"], 3),
+                "speedup": round(costs["validated"] / costs["fast"], 2),
+            }
+        )
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "encoder": "orjson" if serialization.orjson is not None else "json",
+            "rounds": rounds,
+        },
+        "results": results,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Per-record cost of GET /records rendering")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+    configure_environment()
+
+    encoded = json.dumps(run(args.sizes, args.rounds), indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(encoded + "\n")
+    else:
+        print(encoded)
+
+
+if __name__ == "__main__":
+    main()
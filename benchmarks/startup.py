@@ -0,0 +1,171 @@
+"""
+Startup Benchmark.
+
+Measures, in fresh interpreters, how long importing ``app.main`` takes and
+how long the lifespan startup takes after it (MongoDB replaced by the
+in-memory stand-in), and which heavy SDKs are loaded by then. Each sample
+runs in its own process so nothing is cached between runs.
+
+Point ``--root`` at another checkout (e.g. ``git worktree add /tmp/base
+<commit>``) to measure it with the same probe, and pass an earlier result
+to ``--compare`` to see the change.
+
+Usage:
+    python -m benchmarks.startup --runs 10 --output startup.json
+    python -m benchmarks.startup --root /tmp/base --output startup-base.json
+    python -m benchmarks.startup --compare startup-base.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+from benchmarks.run import BENCH_ENVIRONMENT
+
+HEAVY_MODULES = ("groq", "resend", "numpy")
+
+# Runs in the measured checkout; only relies on names present in every version.
+PROBE = """
+import asyncio, json, resource, sys, time
+
+start = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+
+from app.core import database
+from benchmarks.stubs import InMemoryDatabase
+
+
+async def connect():
+    database.db = InMemoryDatabase()
+
+
+async def disconnect():
+    database.db = None
+
+
+app.main.connect_to_mongo = connect
+app.main.close_mongo_connection = disconnect
+
+
+async def startup():
+    began = time.perf_counter()
+    async with app.main.lifespan(app.main.app):
+        ready = time.perf_counter()
+    return ready - began
+
+
+startup_seconds = asyncio.run(startup())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": startup_seconds * 1000,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "loaded": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+def probe(root: str) -> dict:
+    """Run the probe once in a fresh interpreter and return its measurements."""
+    environment = {**os.environ, **BENCH_ENVIRONMENT, "PYTHONPATH": root}
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=root,
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples: list[float]) -> dict:
+    """Return the median and fastest of a list of milliseconds."""
+    return {"median": round(statistics.median(samples), 1), "min": round(min(samples), 1)}
+
+
+def checkout_commit(root: str) -> Optional[str]:
+    """Return the commit checked out at ``root``, if it is a git checkout."""
+    try:
+        result = subprocess.run(
+            ["git", "-C", root, "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run(root: str, runs: int) -> dict:
+    """
+    Probe a checkout ``runs`` times.
+
+    Args:
+        root: Directory of the checkout to measure.
+        runs: Number of fresh interpreters to start.
+
+    Returns:
+        dict: Run metadata and import/startup timings in milliseconds.
+    """
+    samples = [probe(root) for _ in range(runs)]
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "commit": checkout_commit(root),
+            "python": sys.version.split()[0],
+            "runs": runs,
+        },
+        "import_ms": summarize([sample["import_ms"] for sample in samples]),
+        "startup_ms": summarize([sample["startup_ms"] for sample in samples]),
+        "total_ms": summarize([sample["import_ms"] + sample["startup_ms"] for sample in samples]),
+        "max_rss_mb": round(statistics.median(sample["max_rss_mb"] for sample in samples), 1),
+        "loaded_after_startup": samples[-1]["loaded"],
+    }
+
+
+def compare(baseline: dict, current: dict) -> list[str]:
+    """
+    Compare two result documents.
+
+    Args:
+        baseline: Earlier output of this benchmark.
+        current: Output of this run.
+
+    Returns:
+        list[str]: One line per timing with the relative change of its median.
+    """
+    lines = []
+    for name in ("import_ms", "startup_ms", "total_ms"):
+        before, after = baseline[name]["median"], current[name]["median"]
+        change = (after - before) / before * 100 if before else 0.0
+        lines.append(f"{name:<11} {before:.1f} -> {after:.1f}ms ({change:+.1f}%)")
+    return lines
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Import and startup time of the application")
+    parser.add_argument("--root", default=os.getcwd(), help="checkout to measure")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--compare", help="earlier JSON output to compare against")
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run(os.path.abspath(args.root), args.runs)
+    encoded = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(encoded + "\n")
+    else:
+        print(encoded)
+    if args.compare:
+        with open(args.compare) as baseline:
+            for line in compare(json.load(baseline), report):
+                print(line, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,387 @@
+"""
+Benchmark Stand-ins Module.
+
+This module provides local replacements for the external services the API
+talks to, so benchmarks measure the application rather than the network:
+
+- ``fake_groq_app``: an ASGI app speaking the Groq chat completions API
+  (plain and streamed) with configurable latency.
+- ``InMemoryDatabase``: a Motor-compatible subset of MongoDB covering the
+  operations the application issues.
+- ``noop_sender``: an email sender that discards messages.
+"""
+
+import asyncio
+import copy
+import json
+import time
+from types import SimpleNamespace
+from typing import Any, Optional
+
+from bson import ObjectId
+
+DEFAULT_COMPLETION = json.dumps(
+    {
+        "analysis": "Symptoms are consistent with a self-limiting viral infection.",
+        "recommendations": ["Rest", "Stay hydrated", "See a doctor if symptoms persist"],
+    }
+)
+
+
+def fake_groq_app(
+    first_token_latency: float = 0.05,
+    token_delay: float = 0.0,
+    completion: str = DEFAULT_COMPLETION,
+    chunk_chars: int = 8,
+):
+    """
+    Build an ASGI app answering ``POST /openai/v1/chat/completions``.
+
+    Args:
+        first_token_latency: Seconds before the first byte of the answer.
+        token_delay: Seconds between streamed chunks; plain completions wait
+            for the equivalent total.
+        completion: Assistant message returned for every request.
+        chunk_chars: Characters per streamed chunk (roughly two tokens).
+
+    Returns:
+        Callable: The ASGI application.
+    """
+    chunks = [completion[i : i + chunk_chars] for i in range(0, len(completion), chunk_chars)]
+    usage = {
+        "prompt_tokens": 180,
+        "completion_tokens": len(chunks) * 2,
+        "total_tokens": 180 + len(chunks) * 2,
+    }
+
+    async def app(scope, receive, send):
+        if scope["type"] != "http":
+            return
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                break
+        request = json.loads(body or b"{}")
+        model = request.get("model", "fake-model")
+        created = int(time.time())
+
+        await asyncio.sleep(first_token_latency)
+
+        if not request.get("stream"):
+            await asyncio.sleep(token_delay * len(chunks))
+            payload = {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": completion},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": usage,
+            }
+            await _send_body(send, 200, "application/json", json.dumps(payload).encode())
+            return
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", b"text/event-stream")],
+            }
+        )
+        for index, text in enumerate(chunks):
+            if index:
+                await asyncio.sleep(token_delay)
+            chunk = {
+                "id": "chatcmpl-bench",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}],
+            }
+            await _send_event(send, chunk)
+        final = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "x_groq": {"id": "req-bench", "usage": usage},
+        }
+        await _send_event(send, final)
+        await send({"type": "http.response.body", "body": b"data: [DONE]\n\n"})
+
+    return app
+
+
+async def _send_body(send, status: int, content_type: str, body: bytes) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type.encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_event(send, payload: dict) -> None:
+    data = f"data: {json.dumps(payload)}\n\n".encode()
+    await send({"type": "http.response.body", "body": data, "more_body": True})
+
+
+async def noop_sender(messages: list[dict]) -> None:
+    """Accept and discard outgoing emails."""
+
+
+_MISSING = object()
+
+
+def _get(doc: dict, path: str) -> Any:
+    value: Any = doc
+    for part in path.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return _MISSING
+        value = value[part]
+    return value
+
+
+def _set(doc: dict, path: str, value: Any) -> None:
+    *parents, last = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[last] = value
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    if operator == "$exists":
+        return (value is not _MISSING) == bool(operand)
+    if operator == "$ne":
+        return value != operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    if value is _MISSING or value is None:
+        return False
+    if operator == "$gt":
+        return value > operand
+    if operator == "$gte":
+        return value >= operand
+    if operator == "$lt":
+        return value < operand
+    if operator == "$lte":
+        return value <= operand
+    raise NotImplementedError(f"Unsupported query operator: {operator}")
+
+
+def matches(doc: dict, query: Optional[dict]) -> bool:
+    """
+    Evaluate a MongoDB query document against ``doc``.
+
+    Args:
+        doc: Stored document.
+        query: Filter using equality, comparison operators, ``$in``,
+            ``$exists``, ``$or`` and ``$and``.
+
+    Returns:
+        bool: Whether the document matches.
+    """
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+            continue
+        if key == "$and":
+            if not all(matches(doc, clause) for clause in condition):
+                return False
+            continue
+        value = _get(doc, key)
+        if isinstance(condition, dict) and condition and next(iter(condition)).startswith("$"):
+            if not all(_compare(value, op, operand) for op, operand in condition.items()):
+                return False
+        elif (None if value is _MISSING else value) != condition:
+            return False
+    return True
+
+
+def _project(doc: dict, projection: Optional[dict]) -> dict:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    if any(projection.values()):
+        kept = {"_id": doc["_id"]}
+        for key, flag in projection.items():
+            value = _get(doc, key)
+            if flag and value is not _MISSING:
+                _set(kept, key, value)
+        return kept
+    for key in projection:
+        doc.pop(key, None)
+    return doc
+
+
+def _apply_update(doc: dict, update: dict, inserting: bool = False) -> None:
+    for operator, fields in update.items():
+        if operator == "$set" or (operator == "$setOnInsert" and inserting):
+            doc.update(copy.deepcopy(fields))
+        elif operator == "$unset":
+            for key in fields:
+                doc.pop(key, None)
+        elif operator == "$inc":
+            for key, amount in fields.items():
+                value = _get(doc, key)
+                _set(doc, key, (0 if value is _MISSING else value) + amount)
+        elif operator != "$setOnInsert":
+            raise NotImplementedError(f"Unsupported update operator: {operator}")
+
+
+class InMemoryCursor:
+    """Query cursor supporting ``sort``, ``limit``, ``to_list`` and async iteration."""
+
+    def __init__(self, collection: "InMemoryCollection", query, projection, sort=None):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort = list(sort or [])
+        self._limit = 0
+        self._results = iter(())
+
+    def sort(self, key_or_list, direction: Optional[int] = None) -> "InMemoryCursor":
+        if isinstance(key_or_list, str):
+            self._sort = [(key_or_list, direction or 1)]
+        else:
+            self._sort = list(key_or_list)
+        return self
+
+    def limit(self, limit: int) -> "InMemoryCursor":
+        self._limit = limit
+        return self
+
+    def _evaluate(self) -> list[dict]:
+        docs = [doc for doc in self._collection.docs.values() if matches(doc, self._query)]
+        for key, direction in reversed(self._sort):
+            docs.sort(key=lambda doc, key=key: _get(doc, key), reverse=direction < 0)
+        if self._limit:
+            docs = docs[: self._limit]
+        return [_project(doc, self._projection) for doc in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> list[dict]:
+        results = self._evaluate()
+        return results if length is None else results[:length]
+
+    def __aiter__(self):
+        self._results = iter(self._evaluate())
+        return self
+
+    async def __anext__(self) -> dict:
+        try:
+            return next(self._results)
+        except StopIteration:
+            raise StopAsyncIteration from None
+
+
+class InMemoryCollection:
+    """Motor-compatible collection holding documents in a dict keyed by ``_id``."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.docs: dict[Any, dict] = {}
+
+    async def create_index(self, *args, **kwargs) -> str:
+        return "bench_index"
+
+    async def insert_one(self, document: dict) -> SimpleNamespace:
+        document.setdefault("_id", ObjectId())
+        if document["_id"] in self.docs:
+            raise ValueError(f"Duplicate key in {self.name}: {document['_id']}")
+        self.docs[document["_id"]] = copy.deepcopy(document)
+        return SimpleNamespace(inserted_id=document["_id"], acknowledged=True)
+
+    async def insert_many(self, documents: list[dict], ordered: bool = True) -> SimpleNamespace:
+        ids = [(await self.insert_one(document)).inserted_id for document in documents]
+        return SimpleNamespace(inserted_ids=ids, acknowledged=True)
+
+    async def find_one(self, query: Optional[dict] = None, projection=None) -> Optional[dict]:
+        for doc in self.docs.values():
+            if matches(doc, query):
+                return _project(doc, projection)
+        return None
+
+    def find(self, query: Optional[dict] = None, projection=None, sort=None, **kwargs):
+        return InMemoryCursor(self, query, projection, sort)
+
+    async def count_documents(self, query: dict) -> int:
+        return sum(1 for doc in self.docs.values() if matches(doc, query))
+
+    async def update_one(self, query: dict, update: dict, upsert: bool = False):
+        for doc in self.docs.values():
+            if matches(doc, query):
+                _apply_update(doc, update)
+                return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+        if not upsert:
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+        doc = {key: value for key, value in query.items() if not key.startswith("$")}
+        _apply_update(doc, update, inserting=True)
+        result = await self.insert_one(doc)
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=result.inserted_id)
+
+    async def bulk_write(self, requests: list, ordered: bool = True) -> SimpleNamespace:
+        # Only UpdateOne requests, read through pymongo's private attributes.
+        for request in requests:
+            await self.update_one(request._filter, request._doc, upsert=request._upsert)
+        return SimpleNamespace(acknowledged=True)
+
+    async def update_many(self, query: dict, update: dict, upsert: bool = False):
+        matched = [doc for doc in self.docs.values() if matches(doc, query)]
+        for doc in matched:
+            _apply_update(doc, update)
+        return SimpleNamespace(matched_count=len(matched), modified_count=len(matched))
+
+    async def replace_one(self, query: dict, replacement: dict, upsert: bool = False):
+        for key, doc in self.docs.items():
+            if matches(doc, query):
+                self.docs[key] = {"_id": key, **copy.deepcopy(replacement)}
+                return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+        if not upsert:
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+        doc = {**{k: v for k, v in query.items() if not k.startswith("$")}, **replacement}
+        result = await self.insert_one(doc)
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=result.inserted_id)
+
+    async def delete_one(self, query: dict) -> SimpleNamespace:
+        for key, doc in self.docs.items():
+            if matches(doc, query):
+                del self.docs[key]
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def delete_many(self, query: dict) -> SimpleNamespace:
+        keys = [key for key, doc in self.docs.items() if matches(doc, query)]
+        for key in keys:
+            del self.docs[key]
+        return SimpleNamespace(deleted_count=len(keys))
+
+
+class InMemoryDatabase:
+    """Database whose collections are created on first access."""
+
+    def __init__(self):
+        self._collections: dict[str, InMemoryCollection] = {}
+
+    def __getitem__(self, name: str) -> InMemoryCollection:
+        collection = self._collections.get(name)
+        if collection is None:
+            collection = self._collections[name] = InMemoryCollection(name)
+        return collection
+
+    def __getattr__(self, name: str) -> InMemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
@@ -1,11 +1,67 @@
+from types import SimpleNamespace
+
 import pytest
 from httpx import ASGITransport, AsyncClient
 
+from app.core.config import settings
+from app.core.rate_limit import InMemoryRateLimitBackend, admission
+from app.core.resilience import CircuitBreaker, RetryBudget
 from app.main import app
+from app.routes.records import get_current_user_from_token
+from app.services.container import get_auth_service, services
+from benchmarks.stubs import InMemoryDatabase
+from tests.fakes import FakeCompletions, fake_groq_client
 
 
 @pytest.fixture
-async def client():
+async def client(monkeypatch):
+    monkeypatch.setattr(
+        admission, "backend", InMemoryRateLimitBackend(settings.rate_limit_max_keys)
+    )
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
         yield ac
+
+
+@pytest.fixture
+def records_db(monkeypatch):
+    db = InMemoryDatabase()
+    monkeypatch.setattr("app.routes.records.get_database", lambda: db)
+    app.dependency_overrides[get_current_user_from_token] = lambda: SimpleNamespace(
+        id="user-1", email="jane@example.com"
+    )
+    yield db
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def otp_requests():
+    requested = []
+
+    async def request_otp(email, name):
+        requested.append(email)
+        return True
+
+    app.dependency_overrides[get_auth_service] = lambda: SimpleNamespace(request_otp=request_otp)
+    yield requested
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def ai_service():
+    return services.ai_service
+
+
+@pytest.fixture
+def fake_completions(monkeypatch, ai_service):
+    completions = FakeCompletions()
+    monkeypatch.setattr(ai_service, "client", fake_groq_client(completions))
+    monkeypatch.setattr(
+        ai_service,
+        "breaker",
+        CircuitBreaker(settings.circuit_failure_threshold, settings.circuit_reset_seconds),
+    )
+    monkeypatch.setattr(ai_service, "retry_budget", RetryBudget(settings.groq_retry_budget_ratio))
+    if ai_service.cache is not None:
+        ai_service.cache.memory.clear()
+    return completions
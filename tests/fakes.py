@@ -0,0 +1,104 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+DEFAULT_COMPLETION = '{"analysis": "Viral infection", "recommendations": ["Rest"]}'
+FAKE_USAGE = SimpleNamespace(prompt_tokens=120, completion_tokens=30)
+
+
+class FakeCompletions:
+    def __init__(self, content=DEFAULT_COMPLETION):
+        self.content = content
+        self.calls = 0
+        self.error = None
+        self.delay = 0
+
+    async def create(self, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        if kwargs.get("stream"):
+            return self._stream()
+        message = SimpleNamespace(content=self.content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=FAKE_USAGE)
+
+    async def _stream(self, size=5):
+        for start in range(0, len(self.content), size):
+            delta = SimpleNamespace(content=self.content[start : start + size])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+        yield SimpleNamespace(choices=[], x_groq=SimpleNamespace(usage=FAKE_USAGE))
+
+
+def fake_groq_client(completions: FakeCompletions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+class FakeRedisServer:
+    """Local stand-in speaking enough of the Redis protocol for the app's commands."""
+
+    def __init__(self):
+        self.data = {}
+        self.commands = []
+        self.server = None
+        self.port = None
+
+    @property
+    def url(self):
+        return f"redis://127.0.0.1:{self.port}/0"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def _dispatch(self, name, args):
+        if name == "PING":
+            return b"+PONG\r\n"
+        if name in ("SELECT", "AUTH"):
+            return b"+OK\r\n"
+        if name == "GET":
+            value = self._live(args[0])
+            return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+        if name == "SET":
+            expires_at = None
+            if len(args) >= 4 and args[2].upper() == b"PX":
+                expires_at = time.monotonic() + int(args[3]) / 1000
+            elif len(args) >= 4 and args[2].upper() == b"EX":
+                expires_at = time.monotonic() + int(args[3])
+            self.data[args[0]] = (args[1], expires_at)
+            return b"+OK\r\n"
+        if name == "DEL":
+            removed = sum(1 for key in args if self.data.pop(key, None) is not None)
+            return b":%d\r\n" % removed
+        return b"-ERR unknown command\r\n"
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                args = []
+                for _ in range(int(header[1:-2])):
+                    length = int((await reader.readline())[1:-2])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                name = args[0].decode().upper()
+                self.commands.append(name)
+                writer.write(self._dispatch(name, args[1:]))
+                await writer.drain()
+        finally:
+            writer.close()
@@ -0,0 +1,58 @@
+from app.core.sse import format_sse
+from app.services.analysis_parser import IncrementalAnalysisParser
+
+COMPLETION = (
+    'Here you go:\n{\n  "analysis": "Likely a \\"viral\\" infection.\\nRest well.",\n'
+    '  "recommendations": ["Drink fluids", "Rest \\u2014 8h", "See a doctor"]\n}'
+)
+
+
+def feed_all(parser, text, size):
+    events = []
+    for start in range(0, len(text), size):
+        events.extend(parser.feed(text[start : start + size]))
+    return events
+
+
+class TestIncrementalAnalysisParser:
+    def test_single_character_chunks(self):
+        events = feed_all(IncrementalAnalysisParser(), COMPLETION, 1)
+
+        analysis = "".join(data for name, data in events if name == "analysis")
+        recommendations = [data for name, data in events if name == "recommendation"]
+
+        assert analysis == 'Likely a "viral" infection.\nRest well.'
+        assert recommendations == ["Drink fluids", "Rest — 8h", "See a doctor"]
+
+    def test_analysis_is_emitted_before_completion(self):
+        parser = IncrementalAnalysisParser()
+        events = parser.feed('{"analysis": "Likely a vir')
+        assert events == [("analysis", "Likely a vir")]
+
+    def test_incomplete_recommendation_is_withheld(self):
+        parser = IncrementalAnalysisParser()
+        assert parser.feed('{"analysis": "", "recommendations": ["Drink flu') == []
+        assert parser.feed('ids", "Re') == [("recommendation", "Drink fluids")]
+
+    def test_raw_control_characters_and_invalid_escapes_do_not_raise(self):
+        parser = IncrementalAnalysisParser()
+        assert parser.feed('{"analysis": "line one\nline two') == [
+            ("analysis", "line one\nline two")
+        ]
+        assert parser.feed(" isn\\'t") == []
+        assert parser.feed('", "recommendations": ["Rest", "Don\\\'t strain"]}') == [
+            ("recommendation", "Rest")
+        ]
+
+    def test_non_json_output_yields_nothing(self):
+        parser = IncrementalAnalysisParser()
+        assert parser.feed("I cannot answer that.") == []
+        assert parser.text == "I cannot answer that."
+
+
+class TestFormatSSE:
+    def test_json_payload(self):
+        assert format_sse({"a": 1}, event="result") == 'event: result\ndata: {"a":1}\n\n'
+
+    def test_multiline_text_and_id(self):
+        assert format_sse("a\nb", event_id="7") == "id: 7\ndata: a\ndata: b\n\n"
@@ -0,0 +1,129 @@
+import json
+from datetime import date, datetime, timezone
+
+import pytest
+from bson import ObjectId
+from httpx import AsyncClient
+
+from app.services.analytics_service import SUMMARY_COLLECTION, TERMS_COLLECTION, RecordSummaries
+from benchmarks.stubs import InMemoryDatabase
+
+TODAY = date(2026, 10, 17)
+
+
+def record(symptoms="headache, fever", age=34, day=17, user_id="user-1"):
+    return {
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "created_at": datetime(2026, 10, day, 9, tzinfo=timezone.utc),
+        "patient_data": {"patient_name": "Jane", "age": age, "symptoms": symptoms},
+    }
+
+
+@pytest.fixture
+def summaries_db(monkeypatch):
+    db = InMemoryDatabase()
+    monkeypatch.setattr("app.services.analytics_service.get_database", lambda: db)
+    return db
+
+
+def test_increments_count_each_term_once_per_record():
+    summaries = RecordSummaries(enabled=True, age_band_years=10, rebuild_batch_size=2)
+    fields, terms = summaries.increments(
+        [record("Headaches, headache and 2 days of fever"), record("rash", age=7, user_id=None)]
+    )
+
+    assert list(fields) == ["user-1"]
+    assert dict(fields["user-1"]) == {"total": 1, "days.2026-10-17": 1, "age_bands.30-39": 1}
+    assert dict(terms) == {
+        ("user-1", "headache"): 1,
+        ("user-1", "day"): 1,
+        ("user-1", "fever"): 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_read_reports_window_age_bands_and_top_terms(summaries_db):
+    summaries = RecordSummaries(enabled=True, age_band_years=10, rebuild_batch_size=2)
+    await summaries.add([record(day=15), record("fever, cough", age=71, day=17)])
+    await summaries.add([record("cough", day=3), record(user_id="user-2")])
+
+    analytics = await summaries.read("user-1", days=3, top_terms=2, today=TODAY)
+
+    assert analytics.total == 3
+    assert [(day.day.isoformat(), day.count) for day in analytics.by_day] == [
+        ("2026-10-15", 1),
+        ("2026-10-16", 0),
+        ("2026-10-17", 1),
+    ]
+    assert analytics.by_age_band == {"30-39": 2, "70-79": 1}
+    assert [(term.term, term.count) for term in analytics.top_terms] == [
+        ("cough", 2),
+        ("fever", 2),
+    ]
+    assert summaries.stats()["updates"] == 2
+    assert "terms" not in await summaries_db[SUMMARY_COLLECTION].find_one({"_id": "user-1"})
+    assert await summaries_db[TERMS_COLLECTION].count_documents({"user_id": "user-1"}) == 3
+
+
+@pytest.mark.asyncio
+async def test_read_without_summary_is_empty(summaries_db):
+    summaries = RecordSummaries(enabled=True, age_band_years=10, rebuild_batch_size=2)
+    analytics = await summaries.read("nobody", days=2, top_terms=5, today=TODAY)
+
+    assert analytics.total == 0
+    assert [day.count for day in analytics.by_day] == [0, 0]
+    assert analytics.top_terms == []
+
+
+@pytest.mark.asyncio
+async def test_failed_update_is_counted_not_raised(monkeypatch):
+    monkeypatch.setattr("app.services.analytics_service.get_database", lambda: None)
+    summaries = RecordSummaries(enabled=True, age_band_years=10, rebuild_batch_size=2)
+
+    await summaries.add([record()])
+
+    assert summaries.stats()["failed_updates"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rebuild_recomputes_summaries_from_records(summaries_db):
+    summaries = RecordSummaries(enabled=True, age_band_years=10, rebuild_batch_size=2)
+    docs = [record(day=day) for day in (14, 15, 16)] + [record("rash", user_id="user-2")]
+    for doc in docs:
+        await summaries_db.medical_records.insert_one(doc)
+    await summaries.add(docs[:1] * 5)
+
+    assert await summaries.rebuild() == 4
+
+    analytics = await summaries.read("user-1", days=4, top_terms=5, today=TODAY)
+    assert analytics.total == 3
+    assert [day.count for day in analytics.by_day] == [1, 1, 1, 0]
+    assert [term.count for term in analytics.top_terms] == [3, 3]
+    assert (await summaries.read("user-2", days=1, top_terms=5, today=TODAY)).total == 1
+
+    await summaries_db[SUMMARY_COLLECTION].delete_many({"_id": "user-2"})
+    assert await summaries.rebuild("user-2") == 1
+    assert (await summaries.read("user-2", days=1, top_terms=5, today=TODAY)).total == 1
+    assert summaries.stats()["rebuilds"] == 2
+
+
+@pytest.mark.asyncio
+async def test_every_write_path_updates_the_analytics_endpoint(
+    client: AsyncClient, fake_completions, records_db, monkeypatch
+):
+    monkeypatch.setattr("app.services.analytics_service.get_database", lambda: records_db)
+    patient = {"patient_name": "Jane", "age": 42, "symptoms": "cough"}
+
+    await client.post("/records", json=patient)
+    await client.post("/records", params={"mode": "async"}, json=patient)
+    await client.post("/records/batch", json=[patient, patient])
+    await client.post("/records/import", content=json.dumps(patient).encode())
+    response = await client.get("/records/analytics", params={"days": 1})
+
+    assert response.status_code == 200
+    analytics = response.json()
+    assert analytics["total"] == 5
+    assert analytics["by_day"][0]["count"] == 5
+    assert analytics["by_age_band"] == {"40-49": 5}
+    assert analytics["top_terms"] == [{"term": "cough", "count": 5}]
@@ -1,6 +1,10 @@
+import json
+
 import pytest
 from httpx import AsyncClient
 
+from app.core.config import settings
+
 
 @pytest.mark.asyncio
 async def test_root_endpoint(client: AsyncClient):
@@ -56,3 +60,71 @@ async def test_protected_route_with_invalid_token(client: AsyncClient):
     headers = {"Authorization": "Bearer invalid_token"}
     response = await client.get("/records", headers=headers)
     assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_streams_ndjson(client: AsyncClient, fake_completions):
+    patients = [
+        {"patient_name": f"Patient {i}", "age": 30 + i, "symptoms": "headache"} for i in range(3)
+    ]
+    response = await client.post("/records/analyze/batch", json=patients)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["index"] for line in lines) == [0, 1, 2]
+    assert all(line["analysis"]["analysis"] == "Viral infection" for line in lines)
+    assert fake_completions.calls == 3
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_rejects_empty_batch(client: AsyncClient):
+    response = await client.post("/records/analyze/batch", json=[])
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_analyze_batch_rejects_oversized_batch(client: AsyncClient, monkeypatch):
+    monkeypatch.setattr(settings, "batch_max_items", 1)
+    patient = {"patient_name": "Test", "age": 30, "symptoms": "fever"}
+    response = await client.post("/records/analyze/batch", json=[patient, patient])
+    assert response.status_code == 413
+
+
+@pytest.mark.asyncio
+async def test_create_records_batch_requires_auth(client: AsyncClient):
+    response = await client.post("/records/batch", json=[])
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_analyze_endpoint_streams_sse(client: AsyncClient, fake_completions):
+    patient_data = {"patient_name": "Test Patient", "age": 30, "symptoms": "headache"}
+    response = await client.post("/records/analyze?stream=true", json=patient_data)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = [block.split("\n") for block in response.text.strip().split("\n\n")]
+    names = [lines[0].removeprefix("event: ") for lines in events]
+    assert names[0] == "token"
+    assert "recommendation" in names
+    assert names[-1] == "result"
+    result = json.loads(events[-1][1].removeprefix("data: "))
+    assert result == {
+        "analysis": "Viral infection",
+        "recommendations": ["Rest"],
+        "degraded": False,
+        "similarity": None,
+    }
+
+
+@pytest.mark.asyncio
+async def test_export_requires_auth(client: AsyncClient):
+    response = await client.get("/records/export")
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_record_job_status_requires_auth(client: AsyncClient):
+    response = await client.get(f"/records/jobs/{'0' * 24}")
+    assert response.status_code == 401
@@ -1,11 +1,15 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 
 import pytest
 from jose import jwt
 from jose.exceptions import JWTError
 
 from app.core.config import settings
-from app.services.auth_service import AuthService
+from app.core.redis import RedisClient, RedisError
+from app.services.auth_service import AuthService, InMemoryOTPStore, OTPStore, RedisOTPStore
+from tests.fakes import FakeRedisServer
 
 
 class TestAuthService:
@@ -53,8 +57,8 @@ class TestAuthService:
         assert time_diff < 60
 
     def test_otp_storage_initialization(self):
-        assert self.auth_service.otp_storage == {}
-        assert isinstance(self.auth_service.otp_storage, dict)
+        assert isinstance(self.auth_service.otp_storage, InMemoryOTPStore)
+        assert len(self.auth_service.otp_storage) == 0
 
     def test_auth_service_has_required_attributes(self):
         assert hasattr(self.auth_service, "secret_key")
@@ -89,3 +93,177 @@ class TestTokenValidation:
 
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         assert payload["role"] == "admin"
+
+
+class FakeUsers:
+    def __init__(self, user_doc):
+        self.user_doc = user_doc
+        self.lookups = 0
+
+    async def find_one(self, query):
+        self.lookups += 1
+        if self.user_doc and query.get("email") == self.user_doc["email"]:
+            return self.user_doc
+        return None
+
+
+class TestPrincipalCache:
+    @pytest.fixture(autouse=True)
+    def setup_users(self, monkeypatch):
+        self.auth_service = AuthService()
+        self.users = FakeUsers(
+            {
+                "_id": "user123",
+                "name": "Test User",
+                "email": "test@example.com",
+                "created_at": datetime.now(timezone.utc),
+            }
+        )
+        monkeypatch.setattr(
+            "app.services.auth_service.get_database", lambda: SimpleNamespace(users=self.users)
+        )
+        self.token = self.auth_service.create_access_token(
+            {"sub": "user123", "email": "test@example.com"}
+        )
+
+    @pytest.mark.asyncio
+    async def test_repeated_requests_hit_cache(self):
+        first = await self.auth_service.get_current_user(self.token)
+        second = await self.auth_service.get_current_user(self.token)
+
+        assert first.email == second.email == "test@example.com"
+        assert self.users.lookups == 1
+
+    @pytest.mark.asyncio
+    async def test_invalidate_forces_lookup(self):
+        await self.auth_service.get_current_user(self.token)
+        self.auth_service.invalidate_user("user123")
+        await self.auth_service.get_current_user(self.token)
+
+        assert self.users.lookups == 2
+
+    @pytest.mark.asyncio
+    async def test_unknown_user_is_not_cached(self):
+        self.users.user_doc = None
+
+        assert await self.auth_service.get_current_user(self.token) is None
+        assert await self.auth_service.get_current_user(self.token) is None
+        assert self.users.lookups == 2
+
+
+def otp_entry(otp="123456", seconds=60):
+    return {
+        "otp": otp,
+        "name": "Test User",
+        "expiry": datetime.now(timezone.utc) + timedelta(seconds=seconds),
+    }
+
+
+def test_otp_store_requires_storage_methods():
+    class Incomplete(OTPStore):
+        async def set(self, email, entry):
+            pass
+
+    with pytest.raises(TypeError, match="get"):
+        Incomplete()
+
+
+class TestInMemoryOTPStore:
+    @pytest.mark.asyncio
+    async def test_set_get_delete(self):
+        store = InMemoryOTPStore(max_entries=10, sweep_interval=60)
+        await store.set("a@example.com", otp_entry())
+
+        assert (await store.get("a@example.com"))["otp"] == "123456"
+        await store.delete("a@example.com")
+        assert await store.get("a@example.com") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_entries_are_purged(self):
+        store = InMemoryOTPStore(max_entries=10, sweep_interval=60)
+        await store.set("old@example.com", otp_entry(seconds=-1))
+        await store.set("new@example.com", otp_entry())
+
+        assert len(store) == 1
+        assert await store.get("old@example.com") is None
+
+    @pytest.mark.asyncio
+    async def test_size_is_bounded(self):
+        store = InMemoryOTPStore(max_entries=3, sweep_interval=60)
+        for i in range(10):
+            await store.set(f"user{i}@example.com", otp_entry(seconds=60 + i))
+
+        assert len(store) == 3
+        assert await store.get("user0@example.com") is None
+        assert await store.get("user9@example.com") is not None
+
+    @pytest.mark.asyncio
+    async def test_reissued_otp_replaces_previous(self):
+        store = InMemoryOTPStore(max_entries=10, sweep_interval=60)
+        for otp in ("111111", "222222", "333333"):
+            await store.set("a@example.com", otp_entry(otp=otp))
+
+        assert len(store) == 1
+        assert (await store.get("a@example.com"))["otp"] == "333333"
+
+    @pytest.mark.asyncio
+    async def test_background_sweep(self):
+        store = InMemoryOTPStore(max_entries=10, sweep_interval=0.01)
+        await store.set("a@example.com", otp_entry(seconds=0.01))
+
+        await store.start()
+        await asyncio.sleep(0.05)
+        await store.close()
+
+        assert len(store) == 0
+
+
+class TestRedisOTPStore:
+    @pytest.fixture(autouse=True)
+    async def redis_server(self):
+        self.server = FakeRedisServer()
+        await self.server.start()
+        self.store = RedisOTPStore(RedisClient(self.server.url))
+        yield
+        await self.store.close()
+        await self.server.stop()
+
+    @pytest.mark.asyncio
+    async def test_set_get_delete(self):
+        await self.store.set("a@example.com", otp_entry())
+
+        entry = await self.store.get("a@example.com")
+        assert entry["otp"] == "123456"
+        assert entry["expiry"] > datetime.now(timezone.utc)
+
+        await self.store.delete("a@example.com")
+        assert await self.store.get("a@example.com") is None
+
+    @pytest.mark.asyncio
+    async def test_entries_expire_on_server(self):
+        await self.store.set("a@example.com", otp_entry(seconds=0.01))
+        await asyncio.sleep(0.03)
+        assert await self.store.get("a@example.com") is None
+
+    @pytest.mark.asyncio
+    async def test_error_reply_raises(self):
+        with pytest.raises(RedisError, match="unknown command"):
+            await self.store.client.execute("FLUSHALL")
+        assert await self.store.client.execute("PING") == "PONG"
+
+
+class TestOTPVerification:
+    @pytest.mark.asyncio
+    async def test_wrong_and_expired_otps_are_rejected(self):
+        auth_service = AuthService()
+        await auth_service.otp_storage.set("a@example.com", otp_entry(otp="123456"))
+
+        assert await auth_service.verify_otp("a@example.com", "000000") is None
+        assert await auth_service.verify_otp("b@example.com", "123456") is None
+
+    @pytest.mark.asyncio
+    async def test_non_ascii_otp_is_rejected(self):
+        auth_service = AuthService()
+        await auth_service.otp_storage.set("a@example.com", otp_entry(otp="123456"))
+
+        assert await auth_service.verify_otp("a@example.com", "１２３４５６") is None
@@ -0,0 +1,100 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from benchmarks.run import compare, percentile, run_benchmarks
+from benchmarks.stubs import InMemoryDatabase, matches
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 0.50) == 50.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile([], 0.95) == 0.0
+
+
+def test_matches_supports_keyset_filters():
+    doc = {"created_at": datetime(2024, 1, 2, tzinfo=timezone.utc), "_id": 5, "status": "done"}
+    query = {
+        "$or": [
+            {"created_at": {"$lt": datetime(2024, 1, 2, tzinfo=timezone.utc)}},
+            {"created_at": datetime(2024, 1, 2, tzinfo=timezone.utc), "_id": {"$lt": 9}},
+        ]
+    }
+    assert matches(doc, query)
+    assert not matches(doc, {"status": {"$in": ["pending"]}})
+    assert matches(doc, {"claimed_at": None})
+
+
+@pytest.mark.asyncio
+async def test_in_memory_database_round_trip():
+    db = InMemoryDatabase()
+    doc = {"name": "a", "n": 1}
+    await db.items.insert_one(doc)
+    await db.items.update_one({"_id": doc["_id"]}, {"$set": {"n": 2}, "$unset": {"name": ""}})
+
+    found = await db.items.find({}, {"n": 1}).sort("n", -1).limit(5).to_list(length=5)
+
+    assert found == [{"_id": doc["_id"], "n": 2}]
+
+
+@pytest.mark.asyncio
+async def test_run_benchmarks_reports_every_scenario():
+    report = await run_benchmarks(
+        ["analyze", "create_record", "list_records", "auth_flow"],
+        [2],
+        requests=4,
+        first_token_latency=0,
+        seed_records=5,
+    )
+
+    assert [r["scenario"] for r in report["results"]] == [
+        "analyze",
+        "create_record",
+        "list_records",
+        "auth_flow",
+    ]
+    for result in report["results"]:
+        assert result["requests"] == 4
+        assert result["errors"] == 0
+        assert result["latency_ms"]["p99"] >= result["latency_ms"]["p50"]
+
+    lines = compare(report, report)
+    assert len(lines) == 4
+    assert "(+0.0%)" in lines[0]
+
+
+def test_serialization_benchmark_reports_both_paths():
+    from benchmarks.serialization import run
+
+    report = run([5], rounds=1)
+
+    result = report["results"][0]
+    assert result["records"] == 5
+    assert result["validated_us_per_record"] > 0
+    assert result["fast_us_per_record"] > 0
+
+
+def test_semantic_cache_benchmark_reports_lookup_latency():
+    pytest.importorskip("numpy")
+    from benchmarks.semantic_cache import run
+
+    report = run([50, 100], queries=10)
+
+    assert [result["entries"] for result in report["results"]] == [50, 100]
+    result = report["results"][-1]
+    assert result["near_duplicate"]["hits"] == 10
+    assert result["near_duplicate"]["p99_us"] >= result["near_duplicate"]["p50_us"]
+
+
+def test_startup_benchmark_defers_heavy_sdks():
+    from benchmarks.startup import compare
+    from benchmarks.startup import run as run_startup
+
+    report = run_startup(os.getcwd(), runs=1)
+
+    assert report["import_ms"]["median"] > 0
+    assert report["total_ms"]["median"] >= report["import_ms"]["median"]
+    assert report["loaded_after_startup"] == []
+    assert len(compare(report, report)) == 3
@@ -0,0 +1,103 @@
+import asyncio
+import time
+
+import pytest
+
+from app.core.cache import TTLCache
+from app.models.medical_record import MedicalAnalysis, PatientData
+from app.services.ai_service import AIService
+from app.services.analysis_cache import AnalysisCache, analysis_cache_key
+from tests.fakes import FakeCompletions, fake_groq_client
+
+
+class TestTTLCache:
+    def test_get_and_set(self):
+        cache = TTLCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert cache.get("missing") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_entries_expire(self):
+        cache = TTLCache(max_entries=2, ttl_seconds=0.01)
+        cache.set("a", 1)
+        time.sleep(0.02)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_delete(self):
+        cache = TTLCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", 1)
+        assert cache.delete("a") is True
+        assert cache.delete("a") is False
+
+
+class TestAnalysisCacheKey:
+    def test_key_ignores_name_case_and_whitespace(self):
+        first = PatientData(patient_name="John", age=30, symptoms="Headache,  fever")
+        second = PatientData(patient_name="Jane", age=30, symptoms="headache, fever ")
+        assert analysis_cache_key(first, "model-a") == analysis_cache_key(second, "model-a")
+
+    def test_key_depends_on_model_and_age(self):
+        patient = PatientData(patient_name="John", age=30, symptoms="fever")
+        older = PatientData(patient_name="John", age=31, symptoms="fever")
+        assert analysis_cache_key(patient, "model-a") != analysis_cache_key(patient, "model-b")
+        assert analysis_cache_key(patient, "model-a") != analysis_cache_key(older, "model-a")
+
+
+class TestCachedAnalysis:
+    def setup_method(self):
+        self.ai_service = AIService()
+        self.ai_service.cache = AnalysisCache(max_entries=10, ttl_seconds=60)
+        self.completions = FakeCompletions()
+        self.ai_service.client = fake_groq_client(self.completions)
+
+    @pytest.mark.asyncio
+    async def test_repeated_input_served_from_cache(self):
+        patient = PatientData(patient_name="John", age=30, symptoms="fever")
+
+        first = await self.ai_service.analyze_patient_data(patient)
+        second = await self.ai_service.analyze_patient_data(patient)
+
+        assert (
+            first == second == MedicalAnalysis(analysis="Viral infection", recommendations=["Rest"])
+        )
+        assert self.completions.calls == 1
+        assert self.ai_service.cache.stats()["memory"]["hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_failures_are_not_cached(self):
+        patient = PatientData(patient_name="John", age=30, symptoms="fever")
+        self.completions.error = RuntimeError("upstream down")
+
+        fallback = await self.ai_service.analyze_patient_data(patient)
+        self.completions.error = None
+        analysis = await self.ai_service.analyze_patient_data(patient)
+
+        assert "Unable to analyze" in fallback.analysis
+        assert analysis.analysis == "Viral infection"
+        assert self.completions.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_are_coalesced(self):
+        self.completions.delay = 0.01
+        patients = [PatientData(patient_name=name, age=30, symptoms="fever") for name in "ABC"]
+
+        results = await asyncio.gather(*map(self.ai_service.analyze_patient_data, patients))
+
+        assert {r.analysis for r in results} == {"Viral infection"}
+        assert self.completions.calls == 1
+        assert self.ai_service.inflight.coalesced == 2
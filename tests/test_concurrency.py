@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from app.core.concurrency import ConcurrencyLimiter
+
+
+class TestConcurrencyLimiter:
+    def test_rejects_invalid_limit(self):
+        with pytest.raises(ValueError, match="at least 1"):
+            ConcurrencyLimiter(0)
+
+    @pytest.mark.asyncio
+    async def test_limits_in_flight_operations(self):
+        limiter = ConcurrencyLimiter(2)
+        peak = 0
+
+        async def work():
+            nonlocal peak
+            async with limiter.slot():
+                peak = max(peak, limiter.in_flight)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(work() for _ in range(6)))
+
+        assert peak == 2
+        assert limiter.in_flight == 0
+        assert limiter.waiting == 0
+
+    @pytest.mark.asyncio
+    async def test_records_queue_wait(self):
+        limiter = ConcurrencyLimiter(1)
+
+        async def work():
+            async with limiter.slot():
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(work(), work())
+        stats = limiter.stats()
+
+        assert stats["acquired_total"] == 2
+        assert stats["wait_seconds_max"] >= 0.015
+        assert stats["in_flight"] == 0
+
+    @pytest.mark.asyncio
+    async def test_slot_released_on_error(self):
+        limiter = ConcurrencyLimiter(1)
+
+        with pytest.raises(RuntimeError):
+            async with limiter.slot():
+                raise RuntimeError("boom")
+
+        async with limiter.slot():
+            assert limiter.in_flight == 1
@@ -0,0 +1,99 @@
+import pytest
+from bson import ObjectId
+from httpx import AsyncClient
+
+from app.core.conditional import body_etag, etag_matches
+from app.models.medical_record import MedicalAnalysis, PatientData
+from app.routes.records import build_record_doc
+
+PATIENT = PatientData(patient_name="Jane", age=42, symptoms="cough")
+ANALYSIS = MedicalAnalysis(analysis="Viral infection", recommendations=["Rest"])
+
+
+def test_etag_depends_on_body_and_extra_parts():
+    assert body_etag(b"[]") == body_etag(b"[]")
+    assert body_etag(b"[]").startswith('"')
+    assert body_etag(b"[]") != body_etag(b"[1]")
+    assert body_etag(b"[]") != body_etag(b"[]", "cursor")
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"old", "abc"', True),
+        ("*", True),
+        ('"old"', False),
+        ("abc", False),
+    ],
+)
+def test_if_none_match_uses_weak_comparison(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+@pytest.mark.asyncio
+async def test_get_record_revalidates_with_etag(client: AsyncClient, records_db):
+    doc = build_record_doc(PATIENT, None, "user-1")
+    await records_db.medical_records.insert_one(doc)
+    url = f"/records/{doc['_id']}"
+
+    response = await client.get(url)
+    assert response.status_code == 200
+    assert response.json()["status"] == "pending"
+    assert response.headers["cache-control"] == "private, no-cache"
+    etag = response.headers["etag"]
+
+    not_modified = await client.get(url, headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+    await records_db.medical_records.update_one(
+        {"_id": doc["_id"]},
+        {"$set": {"status": "completed", "ai_analysis": ANALYSIS.model_dump()}},
+    )
+    completed = await client.get(url, headers={"If-None-Match": etag})
+    assert completed.status_code == 200
+    assert completed.json()["ai_analysis"]["analysis"] == "Viral infection"
+
+    without_analysis = await client.get(url, params={"include_analysis": False})
+    assert without_analysis.json()["ai_analysis"] is None
+    assert without_analysis.headers["etag"] != completed.headers["etag"]
+
+
+@pytest.mark.asyncio
+async def test_get_record_rejects_unknown_and_invalid_ids(client: AsyncClient, records_db):
+    assert (await client.get(f"/records/{ObjectId()}")).status_code == 404
+    assert (await client.get("/records/not-an-id")).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_get_record_hides_other_users_records(client: AsyncClient, records_db):
+    doc = build_record_doc(PATIENT, ANALYSIS, "user-2")
+    await records_db.medical_records.insert_one(doc)
+
+    response = await client.get(f"/records/{doc['_id']}")
+
+    assert response.status_code == 404
+    assert "Viral infection" not in response.text
+
+
+@pytest.mark.asyncio
+async def test_records_page_revalidates_with_etag(client: AsyncClient, records_db):
+    for _ in range(3):
+        await records_db.medical_records.insert_one(build_record_doc(PATIENT, ANALYSIS, "user-1"))
+
+    first = await client.get("/records", params={"limit": 2})
+    etag = first.headers["etag"]
+    not_modified = await client.get(
+        "/records", params={"limit": 2}, headers={"If-None-Match": etag}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.headers["x-next-cursor"] == first.headers["x-next-cursor"]
+
+    await records_db.medical_records.insert_one(build_record_doc(PATIENT, ANALYSIS, "user-1"))
+    changed = await client.get("/records", params={"limit": 2}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
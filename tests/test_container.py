@@ -0,0 +1,33 @@
+import pytest
+
+from app.services.container import ServiceContainer
+
+
+def test_services_are_built_once_on_first_access():
+    built = []
+    container = ServiceContainer({"clock": lambda: built.append(1) or object()})
+
+    assert not container.built("clock")
+    first = container.get("clock")
+
+    assert container.get("clock") is first
+    assert container.built("clock")
+    assert built == [1]
+
+
+def test_override_and_reset():
+    container = ServiceContainer({"clock": object})
+    replacement = object()
+    container.override("clock", replacement)
+    assert container.get("clock") is replacement
+
+    container.reset()
+    assert container.get("clock") is not replacement
+
+
+@pytest.mark.asyncio
+async def test_routes_receive_services_through_dependencies(client, otp_requests):
+    response = await client.post("/auth/request-otp", json={"email": "a@example.com", "name": "A"})
+
+    assert response.status_code == 200
+    assert otp_requests == ["a@example.com"]
@@ -0,0 +1,26 @@
+import pytest
+
+from app.core import database
+from benchmarks.stubs import InMemoryDatabase
+
+
+@pytest.mark.asyncio
+async def test_failed_index_does_not_skip_the_others(monkeypatch):
+    db = InMemoryDatabase()
+    created = []
+
+    async def duplicate_emails(keys, **options):
+        raise RuntimeError("E11000 duplicate key error")
+
+    async def record(self, keys, **options):
+        created.append((self.name, keys))
+
+    monkeypatch.setattr(type(db.users), "create_index", record)
+    monkeypatch.setattr(db.users, "create_index", duplicate_emails)
+    monkeypatch.setattr(database, "db", db)
+
+    await database.ensure_indexes()
+
+    assert ("users", "email") not in created
+    assert ("medical_records", [("created_at", -1), ("_id", -1)]) in created
+    assert ("record_summary_terms", [("user_id", 1), ("count", -1), ("term", 1)]) in created
@@ -0,0 +1,174 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.services.email_outbox import EmailOutbox
+from benchmarks.stubs import InMemoryDatabase
+
+
+class FakeSender:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.batches = []
+
+    async def __call__(self, messages):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("provider unavailable")
+        self.batches.append(messages)
+
+
+async def wait_until(predicate, timeout=1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "condition not reached"
+        await asyncio.sleep(0.005)
+
+
+class TestEmailOutbox:
+    @pytest.mark.asyncio
+    async def test_enqueue_returns_immediately_and_batches(self):
+        sender = FakeSender()
+        outbox = EmailOutbox(
+            sender=sender,
+            workers=1,
+            batch_size=10,
+            max_attempts=3,
+            retry_base_seconds=0.001,
+            retry_max_seconds=0.01,
+            max_queue=100,
+            durable=False,
+        )
+
+        for i in range(5):
+            assert await outbox.enqueue({"to": [f"user{i}@example.com"]}) is True
+        assert outbox.stats()["queue_depth"] == 5
+
+        await outbox.start()
+        await wait_until(lambda: outbox.stats()["sent"] == 5)
+        await outbox.close()
+
+        assert len(sender.batches) == 1
+        assert len(sender.batches[0]) == 5
+        assert outbox.stats()["queue_depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_retries_transient_failures(self):
+        sender = FakeSender(failures=2)
+        outbox = EmailOutbox(
+            sender=sender,
+            workers=1,
+            batch_size=10,
+            max_attempts=3,
+            retry_base_seconds=0.001,
+            retry_max_seconds=0.01,
+            max_queue=100,
+            durable=False,
+        )
+        await outbox.start()
+
+        await outbox.enqueue({"to": ["user@example.com"]})
+        await wait_until(lambda: outbox.stats()["sent"] == 1)
+        await outbox.close()
+
+        stats = outbox.stats()
+        assert stats["failed_attempts"] == 2
+        assert stats["dead"] == 0
+
+    @pytest.mark.asyncio
+    async def test_dead_letters_after_max_attempts(self):
+        outbox = EmailOutbox(
+            sender=FakeSender(failures=10),
+            workers=1,
+            batch_size=10,
+            max_attempts=3,
+            retry_base_seconds=0.001,
+            retry_max_seconds=0.01,
+            max_queue=100,
+            durable=False,
+        )
+        await outbox.start()
+
+        await outbox.enqueue({"to": ["user@example.com"]})
+        await wait_until(lambda: outbox.stats()["dead"] == 1)
+        await outbox.close()
+
+        assert outbox.stats()["failed_attempts"] == 3
+        assert outbox.dead_letters[0]["error"] == "provider unavailable"
+
+    @pytest.mark.asyncio
+    async def test_expired_messages_are_dropped(self):
+        sender = FakeSender()
+        outbox = EmailOutbox(
+            sender=sender,
+            workers=1,
+            batch_size=10,
+            max_attempts=3,
+            retry_base_seconds=0.001,
+            retry_max_seconds=0.01,
+            max_queue=100,
+            durable=False,
+        )
+        expired = datetime.now(timezone.utc) - timedelta(seconds=1)
+
+        await outbox.enqueue({"to": ["user@example.com"]}, expires_at=expired)
+        await outbox.start()
+        await wait_until(lambda: outbox.stats()["expired"] == 1)
+        await outbox.close()
+
+        assert sender.batches == []
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_full(self):
+        outbox = EmailOutbox(
+            sender=FakeSender(),
+            workers=1,
+            batch_size=10,
+            max_attempts=3,
+            retry_base_seconds=0.001,
+            retry_max_seconds=0.01,
+            max_queue=1,
+            durable=False,
+        )
+        assert await outbox.enqueue({"to": ["a@example.com"]}) is True
+        assert await outbox.enqueue({"to": ["b@example.com"]}) is False
+
+    @pytest.mark.asyncio
+    async def test_recovers_message_stranded_right_after_enqueue(self, monkeypatch):
+        db = InMemoryDatabase()
+        monkeypatch.setattr("app.services.email_outbox.get_database", lambda: db)
+        monkeypatch.setattr(settings, "email_outbox_claim_timeout_seconds", 0.05)
+        monkeypatch.setattr(settings, "email_outbox_recover_interval_seconds", 0.01)
+        # Queued by a process that stops before its workers send it.
+        crashed = EmailOutbox(
+            sender=FakeSender(),
+            workers=1,
+            batch_size=10,
+            max_attempts=3,
+            retry_base_seconds=0.001,
+            retry_max_seconds=0.01,
+            max_queue=100,
+        )
+        assert await crashed.enqueue({"to": ["user@example.com"]}) is True
+
+        sender = FakeSender()
+        outbox = EmailOutbox(
+            sender=sender,
+            workers=1,
+            batch_size=10,
+            max_attempts=3,
+            retry_base_seconds=0.001,
+            retry_max_seconds=0.01,
+            max_queue=100,
+        )
+        await outbox.start()
+        try:
+            assert sender.batches == []
+            await wait_until(lambda: sender.batches)
+        finally:
+            await outbox.close()
+
+        assert sender.batches == [[{"to": ["user@example.com"]}]]
+        assert (await db.email_outbox.find_one({}))["status"] == "sent"
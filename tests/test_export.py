@@ -0,0 +1,75 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.services.export_service import CSV_COLUMNS, export_filter, stream_export
+
+
+def make_doc(index):
+    return {
+        "_id": ObjectId(),
+        "patient_data": {
+            "patient_name": f"Patient {index}",
+            "age": 30 + index,
+            "symptoms": "headache, fever",
+            "medical_history": None,
+            "additional_info": {"allergies": ["penicillin"]},
+        },
+        "ai_analysis": {"analysis": "Likely viral", "recommendations": ["Rest", "Fluids"]},
+        "created_at": datetime(2025, 11, 14, 10, index),
+        "user_id": "user123",
+    }
+
+
+async def as_cursor(docs):
+    for doc in docs:
+        yield doc
+
+
+async def collect(docs, export_format, chunk_bytes=65536):
+    return [chunk async for chunk in stream_export(as_cursor(docs), export_format, chunk_bytes)]
+
+
+class TestExportFilter:
+    def test_no_filters(self):
+        assert export_filter() == {}
+
+    def test_date_range_and_resume(self):
+        start, end, after_id = datetime(2025, 1, 1), datetime(2025, 2, 1), ObjectId()
+        assert export_filter(start, end, after_id) == {
+            "created_at": {"$gte": start, "$lt": end},
+            "_id": {"$gt": after_id},
+        }
+
+
+class TestStreamExport:
+    @pytest.mark.asyncio
+    async def test_ndjson(self):
+        docs = [make_doc(i) for i in range(3)]
+        lines = "".join(await collect(docs, "ndjson")).splitlines()
+
+        rows = [json.loads(line) for line in lines]
+        assert [row["id"] for row in rows] == [str(doc["_id"]) for doc in docs]
+        assert rows[0]["created_at"] == "2025-11-14T10:00:00"
+        assert rows[0]["ai_analysis"]["recommendations"] == ["Rest", "Fluids"]
+
+    @pytest.mark.asyncio
+    async def test_csv(self):
+        docs = [make_doc(i) for i in range(2)]
+        rows = list(csv.reader(io.StringIO("".join(await collect(docs, "csv")))))
+
+        assert rows[0] == CSV_COLUMNS
+        assert len(rows) == 3
+        assert rows[1][3] == "Patient 0"
+        assert json.loads(rows[1][7]) == {"allergies": ["penicillin"]}
+        assert json.loads(rows[1][9]) == ["Rest", "Fluids"]
+
+    @pytest.mark.asyncio
+    async def test_output_is_chunked(self):
+        chunks = await collect([make_doc(i) for i in range(20)], "ndjson", chunk_bytes=512)
+        assert len(chunks) > 1
+        assert len("".join(chunks).splitlines()) == 20
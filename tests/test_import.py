@@ -0,0 +1,215 @@
+import csv
+import io
+import json
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+from pymongo.errors import BulkWriteError
+
+from app.models.medical_record import PatientData
+from app.routes.records import build_record_doc
+from app.services.export_service import CSV_COLUMNS, csv_row
+from app.services.import_service import (
+    LINE_TOO_LONG,
+    RECORD_TOO_LONG,
+    RecordImporter,
+    csv_rows,
+    iter_lines,
+    ndjson_rows,
+)
+from app.services.job_service import UNCLAIMED
+from benchmarks.stubs import InMemoryDatabase
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start : start + size]
+
+
+async def lines_of(data: bytes, size=3, max_length=1000):
+    return [line async for line in iter_lines(chunked(data, size), max_length)]
+
+
+async def rows_of(parse, text: str, *args):
+    return [row async for row in parse(iter_lines(chunked(text.encode(), 7), 1000), *args)]
+
+
+def patient_line(name="Jane", age=42, **extra):
+    return json.dumps({"patient_name": name, "age": age, "symptoms": "cough", **extra})
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_handles_split_chunks_bom_and_crlf():
+    data = "﻿café\r\nsecond\nthird".encode()
+    for size in (1, 2, 5, 100):
+        assert await lines_of(data, size) == ["café", "second", "third"]
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_replaces_oversized_lines():
+    data = b"short\n" + b"x" * 50 + b"\nafter\n"
+    assert await lines_of(data, size=4, max_length=10) == ["short", None, "after"]
+
+    rows = [row async for row in ndjson_rows(iter_lines(chunked(data, 4), 10))]
+    assert rows[1] == (2, None, LINE_TOO_LONG)
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_replaces_oversized_lines_within_one_chunk():
+    data = b"a" * 50 + b"\nb\n" + b"c" * 11
+    assert await lines_of(data, size=len(data), max_length=10) == [None, "b", None]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_rows_validate_each_line():
+    text = "\n".join(
+        [
+            patient_line(),
+            "",
+            "{not json",
+            patient_line(age="old"),
+            json.dumps({"id": "1", "patient_data": json.loads(patient_line("Exported"))}),
+        ]
+    )
+    rows = await rows_of(ndjson_rows, text)
+
+    assert [row for row, _, _ in rows] == [1, 2, 3, 4]
+    assert rows[0][1].patient_name == "Jane"
+    assert rows[1][2].startswith("Invalid JSON")
+    assert rows[2][2].startswith("age:")
+    assert rows[3][1].patient_name == "Exported"
+
+
+@pytest.mark.asyncio
+async def test_csv_rows_accept_multiline_values_and_extra_columns():
+    text = (
+        "id,patient_name,age,symptoms,medical_history,additional_info\n"
+        '1,Jane,42,"cough,\nfever",,"{""allergies"": ""nuts""}"\n'
+        "2,John,abc,headache,,\n"
+    )
+    rows = await rows_of(csv_rows, text, 10)
+
+    row, patient, error = rows[0]
+    assert (row, error) == (2, None)
+    assert patient.symptoms == "cough,\nfever"
+    assert patient.medical_history is None
+    assert patient.additional_info == {"allergies": "nuts"}
+    assert rows[1][0] == 4
+    assert rows[1][2].startswith("age:")
+
+
+@pytest.mark.asyncio
+async def test_csv_rows_treat_stray_quotes_in_unquoted_values_literally():
+    text = (
+        "patient_name,age,symptoms\nAlice,30,knee pain 5'10\" tall\nBob,40,cough\nCarol,50,fever\n"
+    )
+    rows = await rows_of(csv_rows, text, 10)
+
+    assert [(row, error) for row, _, error in rows] == [(2, None), (3, None), (4, None)]
+    assert rows[0][1].symptoms == "knee pain 5'10\" tall"
+
+
+@pytest.mark.asyncio
+async def test_csv_rows_cap_lines_spanned_by_a_row():
+    text = 'patient_name,age,symptoms\nJane,42,"cough\n\n\n\nfever"\nBob,40,rash\n'
+    rows = await rows_of(csv_rows, text, 3)
+
+    assert rows[0] == (2, None, RECORD_TOO_LONG)
+    assert rows[-1][1].patient_name == "Bob"
+    assert rows[-1][0] == 7
+
+    unterminated = await rows_of(csv_rows, 'patient_name,age,symptoms\nJane,42,"cough\n', 10)
+    assert unterminated == [(2, None, "Unterminated quoted value")]
+
+
+@pytest.mark.asyncio
+async def test_csv_rows_require_patient_columns():
+    with pytest.raises(ValueError, match="symptoms"):
+        await rows_of(csv_rows, "patient_name,age\nJane,42\n", 10)
+
+
+async def rows_from(lines):
+    for number, line in enumerate(lines, start=1):
+        yield number, *line
+
+
+@pytest.mark.asyncio
+async def test_importer_inserts_in_chunks_and_reports_errors():
+    db = InMemoryDatabase()
+    importer = RecordImporter(chunk_size=2, max_reported_errors=1)
+    rows = [(None, "bad row"), (None, "worse row")]
+    rows += [(patient, None) for patient in [SimpleNamespace(name=n) for n in range(5)]]
+
+    report = await importer.run(db.medical_records, rows_from(rows), lambda p: {"n": p.name})
+
+    assert (report.rows, report.inserted, report.failed) == (7, 5, 2)
+    assert [error.model_dump() for error in report.errors] == [{"row": 1, "error": "bad row"}]
+    assert report.errors_truncated
+    docs = await db.medical_records.find({}).to_list()
+    assert sorted(doc["n"] for doc in docs) == [0, 1, 2, 3, 4]
+    assert {doc["import_id"] for doc in docs} == {report.import_id}
+    assert importer.stats()["inserted"] == 5
+    assert importer.stats()["active"] == []
+
+
+@pytest.mark.asyncio
+async def test_importer_reports_rejected_writes():
+    class FailingCollection:
+        async def insert_many(self, docs, ordered=True):
+            assert not ordered
+            raise BulkWriteError({"writeErrors": [{"index": 1, "errmsg": "duplicate key"}]})
+
+    importer = RecordImporter(chunk_size=10, max_reported_errors=10)
+    rows = rows_from([(SimpleNamespace(), None)] * 3)
+    report = await importer.run(FailingCollection(), rows, lambda p: {})
+
+    assert (report.inserted, report.failed) == (2, 1)
+    assert report.errors[0].model_dump() == {"row": 2, "error": "duplicate key"}
+
+
+@pytest.mark.asyncio
+async def test_import_endpoint_round_trips_csv_export(client: AsyncClient, records_db):
+    patients = [
+        PatientData(patient_name=f"P{n}", age=30 + n, symptoms="cough, fever") for n in range(3)
+    ]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for n, patient in enumerate(patients):
+        writer.writerow(csv_row({"_id": n, **build_record_doc(patient, None, "user-0")}))
+    writer.writerow(["x", "", "", "Broken", "", "", "", "", "", ""])
+
+    response = await client.post(
+        "/records/import", params={"format": "csv"}, content=buffer.getvalue().encode()
+    )
+
+    assert response.status_code == 200
+    report = response.json()
+    assert (report["rows"], report["inserted"], report["failed"]) == (4, 3, 1)
+    assert report["errors"][0]["row"] == 5
+    docs = await records_db.medical_records.find({}).to_list()
+    assert [doc["patient_data"] for doc in docs] == [p.model_dump() for p in patients]
+    assert {doc["status"] for doc in docs} == {"completed"}
+    assert all("claimed_at" not in doc and doc["user_id"] == "user-1" for doc in docs)
+
+
+@pytest.mark.asyncio
+async def test_import_endpoint_defers_analysis(client: AsyncClient, records_db):
+    body = "\n".join(patient_line(f"P{n}") for n in range(2)).encode()
+
+    response = await client.post("/records/import", params={"analysis": "deferred"}, content=body)
+
+    assert response.json()["inserted"] == 2
+    docs = await records_db.medical_records.find({}).to_list()
+    assert {doc["status"] for doc in docs} == {"pending"}
+    assert {doc["claimed_at"] for doc in docs} == {UNCLAIMED}
+
+
+@pytest.mark.asyncio
+async def test_import_endpoint_rejects_bad_csv_header(client: AsyncClient, records_db):
+    response = await client.post(
+        "/records/import", params={"format": "csv"}, content=b"name,age\nJane,42\n"
+    )
+    assert response.status_code == 422
+    assert "patient_name" in response.json()["detail"]
@@ -0,0 +1,146 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+
+from app.core.config import settings
+from app.services.job_service import UNCLAIMED, RecordJobQueue
+
+
+def matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict) and "$lt" in condition:
+            if value is None or not value < condition["$lt"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeRecords:
+    def __init__(self, docs):
+        self.docs = {doc["_id"]: doc for doc in docs}
+
+    async def find_one(self, query, projection=None):
+        return next((doc for doc in self.docs.values() if matches(doc, query)), None)
+
+    async def find(self, query, projection=None):
+        for doc in list(self.docs.values()):
+            if matches(doc, query):
+                yield doc
+
+    async def update_one(self, query, update):
+        doc = await self.find_one(query)
+        if doc is not None:
+            doc.update(update.get("$set", {}))
+            for key in update.get("$unset", {}):
+                doc.pop(key, None)
+        return SimpleNamespace(modified_count=int(doc is not None))
+
+
+def pending_doc(claimed_at=None):
+    return {
+        "_id": ObjectId(),
+        "patient_data": {"patient_name": "John", "age": 30, "symptoms": "fever"},
+        "ai_analysis": None,
+        "status": "pending",
+        "claimed_at": claimed_at or datetime.now(timezone.utc),
+    }
+
+
+class TestRecordJobQueue:
+    @pytest.fixture(autouse=True)
+    def fake_db(self, monkeypatch, fake_completions):
+        self.records = FakeRecords([])
+        db = SimpleNamespace(medical_records=self.records)
+        monkeypatch.setattr("app.services.job_service.get_database", lambda: db)
+        self.completions = fake_completions
+
+    @pytest.mark.asyncio
+    async def test_worker_fills_in_analysis(self):
+        doc = pending_doc()
+        self.records.docs[doc["_id"]] = doc
+        jobs = RecordJobQueue(workers=1, max_queue=10)
+        await jobs.start()
+
+        jobs.enqueue(doc["_id"])
+        await jobs.wait(doc["_id"], timeout=1)
+        await jobs.close()
+
+        assert doc["status"] == "completed"
+        assert doc["ai_analysis"]["analysis"] == "Viral infection"
+        assert "claimed_at" not in doc
+        assert jobs.stats()["completed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stale_pending_records_are_requeued_on_start(self):
+        stale = pending_doc(claimed_at=datetime.now(timezone.utc) - timedelta(hours=1))
+        fresh = pending_doc()
+        self.records.docs.update({stale["_id"]: stale, fresh["_id"]: fresh})
+        jobs = RecordJobQueue(workers=1, max_queue=10)
+
+        await jobs.start()
+        await jobs.wait(stale["_id"], timeout=1)
+        await jobs.close()
+
+        assert jobs.stats()["recovered"] == 1
+        assert stale["status"] == "completed"
+        assert fresh["status"] == "pending"
+
+    @pytest.mark.asyncio
+    async def test_backfill_picks_up_unclaimed_records(self):
+        jobs = RecordJobQueue(workers=1, max_queue=10)
+        await jobs.start()
+        imported = pending_doc(claimed_at=UNCLAIMED)
+        self.records.docs[imported["_id"]] = imported
+
+        jobs.request_backfill()
+        await jobs.wait(imported["_id"], timeout=1)
+        await jobs.close()
+
+        assert imported["status"] == "completed"
+        assert jobs.stats()["recovered"] == 1
+
+    @pytest.mark.asyncio
+    async def test_full_queue(self):
+        jobs = RecordJobQueue(workers=1, max_queue=1)
+        jobs.enqueue(ObjectId())
+        assert jobs.full()
+        with pytest.raises(asyncio.QueueFull):
+            jobs.enqueue(ObjectId())
+
+    @pytest.mark.asyncio
+    async def test_submit_defers_to_backfill_when_full(self):
+        queued, overflow = pending_doc(), pending_doc()
+        self.records.docs.update({doc["_id"]: doc for doc in (queued, overflow)})
+        jobs = RecordJobQueue(workers=1, max_queue=1)
+
+        assert await jobs.submit(queued["_id"])
+        assert not await jobs.submit(overflow["_id"])
+
+        assert queued["claimed_at"] != UNCLAIMED
+        assert overflow["claimed_at"] == UNCLAIMED
+        assert jobs.stats()["deferred"] == 1
+
+    @pytest.mark.asyncio
+    async def test_degraded_analysis_is_retried_then_failed(self, monkeypatch):
+        monkeypatch.setattr(settings, "record_job_max_attempts", 2)
+        self.completions.error = RuntimeError("Groq unavailable")
+        doc = pending_doc()
+        self.records.docs[doc["_id"]] = doc
+        jobs = RecordJobQueue(workers=1, max_queue=10)
+
+        await jobs._process(doc["_id"])
+
+        assert doc["status"] == "pending"
+        assert doc["ai_analysis"] is None
+        assert (doc["claimed_at"], doc["attempts"]) == (UNCLAIMED, 1)
+
+        await jobs._process(doc["_id"])
+
+        assert doc["status"] == "failed"
+        assert doc["ai_analysis"] is None
+        assert jobs.stats()["retried"] == jobs.stats()["failed"] == 1
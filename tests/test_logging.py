@@ -0,0 +1,79 @@
+import json
+import logging
+import queue
+import sys
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.logging import (
+    DeferredQueueHandler,
+    JsonFormatter,
+    RequestIdFilter,
+    request_id_var,
+)
+
+
+def make_record(msg, *args, exc_info=None):
+    return logging.LogRecord("medical_records_api", logging.INFO, __file__, 1, msg, args, exc_info)
+
+
+def test_json_formatter_renders_lazy_arguments():
+    record = make_record("Analysis completed for patient: %s, age: %s", "Jane", 42)
+    record.request_id = "abc123"
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "Analysis completed for patient: Jane, age: 42"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "medical_records_api"
+    assert entry["request_id"] == "abc123"
+    assert "exc_info" not in entry
+
+
+def test_json_formatter_includes_exception():
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        record = make_record("failed", exc_info=sys.exc_info())
+
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert "ValueError: boom" in entry["exc_info"]
+
+
+def test_queue_handler_defers_formatting():
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+    record = make_record("Patient symptoms: %s", "cough")
+
+    token = request_id_var.set("req-1")
+    try:
+        handler.handle(record)
+    finally:
+        request_id_var.reset(token)
+
+    queued = log_queue.get_nowait()
+    assert queued is record
+    assert queued.msg == "Patient symptoms: %s"
+    assert queued.args == ("cough",)
+    assert queued.request_id == "req-1"
+
+
+@pytest.mark.asyncio
+async def test_request_id_is_generated(client: AsyncClient):
+    response = await client.get("/")
+    assert len(response.headers["X-Request-ID"]) == 32
+
+
+@pytest.mark.asyncio
+async def test_request_id_is_propagated(client: AsyncClient):
+    response = await client.get("/", headers={"X-Request-ID": "trace-42"})
+    assert response.headers["X-Request-ID"] == "trace-42"
+
+
+@pytest.mark.asyncio
+async def test_malformed_request_id_is_replaced(client: AsyncClient):
+    response = await client.get("/", headers={"X-Request-ID": "bad id\twith spaces"})
+    assert response.headers["X-Request-ID"] != "bad id\twith spaces"
@@ -0,0 +1,111 @@
+from types import SimpleNamespace
+
+import pytest
+from httpx import AsyncClient
+
+from app.core.config import settings
+from app.core.metrics import Counter, Histogram, MongoCommandMetrics, _Metric, registry
+
+PATIENT = {"patient_name": "Jane", "age": 42, "symptoms": "cough", "medical_history": None}
+
+
+def sample(text, series):
+    for line in text.splitlines():
+        if line.startswith(series + " "):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metric_kinds_must_create_their_series():
+    class Summary(_Metric):
+        kind = "summary"
+
+    with pytest.raises(TypeError, match="_new_child"):
+        Summary("latency_seconds", "Latency.")
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+    child = histogram.labels("/a")
+    child.observe(0.05)
+    child.observe(0.5)
+    child.observe(5)
+
+    lines = histogram.render()
+
+    assert 'latency_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{route="/a"} 3' in lines
+    assert 'latency_seconds_sum{route="/a"} 5.55' in lines
+
+
+def test_counter_escapes_labels_and_checks_arity():
+    counter = Counter("errors_total", "Errors.", ("reason",))
+    counter.labels('bad "quote"').inc(2)
+
+    assert 'errors_total{reason="bad \\"quote\\""} 2.0' in counter.render()
+    with pytest.raises(ValueError, match="expects labels"):
+        counter.labels("a", "b")
+
+
+def test_mongo_listener_times_commands_by_collection():
+    listener = MongoCommandMetrics()
+    command = {"find": "medical_records", "filter": {}}
+    listener.started(
+        SimpleNamespace(command=command, command_name="find", request_id=7, connection_id=1)
+    )
+    before = sample(
+        registry.render(),
+        'mongodb_command_duration_seconds_count{command="find",collection="medical_records",'
+        'outcome="success"}',
+    )
+    listener.succeeded(
+        SimpleNamespace(command_name="find", request_id=7, connection_id=1, duration_micros=1500)
+    )
+
+    after = sample(
+        registry.render(),
+        'mongodb_command_duration_seconds_count{command="find",collection="medical_records",'
+        'outcome="success"}',
+    )
+    assert after == before + 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_requests_and_tokens(client: AsyncClient, fake_completions):
+    before = (await client.get("/metrics")).text
+    response = await client.post("/records/analyze", json=PATIENT)
+    assert response.status_code == 200
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    after = response.text
+
+    series = 'http_requests_total{method="POST",route="/records/analyze",status="200"}'
+    assert sample(after, series) == sample(before, series) + 1
+    tokens = f'llm_tokens_total{{model="{settings.groq_model}",kind="prompt"}}'
+    assert sample(after, tokens) == sample(before, tokens) + 120
+    assert 'http_requests_in_progress{method="POST"} 0.0' in after
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "content",
+    ["Plain text answer", '{"analysis": "Flu",}', '{"analysis": "Flu"}'],
+    ids=["no-json", "invalid-json", "invalid-analysis"],
+)
+async def test_unparsed_answer_counts_fallback(client: AsyncClient, fake_completions, content):
+    fake_completions.content = content
+    series = 'analysis_fallbacks_total{reason="unparsed"}'
+    errors = 'analysis_fallbacks_total{reason="error"}'
+    before = sample(registry.render(), series)
+    errors_before = sample(registry.render(), errors)
+
+    response = await client.post("/records/analyze", json=PATIENT)
+
+    assert response.status_code == 200
+    assert response.json()["analysis"] == content
+    assert sample(registry.render(), series) == before + 1
+    assert sample(registry.render(), errors) == errors_before
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from app.core.pagination import after_cursor_filter, decode_cursor, encode_cursor
+
+
+class TestCursors:
+    def test_round_trip(self):
+        created_at = datetime(2025, 11, 14, 10, 30, 0, 123000)
+        object_id = ObjectId()
+
+        cursor = encode_cursor(created_at, object_id)
+
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == (created_at, object_id)
+
+    @pytest.mark.parametrize("cursor", ["", "not-a-cursor", "eyJ0IjogIngifQ"])
+    def test_invalid_cursor(self, cursor):
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            decode_cursor(cursor)
+
+    def test_after_cursor_filter(self):
+        created_at = datetime(2025, 11, 14, 10, 30)
+        object_id = ObjectId()
+
+        query = after_cursor_filter(encode_cursor(created_at, object_id))
+
+        assert query == {
+            "$or": [
+                {"created_at": {"$lt": created_at}},
+                {"created_at": created_at, "_id": {"$lt": object_id}},
+            ]
+        }
@@ -0,0 +1,110 @@
+from app.core.config import settings
+from app.models.medical_record import PatientData
+from app.services.analysis_cache import analysis_cache_key
+from app.services.prompt_builder import (
+    ELISION,
+    build_prompt,
+    compact_text,
+    completion_budget,
+    count_tokens,
+    select_additional_info,
+)
+
+PATIENT = PatientData(patient_name="Jane Doe", age=42, symptoms="dry cough, mild fever")
+
+
+def test_count_tokens_estimates_words_and_punctuation():
+    assert count_tokens("") == 0
+    assert count_tokens("fever, cough") == 3
+    assert count_tokens("hypercholesterolemia") == 5
+
+
+def test_compact_text_keeps_short_text_verbatim():
+    assert compact_text("Asthma since childhood.", 50) == ("Asthma since childhood.", False)
+
+
+def test_compact_text_drops_repeated_sentences_first():
+    text = "Hypertension. Type 2 diabetes. hypertension.  Type 2 diabetes."
+    compacted, changed = compact_text(text, count_tokens("Hypertension. Type 2 diabetes."))
+    assert compacted == "Hypertension. Type 2 diabetes."
+    assert changed
+
+
+def test_compact_text_keeps_opening_and_latest_entries_within_budget():
+    entries = [f"Visit {n}: routine follow-up, blood pressure stable." for n in range(200)]
+    compacted, changed = compact_text(" ".join(entries), 120)
+
+    assert changed
+    assert count_tokens(compacted) <= 120
+    assert compacted.startswith("Visit 0:")
+    assert compacted.endswith("Visit 199: routine follow-up, blood pressure stable.")
+    assert ELISION in compacted
+
+
+def test_select_additional_info_filters_keys():
+    info = {"Allergies": "penicillin", "favourite_colour": "blue", "vital-signs": {"bp": "120/80"}}
+    assert select_additional_info(info) == {
+        "Allergies": "penicillin",
+        "vital-signs": {"bp": "120/80"},
+    }
+    assert select_additional_info({"medications": []}) == {}
+
+
+def test_build_prompt_includes_relevant_info_and_omits_name():
+    patient = PatientData(
+        patient_name="Jane Doe",
+        age=42,
+        symptoms="dry cough, mild fever",
+        additional_info={"medications": ["metformin"], "insurance_id": "X-123"},
+    )
+    prompt, stats = build_prompt(patient)
+
+    assert "Jane Doe" not in prompt
+    assert '- medications: ["metformin"]' in prompt
+    assert "X-123" not in prompt
+    assert not stats.compacted
+    assert stats.input_tokens == count_tokens(prompt)
+
+
+def test_build_prompt_enforces_input_budget(monkeypatch):
+    monkeypatch.setattr(settings, "prompt_max_input_tokens", 300)
+    history = " ".join(f"Admission {n}: pneumonia treated with antibiotics." for n in range(500))
+    patient = PatientData(
+        patient_name="Jane Doe", age=42, symptoms="dry cough, mild fever", medical_history=history
+    )
+
+    prompt, stats = build_prompt(patient)
+
+    assert stats.compacted
+    assert count_tokens(prompt) < count_tokens(build_prompt(PATIENT)[0]) + 300
+    assert "Admission 499" in prompt
+
+
+def test_completion_budget_scales_and_clamps():
+    assert completion_budget(0) == settings.analysis_min_tokens
+    assert completion_budget(200) == settings.analysis_min_tokens + 100
+    assert completion_budget(100_000) == settings.analysis_max_tokens
+
+
+def test_completion_params_use_adaptive_max_tokens(ai_service):
+    params = ai_service._completion_params(PATIENT)
+    _, stats = build_prompt(PATIENT)
+    assert params["max_tokens"] == stats.max_tokens < settings.analysis_max_tokens
+
+
+def test_cache_key_tracks_relevant_additional_info_only():
+    base = analysis_cache_key(PATIENT, "model")
+    insured = PatientData(
+        patient_name="Jane Doe",
+        age=42,
+        symptoms="dry cough, mild fever",
+        additional_info={"insurance_id": "1"},
+    )
+    allergic = PatientData(
+        patient_name="Jane Doe",
+        age=42,
+        symptoms="dry cough, mild fever",
+        additional_info={"allergies": "nuts"},
+    )
+    assert analysis_cache_key(insured, "model") == base
+    assert analysis_cache_key(allergic, "model") != base
@@ -0,0 +1,190 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.core.middleware import AdmissionMiddleware
+from app.core.rate_limit import (
+    AdmissionController,
+    InMemoryRateLimitBackend,
+    RateLimitBackend,
+    admission,
+)
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+async def identify(token):
+    return SimpleNamespace(id=token) if token.startswith("user-") else None
+
+
+def middleware_client(controller):
+    app = AdmissionMiddleware(ok_app, controller=controller, identify=identify)
+    return AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+
+
+@pytest.mark.asyncio
+async def test_bucket_allows_burst_then_refills():
+    backend = InMemoryRateLimitBackend(max_keys=10)
+    assert await backend.take("k", 50, 2) == 0
+    assert await backend.take("k", 50, 2) == 0
+    assert 0 < await backend.take("k", 50, 2) <= 0.02
+
+    await asyncio.sleep(0.03)
+    assert await backend.take("k", 50, 2) == 0
+
+
+@pytest.mark.asyncio
+async def test_bucket_count_is_bounded():
+    backend = InMemoryRateLimitBackend(max_keys=3)
+    for n in range(10):
+        await backend.take(f"k{n}", 1, 1)
+    assert len(backend) == 3
+
+
+@pytest.mark.asyncio
+async def test_users_and_anonymous_clients_have_separate_buckets():
+    controller = AdmissionController(
+        backend=InMemoryRateLimitBackend(max_keys=100),
+        ip_rate=0.01,
+        ip_burst=2,
+        user_rate=0.01,
+        user_burst=3,
+        max_in_flight=10,
+    )
+    for _ in range(2):
+        assert await controller.acquire("10.0.0.1", None) is None
+    assert await controller.acquire("10.0.0.1", None) == ("ip", 100)
+    assert await controller.acquire("10.0.0.2", None) is None
+    assert await controller.acquire("10.0.0.1", "u1") is None
+
+    assert controller.stats()["rejected"] == {"ip": 1, "user": 0, "in_flight": 0}
+
+
+@pytest.mark.asyncio
+async def test_in_flight_cap_sheds_until_released():
+    controller = AdmissionController(
+        backend=InMemoryRateLimitBackend(max_keys=100),
+        ip_rate=0.01,
+        ip_burst=10,
+        user_rate=0.01,
+        user_burst=3,
+        max_in_flight=1,
+    )
+    assert await controller.acquire("10.0.0.1", None) is None
+    assert await controller.acquire("10.0.0.1", None) == ("in_flight", 1)
+
+    controller.release()
+    assert await controller.acquire("10.0.0.1", None) is None
+
+
+@pytest.mark.asyncio
+async def test_backend_failure_admits_requests():
+    class BrokenBackend(RateLimitBackend):
+        async def take(self, key, rate, burst):
+            raise ConnectionError("redis down")
+
+    controller = AdmissionController(
+        backend=BrokenBackend(),
+        ip_rate=0.01,
+        ip_burst=2,
+        user_rate=0.01,
+        user_burst=3,
+        max_in_flight=10,
+    )
+    assert await controller.acquire("10.0.0.1", None) is None
+
+
+@pytest.mark.asyncio
+async def test_middleware_returns_429_with_retry_after():
+    controller = AdmissionController(
+        backend=InMemoryRateLimitBackend(max_keys=100),
+        ip_rate=0.01,
+        ip_burst=2,
+        user_rate=0.01,
+        user_burst=3,
+        max_in_flight=10,
+    )
+    async with middleware_client(controller) as ac:
+        statuses = [(await ac.get("/records")).status_code for _ in range(3)]
+        rejected = await ac.get("/records")
+        other = await ac.get("/stats")
+
+    assert statuses == [200, 200, 429]
+    assert rejected.headers["retry-after"] == "100"
+    assert rejected.json() == {"detail": "Rate limit exceeded"}
+    assert other.status_code == 200
+    assert controller.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_middleware_limits_authenticated_requests_per_user():
+    controller = AdmissionController(
+        backend=InMemoryRateLimitBackend(max_keys=100),
+        ip_rate=0.01,
+        ip_burst=2,
+        user_rate=0.01,
+        user_burst=3,
+        max_in_flight=10,
+    )
+    async with middleware_client(controller) as ac:
+        alice = {"Authorization": "Bearer user-alice"}
+        statuses = [(await ac.get("/records", headers=alice)).status_code for _ in range(4)]
+        bob = await ac.get("/records", headers={"Authorization": "Bearer user-bob"})
+
+    assert statuses == [200, 200, 200, 429]
+    assert bob.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_analyze_endpoint_is_rate_limited(client: AsyncClient, fake_completions, monkeypatch):
+    monkeypatch.setattr(admission, "ip_burst", 1)
+    monkeypatch.setattr(admission, "ip_rate", 0.5)
+    patient_data = {"patient_name": "Test Patient", "age": 30, "symptoms": "headache"}
+
+    first = await client.post("/records/analyze", json=patient_data)
+    second = await client.post("/records/analyze", json=patient_data)
+
+    assert first.status_code == 200
+    assert second.status_code == 429
+    assert second.headers["retry-after"] == "2"
+    assert fake_completions.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_long_lived_paths_do_not_hold_in_flight_slots():
+    controller = AdmissionController(
+        backend=InMemoryRateLimitBackend(max_keys=100),
+        ip_rate=0.01,
+        ip_burst=2,
+        user_rate=0.01,
+        user_burst=3,
+        max_in_flight=1,
+    )
+    seen = []
+
+    async def feed_app(scope, receive, send):
+        seen.append(controller.in_flight)
+        await ok_app(scope, receive, send)
+
+    app = AdmissionMiddleware(
+        feed_app, controller=controller, identify=identify, long_lived_paths=("/records/feed",)
+    )
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/records/feed")
+        await ac.get("/records")
+
+    assert response.status_code == 200
+    assert seen == [0, 1]
+
+
+def test_backend_must_implement_take():
+    class Incomplete(RateLimitBackend):
+        pass
+
+    with pytest.raises(TypeError, match="take"):
+        Incomplete()
@@ -0,0 +1,212 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from bson import ObjectId
+from httpx import AsyncClient
+
+from app.services.record_feed import RecordFeed, record_feed
+from benchmarks.stubs import InMemoryDatabase
+
+
+def record(name="Jane", user_id="user-1"):
+    return {"_id": ObjectId(), "user_id": user_id, "patient_data": {"patient_name": name}}
+
+
+async def subscribed(feed, user_id="user-1", after=None, count=1):
+    """Start following ``feed`` and wait until the subscription exists."""
+    events = feed.follow(user_id, after)
+    first = asyncio.ensure_future(anext(events))
+    while len(feed) < count:
+        await asyncio.sleep(0)
+    return events, first
+
+
+@pytest.mark.asyncio
+async def test_records_are_fanned_out_to_every_subscriber():
+    feed = RecordFeed(
+        backend="memory", queue_size=10, max_subscribers=10, heartbeat_seconds=5, replay_page_size=2
+    )
+    first_events, first_pending = await subscribed(feed)
+    second_events, second_pending = await subscribed(feed, count=2)
+
+    doc = record()
+    feed.publish(doc)
+
+    assert await first_pending == ("record", doc)
+    assert await second_pending == ("record", doc)
+    await first_events.aclose()
+    await second_events.aclose()
+    assert len(feed) == 0
+    assert feed.stats()["delivered"] == 2
+
+
+@pytest.mark.asyncio
+async def test_idle_subscribers_get_heartbeats():
+    feed = RecordFeed(
+        backend="memory",
+        queue_size=10,
+        max_subscribers=10,
+        heartbeat_seconds=0.01,
+        replay_page_size=2,
+    )
+    events = feed.follow("user-1")
+    assert await anext(events) == ("heartbeat", {})
+    await events.aclose()
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_overflows_with_resume_id():
+    feed = RecordFeed(
+        backend="memory", queue_size=2, max_subscribers=10, heartbeat_seconds=5, replay_page_size=2
+    )
+    events, pending = await subscribed(feed)
+    docs = [record(str(n)) for n in range(5)]
+    for doc in docs:
+        feed.publish(doc)
+
+    received = [await pending] + [event async for event in events]
+
+    assert received == [
+        ("record", docs[0]),
+        ("record", docs[1]),
+        ("overflow", {"resume": str(docs[1]["_id"])}),
+    ]
+    assert feed.stats()["overflows"] == 1
+    assert len(feed) == 0
+
+
+@pytest.mark.asyncio
+async def test_resume_replays_missed_records_without_duplicates(monkeypatch):
+    db = InMemoryDatabase()
+    monkeypatch.setattr("app.services.record_feed.get_database", lambda: db)
+    feed = RecordFeed(
+        backend="memory", queue_size=10, max_subscribers=10, heartbeat_seconds=5, replay_page_size=2
+    )
+    docs = [record(str(n)) for n in range(5)]
+    for doc in docs[:4]:
+        await db.medical_records.insert_one(doc)
+
+    events, pending = await subscribed(feed, after=docs[0]["_id"])
+    feed.publish(docs[3])
+    await db.medical_records.insert_one(docs[4])
+    feed.publish(docs[4])
+
+    received = [await pending] + [await anext(events) for _ in range(3)]
+    await events.aclose()
+
+    assert [doc["_id"] for _, doc in received] == [doc["_id"] for doc in docs[1:]]
+    stats = feed.stats()
+    assert stats["replayed"] + stats["delivered"] == 4
+
+
+@pytest.mark.asyncio
+async def test_subscribers_only_receive_their_own_records(monkeypatch):
+    db = InMemoryDatabase()
+    monkeypatch.setattr("app.services.record_feed.get_database", lambda: db)
+    feed = RecordFeed(
+        backend="memory", queue_size=10, max_subscribers=10, heartbeat_seconds=5, replay_page_size=2
+    )
+    start = record("Start", user_id="user-b")
+    alice, bob = record("Alice", user_id="user-a"), record("Bob", user_id="user-b")
+    await db.medical_records.insert_one(start)
+    await db.medical_records.insert_one(alice)
+
+    events, pending = await subscribed(feed, user_id="user-b", after=start["_id"])
+    feed.publish(alice)
+    feed.publish(bob)
+
+    assert await pending == ("record", bob)
+    await events.aclose()
+    assert feed.stats()["replayed"] == 0
+
+
+class FakeChangeStream:
+    def __init__(self, changes):
+        self.changes = changes
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.changes.get()
+
+
+@pytest.mark.asyncio
+async def test_change_stream_feeds_subscribers(monkeypatch):
+    changes = asyncio.Queue()
+    watched = []
+
+    async def command(name):
+        return {"setName": "rs0"}
+
+    def watch(pipeline, resume_after=None):
+        watched.append(resume_after)
+        return FakeChangeStream(changes)
+
+    db = SimpleNamespace(command=command, medical_records=SimpleNamespace(watch=watch))
+    monkeypatch.setattr("app.services.record_feed.get_database", lambda: db)
+    feed = RecordFeed(
+        backend="auto", queue_size=10, max_subscribers=10, heartbeat_seconds=5, replay_page_size=2
+    )
+    await feed.start()
+    assert feed.source == "change_stream"
+
+    events, pending = await subscribed(feed)
+    local, remote = record("local"), record("remote")
+    other = record("other", user_id="user-2")
+    feed.publish(local)
+    await changes.put({"_id": {"_data": "token-1"}, "fullDocument": other})
+    await changes.put({"_id": {"_data": "token-2"}, "fullDocument": remote})
+
+    assert await pending == ("record", remote)
+    assert watched == [None]
+    await events.aclose()
+    await feed.close()
+
+
+@pytest.mark.asyncio
+async def test_auto_backend_falls_back_without_replica_set(monkeypatch):
+    monkeypatch.setattr("app.services.record_feed.get_database", lambda: InMemoryDatabase())
+    feed = RecordFeed(
+        backend="auto", queue_size=10, max_subscribers=10, heartbeat_seconds=5, replay_page_size=2
+    )
+    await feed.start()
+    assert feed.source == "memory"
+
+
+@pytest.mark.asyncio
+async def test_created_records_reach_the_feed_endpoint(
+    client: AsyncClient, fake_completions, records_db, monkeypatch
+):
+    monkeypatch.setattr(record_feed, "queue_size", 1)
+    patient = {"patient_name": "Jane", "age": 42, "symptoms": "cough"}
+
+    feed = asyncio.ensure_future(client.get("/records/feed"))
+    while len(record_feed) == 0:
+        await asyncio.sleep(0)
+    created = (await client.post("/records", json=patient)).json()
+    # Two records at once overflow the one-record queue, ending the stream.
+    late = [record("Late") | {"created_at": 0} for _ in range(2)]
+    for doc in late:
+        record_feed.publish(doc)
+    response = await feed
+
+    assert response.status_code == 200
+    assert response.text.startswith(f"id: {created['id']}\nevent: record\n")
+    assert '"symptoms":"cough"' in response.text
+    assert response.text.endswith("\n\n")
+    assert 'event: overflow\ndata: {"resume":' in response.text
+
+
+@pytest.mark.asyncio
+async def test_feed_rejects_invalid_resume_id(client: AsyncClient, records_db):
+    response = await client.get("/records/feed", headers={"Last-Event-ID": "nope"})
+
+    assert response.status_code == 400
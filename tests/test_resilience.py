@@ -0,0 +1,197 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from groq import APIConnectionError
+
+from app.core.config import settings
+from app.core.metrics import analysis_fallbacks_total, registry
+from app.core.resilience import CircuitBreaker, RetryBudget, backoff_delay
+from app.models.medical_record import PatientData
+
+PATIENT = PatientData(patient_name="Jane", age=42, symptoms="cough")
+
+
+def connection_error():
+    return APIConnectionError(request=httpx.Request("POST", "https://api.groq.com"))
+
+
+@pytest.fixture
+def fast_retries(monkeypatch, ai_service):
+    monkeypatch.setattr(settings, "groq_retry_base_seconds", 0.0)
+    monkeypatch.setattr(ai_service.router, "hedging_enabled", False)
+
+
+def test_backoff_delay_is_jittered_and_capped():
+    for _ in range(50):
+        assert 0.5 <= backoff_delay(1, 1.0, 10.0) <= 1.0
+        assert 1.0 <= backoff_delay(2, 1.0, 10.0) <= 2.0
+        assert 5.0 <= backoff_delay(8, 1.0, 10.0) <= 10.0
+
+
+def test_retry_budget_is_earned_by_requests():
+    budget = RetryBudget(0.5)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    budget.deposit()
+    budget.deposit()
+    assert budget.try_spend()
+    assert budget.stats() == {"tokens": 0.0, "spent": 2, "denied": 1}
+
+
+def test_circuit_opens_and_probes_once():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    breaker.reset_timeout = 0
+    assert breaker.allow()
+    assert breaker.state == "half_open"
+    assert not breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.stats() == {
+        "state": "closed",
+        "consecutive_failures": 0,
+        "opened": 2,
+        "rejected": 2,
+    }
+
+
+def test_cancelled_probe_lets_another_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+@pytest.mark.asyncio
+async def test_transient_error_is_retried(fake_completions, fast_retries, ai_service):
+    fake_completions.error = connection_error()
+    original = fake_completions.create
+
+    async def recover(**kwargs):
+        fake_completions.error = None if fake_completions.calls else fake_completions.error
+        return await original(**kwargs)
+
+    fake_completions.create = recover
+    analysis = await ai_service.analyze_patient_data(PATIENT)
+
+    assert analysis.analysis == "Viral infection"
+    assert not analysis.degraded
+    assert fake_completions.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_retries_are_limited_by_budget(fake_completions, fast_retries, ai_service):
+    fake_completions.error = connection_error()
+
+    first = await ai_service.analyze_patient_data(PATIENT)
+    second = await ai_service.analyze_patient_data(PATIENT.model_copy(update={"age": 43}))
+
+    assert first.degraded
+    assert second.degraded
+    assert fake_completions.calls == 3
+    assert ai_service.retry_budget.stats()["denied"] == 2
+
+
+@pytest.mark.asyncio
+async def test_other_errors_are_not_retried(fake_completions, fast_retries, ai_service):
+    fake_completions.error = RuntimeError("bad request")
+
+    analysis = await ai_service.analyze_patient_data(PATIENT)
+
+    assert analysis.degraded
+    assert fake_completions.calls == 1
+    assert ai_service.breaker.stats()["consecutive_failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_completion_times_out(monkeypatch, fake_completions, fast_retries, ai_service):
+    monkeypatch.setattr(settings, "groq_timeout_seconds", 0.01)
+    monkeypatch.setattr(settings, "groq_max_retries", 0)
+    fake_completions.delay = 1
+
+    analysis = await ai_service.analyze_patient_data(PATIENT)
+
+    assert analysis.degraded
+    assert ai_service.breaker.stats()["consecutive_failures"] == 1
+    assert 'outcome="timeout"}' in registry.render()
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_fails_fast(monkeypatch, fake_completions, fast_retries, ai_service):
+    monkeypatch.setattr(settings, "groq_max_retries", 0)
+    fake_completions.error = connection_error()
+    for age in range(settings.circuit_failure_threshold):
+        await ai_service.analyze_patient_data(PATIENT.model_copy(update={"age": age}))
+    assert ai_service.breaker.state == "open"
+
+    calls = fake_completions.calls
+    fallbacks = analysis_fallbacks_total.labels("circuit_open").value
+    analysis = await ai_service.analyze_patient_data(PATIENT)
+    events = [event async for event in ai_service.stream_analysis(PATIENT)]
+
+    assert analysis.degraded
+    assert events[-1][1].degraded
+    assert fake_completions.calls == calls
+    assert analysis_fallbacks_total.labels("circuit_open").value == fallbacks + 2
+
+
+@pytest.mark.asyncio
+async def test_stream_deadline_covers_reading(monkeypatch, fake_completions, ai_service):
+    monkeypatch.setattr(settings, "groq_timeout_seconds", 0.01)
+
+    async def stalled_stream(size=5):
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content="{"))])
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(fake_completions, "_stream", stalled_stream)
+
+    events = [event async for event in ai_service.stream_analysis(PATIENT)]
+
+    assert events[-2] == ("error", "Analysis failed")
+    assert events[-1][1].degraded
+    assert ai_service.breaker.stats()["consecutive_failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_slow_stream_client_is_dropped_without_holding_a_slot(
+    monkeypatch, fake_completions, ai_service
+):
+    monkeypatch.setattr(settings, "groq_stream_buffer_events", 2)
+    events = ai_service.stream_analysis(PATIENT)
+
+    first = await anext(events)
+    assert ai_service.limiter.stats()["in_flight"] == 0
+    rest = [event async for event in events]
+
+    assert first[0] == "token"
+    assert rest[-1] == ("error", "Client fell behind the analysis stream")
+    assert len(rest) == 2
+    assert ai_service.breaker.stats()["consecutive_failures"] == 0
+
+
+@pytest.mark.asyncio
+async def test_stream_tolerates_loose_json_strings(fake_completions, ai_service):
+    fake_completions.content = (
+        '{"analysis": "line one\nline two, isn\\\'t viral", "recommendations": ["Rest"]}'
+    )
+
+    events = [event async for event in ai_service.stream_analysis(PATIENT)]
+    analysis = await ai_service.analyze_patient_data(PATIENT.model_copy(update={"age": 43}))
+
+    streamed = "".join(data for name, data in events if name == "analysis")
+    assert streamed.startswith("line one\nline two")
+    assert not any(name == "error" for name, _ in events)
+    assert not events[-1][1].degraded
+    assert events[-1][1].analysis == analysis.analysis == fake_completions.content
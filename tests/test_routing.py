@@ -0,0 +1,182 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.medical_record import PatientData
+from app.services.ai_service import ModelRouter
+from tests.fakes import DEFAULT_COMPLETION, fake_groq_client
+
+PATIENT = PatientData(patient_name="Jane", age=42, symptoms="cough")
+
+
+class SequencedCompletions:
+    """Completions whose n-th call takes ``delays[n]`` seconds."""
+
+    def __init__(self, delays):
+        self.delays = list(delays)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def create(self, **kwargs):
+        delay = self.delays[min(self.calls, len(self.delays) - 1)]
+        self.calls += 1
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        message = SimpleNamespace(content=DEFAULT_COMPLETION)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def test_size_policy_routes_large_prompts_to_large_model():
+    router = ModelRouter(
+        policy="size",
+        fast_model="fast",
+        large_model="large",
+        threshold_tokens=100,
+        hedging_enabled=True,
+        hedge_percentile=0.9,
+        hedge_min_delay=0.01,
+        hedge_default_delay=0.05,
+        hedge_max_ratio=0.5,
+        min_samples=5,
+    )
+    assert router.choose(100) == "fast"
+    assert router.choose(101) == "large"
+
+    fixed = ModelRouter(
+        policy="fixed",
+        fast_model="fast",
+        large_model="large",
+        threshold_tokens=100,
+        hedging_enabled=True,
+        hedge_percentile=0.9,
+        hedge_min_delay=0.01,
+        hedge_default_delay=0.05,
+        hedge_max_ratio=0.5,
+        min_samples=5,
+    )
+    assert fixed.choose(10_000) == "fast"
+
+
+def test_hedge_delay_follows_observed_latency():
+    router = ModelRouter(
+        policy="size",
+        fast_model="fast",
+        large_model="large",
+        threshold_tokens=100,
+        hedging_enabled=True,
+        hedge_percentile=0.9,
+        hedge_min_delay=0.01,
+        hedge_default_delay=0.05,
+        hedge_max_ratio=0.5,
+        min_samples=5,
+    )
+    assert router.hedge_delay("fast") == 0.05
+
+    for seconds in (0.1, 0.2, 0.3, 0.4, 2.0):
+        router.observe("fast", seconds)
+    assert router.hedge_delay("fast") == 2.0
+
+    for _ in range(50):
+        router.observe("fast", 0.001)
+    assert router.hedge_delay("fast") == 0.01
+
+
+def test_hedge_budget_limits_duplicate_requests():
+    router = ModelRouter(
+        policy="size",
+        fast_model="fast",
+        large_model="large",
+        threshold_tokens=100,
+        hedging_enabled=True,
+        hedge_percentile=0.9,
+        hedge_min_delay=0.01,
+        hedge_default_delay=0.05,
+        hedge_max_ratio=0.5,
+        min_samples=5,
+    )
+    assert router.try_hedge()
+    assert not router.try_hedge()
+    router.admit()
+    assert not router.try_hedge()
+    router.admit()
+    assert router.try_hedge()
+    assert router.hedges == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_and_cancelled(monkeypatch, ai_service):
+    completions = SequencedCompletions([5.0, 0.0])
+    monkeypatch.setattr(ai_service, "client", fake_groq_client(completions))
+    router = ModelRouter(
+        policy="fixed",
+        fast_model="fast",
+        large_model="large",
+        threshold_tokens=100,
+        hedging_enabled=True,
+        hedge_percentile=0.9,
+        hedge_min_delay=0.01,
+        hedge_default_delay=0.05,
+        hedge_max_ratio=0.5,
+        min_samples=5,
+    )
+    monkeypatch.setattr(ai_service, "router", router)
+
+    params = ai_service._completion_params(PATIENT)
+    analysis = await asyncio.wait_for(ai_service._request_analysis(params), timeout=1)
+
+    assert analysis.analysis == "Viral infection"
+    assert completions.calls == 2
+    assert completions.cancelled == 1
+    assert ai_service.router.hedge_wins == 1
+    assert ai_service.router.stats()["models"]["fast"]["samples"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged(monkeypatch, ai_service):
+    completions = SequencedCompletions([0.0])
+    monkeypatch.setattr(ai_service, "client", fake_groq_client(completions))
+    router = ModelRouter(
+        policy="fixed",
+        fast_model="fast",
+        large_model="large",
+        threshold_tokens=100,
+        hedging_enabled=True,
+        hedge_percentile=0.9,
+        hedge_min_delay=0.01,
+        hedge_default_delay=0.05,
+        hedge_max_ratio=0.5,
+        min_samples=5,
+    )
+    monkeypatch.setattr(ai_service, "router", router)
+
+    await ai_service._request_analysis(ai_service._completion_params(PATIENT))
+
+    assert completions.calls == 1
+    assert ai_service.router.hedges == 0
+
+
+@pytest.mark.asyncio
+async def test_hedging_disabled_waits_for_primary(monkeypatch, ai_service):
+    completions = SequencedCompletions([0.1, 0.0])
+    monkeypatch.setattr(ai_service, "client", fake_groq_client(completions))
+    router = ModelRouter(
+        policy="size",
+        fast_model="fast",
+        large_model="large",
+        threshold_tokens=100,
+        hedging_enabled=False,
+        hedge_percentile=0.9,
+        hedge_min_delay=0.01,
+        hedge_default_delay=0.05,
+        hedge_max_ratio=0.5,
+        min_samples=5,
+    )
+    monkeypatch.setattr(ai_service, "router", router)
+
+    await ai_service._request_analysis(ai_service._completion_params(PATIENT))
+
+    assert completions.calls == 1
@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+from app.models.medical_record import MedicalAnalysis, PatientData
+from app.services.ai_service import AIService
+from app.services.semantic_cache import SemanticAnalysisCache, partition_key, terms
+from tests.fakes import FakeCompletions, fake_groq_client
+
+pytest.importorskip("numpy")
+
+MODEL = "model-a"
+ANALYSIS = MedicalAnalysis(analysis="Viral infection", recommendations=["Rest"])
+
+
+def patient(symptoms, age=34, **fields):
+    return PatientData(patient_name="John", age=age, symptoms=symptoms, **fields)
+
+
+def test_terms_ignore_order_stop_words_and_plurals():
+    first = patient("headache, fever", medical_history="migraines")
+    second = patient("Fever and headaches", medical_history="migraine")
+    assert sorted(terms(first)) == sorted(terms(second)) == ["fever", "h:migraine", "headache"]
+
+
+def test_partition_depends_on_age_band_and_additional_info():
+    base = patient("fever", age=34)
+    assert partition_key(base, MODEL, 10) == partition_key(patient("fever", age=38), MODEL, 10)
+    assert partition_key(base, MODEL, 10) != partition_key(patient("fever", age=41), MODEL, 10)
+    allergic = patient("fever", additional_info={"allergies": ["penicillin"]})
+    assert partition_key(base, MODEL, 10) != partition_key(allergic, MODEL, 10)
+
+
+def test_near_duplicate_is_answered_with_similarity():
+    cache = SemanticAnalysisCache(threshold=0.9, max_entries=100, ttl_seconds=60)
+    cache.add(patient("headache, fever, sore throat"), MODEL, ANALYSIS)
+
+    hit = cache.lookup(patient("sore throat and fever, headache", age=37), MODEL)
+
+    assert hit.analysis == "Viral infection"
+    assert hit.similarity == pytest.approx(1.0, abs=0.01)
+    assert cache.stats()["hits"] == 1
+
+
+def test_dissimilar_requests_miss():
+    cache = SemanticAnalysisCache(threshold=0.9, max_entries=100, ttl_seconds=60)
+    cache.add(patient("headache, fever, sore throat"), MODEL, ANALYSIS)
+
+    assert cache.lookup(patient("knee pain after running"), MODEL) is None
+    assert cache.lookup(patient("headache, fever, sore throat", age=70), MODEL) is None
+    assert cache.lookup(patient("headache, fever, sore throat"), "model-b") is None
+    assert cache.stats()["misses"] == 3
+
+
+def test_expired_entries_are_not_returned():
+    cache = SemanticAnalysisCache(threshold=0.9, max_entries=100, ttl_seconds=0.01)
+    cache.add(patient("headache, fever"), MODEL, ANALYSIS)
+    time.sleep(0.02)
+
+    assert cache.lookup(patient("fever, headache"), MODEL) is None
+
+
+def test_oldest_entries_are_evicted_past_max_entries():
+    cache = SemanticAnalysisCache(threshold=0.9, max_entries=2, ttl_seconds=60)
+    cache.add(patient("headache"), MODEL, ANALYSIS)
+    cache.add(patient("rash"), MODEL, ANALYSIS)
+    cache.add(patient("cough"), MODEL, ANALYSIS)
+
+    assert len(cache) == 2
+    assert cache.evictions == 1
+    assert cache.lookup(patient("headache"), MODEL) is None
+    assert cache.lookup(patient("rash"), MODEL) is not None
+    assert cache.lookup(patient("cough"), MODEL) is not None
+
+
+def test_index_survives_save_and_load(tmp_path):
+    path = str(tmp_path / "semantic.npz")
+    cache = SemanticAnalysisCache(threshold=0.9, max_entries=100, ttl_seconds=60)
+    cache.add(patient("headache, fever"), MODEL, ANALYSIS)
+    cache.add(patient("knee pain"), MODEL, ANALYSIS)
+    cache.save(path)
+
+    restored = SemanticAnalysisCache(threshold=0.9, max_entries=100, ttl_seconds=60)
+    assert restored.load(path)
+
+    assert len(restored) == 2
+    assert restored.lookup(patient("fever and headache"), MODEL).analysis == "Viral infection"
+
+    narrower = SemanticAnalysisCache(threshold=0.9, max_entries=100, ttl_seconds=60, dimensions=128)
+    assert narrower.load(path) is False
+    assert restored.load(str(tmp_path / "missing.npz")) is False
+
+
+@pytest.mark.asyncio
+async def test_service_reuses_analysis_of_near_duplicate():
+    service = AIService()
+    service.cache = None
+    service.semantic_cache = SemanticAnalysisCache(threshold=0.9, max_entries=100, ttl_seconds=60)
+    completions = FakeCompletions()
+    service.client = fake_groq_client(completions)
+
+    first = await service.analyze_patient_data(patient("headache, fever"))
+    second = await service.analyze_patient_data(patient("fever with headaches", age=36))
+
+    assert first.similarity is None
+    assert second.analysis == first.analysis
+    assert second.similarity == pytest.approx(1.0, abs=0.01)
+    assert completions.calls == 1
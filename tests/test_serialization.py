@@ -0,0 +1,74 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+from httpx import AsyncClient
+
+from app.core.serialization import dumps
+from app.models.medical_record import MedicalAnalysis, PatientData
+from app.routes.records import build_record_doc, record_from_doc, record_payload
+
+PATIENT = PatientData(patient_name="Jane", age=42, symptoms="cough", additional_info={"a": [1]})
+ANALYSIS = MedicalAnalysis(analysis="Viral infection", recommendations=["Rest"])
+
+
+def stored(doc):
+    doc["_id"] = ObjectId()
+    return doc
+
+
+@pytest.mark.parametrize(
+    "doc",
+    [
+        stored(build_record_doc(PATIENT, ANALYSIS, "user-1")),
+        stored(build_record_doc(PATIENT, None, "user-1")),
+        {
+            "_id": ObjectId(),
+            "patient_data": {"patient_name": "Old", "age": 70, "symptoms": "fatigue"},
+            "ai_analysis": {"analysis": "Anemia", "recommendations": []},
+            "created_at": datetime(2024, 5, 1, 12, 30, 15, 123000),
+        },
+    ],
+    ids=["completed", "pending", "legacy-naive-datetime"],
+)
+def test_fast_path_matches_validated_json(doc):
+    validated = record_from_doc(doc).model_dump(mode="json")
+    assert json.loads(dumps(record_payload(doc))) == validated
+
+
+def test_dumps_encodes_object_ids_and_utc_datetimes():
+    object_id = ObjectId()
+    moment = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    assert json.loads(dumps({"id": object_id, "at": moment})) == {
+        "id": str(object_id),
+        "at": "2024-01-02T03:04:05Z",
+    }
+
+
+def test_dumps_rejects_unknown_types():
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+@pytest.mark.asyncio
+async def test_get_records_serves_fast_path(client: AsyncClient, records_db):
+    for _ in range(3):
+        await records_db.medical_records.insert_one(build_record_doc(PATIENT, ANALYSIS, "user-1"))
+
+    response = await client.get("/records", params={"limit": 2})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert "X-Next-Cursor" in response.headers
+    records = response.json()
+    assert len(records) == 2
+    assert records[0]["ai_analysis"] == ANALYSIS.model_dump()
+
+
+def test_stdlib_fallback_matches_orjson(monkeypatch):
+    doc = stored(build_record_doc(PATIENT, ANALYSIS, "user-1"))
+    fast = dumps(record_payload(doc))
+    monkeypatch.setattr("app.core.serialization.orjson", None)
+    assert dumps(record_payload(doc)) == fast